@@ -0,0 +1,190 @@
+# admission.py
+# Admission control for write requests. Each (client, route) pair gets a token
+# bucket, so a double-tap loop or a misbehaving client is answered with 429
+# before it reaches Firestore, and a global limit on concurrent writes sheds
+# the excess with 503 instead of letting one burst tie up every worker.
+# app.py keys clients by profile id or username and loads the limits from
+# admin_settings/admission.
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_SETTINGS = {
+    'enabled': True,
+    'rate_per_minute': 60,  # Sustained requests per client and route
+    'burst': 20,  # Requests a client may send back to back
+    'max_concurrent': 32,  # Writes in progress across the process
+    'queue_timeout_ms': 250,  # How long a write may wait for a free slot before it is shed
+    'routes': {  # Per-route overrides of rate_per_minute and burst
+        '/add-lap-time': {'rate_per_minute': 30, 'burst': 10},
+        '/get-ready': {'rate_per_minute': 10, 'burst': 5},
+        '/move-vehicle/<profile_id>': {'rate_per_minute': 60, 'burst': 10},
+        '/update-vehicle-order/<profile_id>': {'rate_per_minute': 60, 'burst': 10},
+    },
+}
+MAX_TRACKED_KEYS = 10000
+SETTINGS_TTL = 30  # Seconds before settings are reloaded, so changes made through other workers apply
+SHED_RETRY_AFTER = 1
+
+
+def validate_settings(settings):
+    """Checks and normalizes an admission settings dict, merged over the defaults. Raises ValueError."""
+    merged = {**DEFAULT_SETTINGS, **settings}
+    if not isinstance(merged['enabled'], bool):
+        raise ValueError('enabled must be a boolean.')
+    for name in ('rate_per_minute', 'burst', 'max_concurrent', 'queue_timeout_ms'):
+        merged[name] = _positive_int(merged[name], name, allow_zero=name == 'queue_timeout_ms')
+    if not isinstance(merged['routes'], dict):
+        raise ValueError('routes must map a route to its limits.')
+    routes = {}
+    for route, limits in merged['routes'].items():
+        if not isinstance(limits, dict):
+            raise ValueError(f'The limits for {route} must be an object.')
+        routes[route] = {name: _positive_int(limits[name], f'{route} {name}')
+                         for name in ('rate_per_minute', 'burst') if name in limits}
+    merged['routes'] = routes
+    return merged
+
+
+def _positive_int(value, name, allow_zero=False):
+    if isinstance(value, bool):
+        raise ValueError(f'{name} must be a number.')
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{name} must be a number.')
+    if value < 0 or (value == 0 and not allow_zero):
+        raise ValueError(f'{name} must be greater than zero.')
+    return value
+
+
+class TokenBuckets:
+    """Token buckets keyed by (client, route), evicting the least recently used past max_keys."""
+
+    def __init__(self, max_keys=MAX_TRACKED_KEYS):
+        self._max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> [tokens, updated]
+        self._lock = threading.Lock()
+
+    def take(self, key, rate_per_minute, burst, now=None):
+        """Takes one token. Returns 0 if the request is admitted, else the seconds until a token is free."""
+        now = time.monotonic() if now is None else now
+        rate = rate_per_minute / 60.0
+        with self._lock:
+            bucket = self._buckets.pop(key, None)
+            if bucket is None:
+                bucket = [float(burst), now]
+            tokens = min(float(burst), bucket[0] + (now - bucket[1]) * rate)
+            self._buckets[key] = bucket
+            bucket[1] = now
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                wait = 0
+            else:
+                bucket[0] = tokens
+                wait = (1 - tokens) / rate
+            while len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class ConcurrencyLimiter:
+    """Counts requests in progress; acquire waits up to a timeout for a free slot."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_flight = 0
+        self.peak = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout, force=False):
+        """Takes a slot, waiting at most timeout seconds; force takes one even past the limit."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self.in_flight >= self.limit and not force:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            return True
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+
+class AdmissionController:
+    """
+    Decides whether a write request may start. settings_loader returns the
+    current settings as validate_settings produces them; it is called again
+    once they are settings_ttl seconds old, or on the next admit() after reload().
+    """
+
+    def __init__(self, settings_loader, settings_ttl=SETTINGS_TTL):
+        self._settings_loader = settings_loader
+        self._settings_ttl = settings_ttl
+        self._settings = None
+        self._settings_at = 0
+        self._buckets = TokenBuckets()
+        self._limiter = ConcurrencyLimiter(DEFAULT_SETTINGS['max_concurrent'])
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    @property
+    def settings(self):
+        if self._settings is None or time.monotonic() - self._settings_at >= self._settings_ttl:
+            settings = self._settings_loader()
+            self._limiter.limit = settings['max_concurrent']
+            self._settings, self._settings_at = settings, time.monotonic()
+        return self._settings
+
+    def reload(self):
+        self._settings = None
+
+    def admit(self, client, route):
+        """
+        Returns None and takes a concurrency slot if the request may start (call
+        release() when it ends), or (status, retry_after_seconds) if it must be rejected.
+        """
+        settings = self.settings
+        if not settings['enabled']:
+            # Still counted, so the stats show the load the limits would face.
+            self._limiter.acquire(0, force=True)
+            self._count(route, 'admitted')
+            return None
+        limits = {**settings, **settings['routes'].get(route, {})}
+        wait = self._buckets.take((client, route), limits['rate_per_minute'], limits['burst'])
+        if wait:
+            self._count(route, 'rate_limited')
+            return 429, max(1, math.ceil(wait))
+        if not self._limiter.acquire(settings['queue_timeout_ms'] / 1000.0):
+            self._count(route, 'shed')
+            return 503, SHED_RETRY_AFTER
+        self._count(route, 'admitted')
+        return None
+
+    def release(self):
+        self._limiter.release()
+
+    def _count(self, route, outcome):
+        with self._lock:
+            counters = self._counters.setdefault(route, {'admitted': 0, 'rate_limited': 0, 'shed': 0})
+            counters[outcome] += 1
+
+    def stats(self):
+        with self._lock:
+            routes = {route: dict(counters) for route, counters in self._counters.items()}
+        return {'settings': self.settings, 'in_flight': self._limiter.in_flight, 'peak_in_flight': self._limiter.peak,
+                'tracked_clients': len(self._buckets), 'routes': routes}
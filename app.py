@@ -1,20 +1,48 @@
 # app.py
 # This is the main Python file for the Flask web server.
 # To run this:
-# 1. Install Flask & Firebase Admin:
-#    pip install Flask firebase-admin
+# 1. Install Flask, Firebase Admin & NumPy:
+#    pip install Flask firebase-admin numpy
 # 2. Place your serviceAccountKey.json in this directory.
 # 3. Create a 'static' folder for CSS and JS files.
 # 4. Run from your terminal: python app.py
 # 5. Open your browser to http://127.0.0.1:5000
+# For the async serving mode (concurrent Firestore reads, live streams), see asgi_app.py.
 
 import os
 import datetime
 import json
-from flask import Flask, render_template, jsonify, request
+import logging
+import threading
+import time
+import math
+import urllib.parse
+import hmac
+import hashlib
+import base64
+import re
+import app_logging
+import admission
+from app_logging import counted, counted_get
+from flask import Flask, render_template, jsonify, request, Response, stream_with_context, g
 import firebase_admin
 from firebase_admin import credentials, firestore
+from google.api_core.exceptions import Conflict
 from version import APP_VERSION
+import lap_import
+import lap_analytics
+import lap_telemetry
+import data_export
+import geo
+import snapshot
+from tracks_replica import TracksReplica
+from track_search import TrackSearchIndex
+from event_intervals import EventIntervalIndex
+from models import Profile, Garage, Vehicle, Event, Checklist, LapTime, Track
+
+# --- Logging ---
+# Records go through a queue to a background writer thread; see app_logging.py.
+log = app_logging.setup_logging()
 
 # --- Firebase Initialization ---
 # Check if the service account key file exists
@@ -30,7 +58,7 @@ cred = credentials.Certificate('serviceAccountKey.json')
 firebase_admin.initialize_app(cred)
 db = firestore.client()
 # --- End Firebase Initialization ---
-print("✅ Firebase Initialized Successfully.")
+log.info("Firebase Initialized Successfully.")
 
 
 # --- App Configuration Loading ---
@@ -40,23 +68,23 @@ def get_app_version():
     default_version = APP_VERSION
     try:
         config_ref = db.collection('config').document('app_info')
-        config_doc = config_ref.get()
+        config_doc = counted_get(config_ref)
         if config_doc.exists:
             version = config_doc.to_dict().get('version')
             # If version is missing or empty in Firestore, use the default
             if not version:
-                print(f"⚠️ Warning: 'version' field in Firestore is empty. Using default version '{default_version}'.")
+                log.warning("'version' field in Firestore is empty. Using default version '%s'.", default_version)
                 return default_version
-            print(f"✅ Loaded app version from Firestore: {version}")
+            log.info("Loaded app version from Firestore: %s", version)
             return version
         else:
-            print(
-                f"⚠️ Warning: 'app_info' document not found in 'config' collection. Using default version '{default_version}'.")
+            log.warning("'app_info' document not found in 'config' collection. Using default version '%s'.",
+                        default_version)
             # Create the setting if it doesn't exist
             config_ref.set({'version': default_version})
             return default_version
     except Exception as e:
-        print(f"❌ Error loading app version from Firestore: {e}. Using default version '{default_version}'.")
+        log.exception("Error loading app version from Firestore: %s. Using default version '%s'.", e, default_version)
         return default_version
 
 
@@ -64,43 +92,56 @@ def get_app_version():
 def get_limit(collection_name, document_name, default_limit):
     try:
         settings_ref = db.collection(collection_name).document(document_name)
-        settings_doc = settings_ref.get()
+        settings_doc = counted_get(settings_ref)
         if settings_doc.exists:
             limit = settings_doc.to_dict().get('limit', default_limit)
-            print(f"✅ Loaded {document_name} limit from Firestore: {limit}")
+            log.info("Loaded %s limit from Firestore: %s", document_name, limit)
             return int(limit)
         else:
-            print(f"⚠️ {document_name} limit setting not found. Defaulting to {default_limit}.")
+            log.warning("%s limit setting not found. Defaulting to %s.", document_name, default_limit)
             settings_ref.set({'limit': default_limit})
             return default_limit
     except Exception as e:
-        print(f"❌ Error getting {document_name} limit: {e}. Defaulting to {default_limit}.")
+        log.exception("Error getting %s limit: %s. Defaulting to %s.", document_name, e, default_limit)
         return default_limit
 
 
 # --- Function to get feature request settings from Firestore ---
+# Cached for FEATURE_REQUEST_SETTINGS_TTL seconds, so changes made through another
+# worker are picked up; update_feature_request_settings clears this worker's copy.
+FEATURE_REQUEST_SETTINGS_TTL = 30
+_feature_request_settings = None
+_feature_request_settings_at = 0
+
+
 def get_feature_request_settings():
     """
     Retrieves feature request settings from admin_settings in Firestore.
     Defaults to deletion disabled and a limit of 3 if not set.
     """
+    global _feature_request_settings, _feature_request_settings_at
+    if (_feature_request_settings is not None
+            and time.monotonic() - _feature_request_settings_at < FEATURE_REQUEST_SETTINGS_TTL):
+        return dict(_feature_request_settings)
     default_settings = {'deletion_enabled': False, 'limit': 3}
     try:
         settings_ref = db.collection('admin_settings').document('feature_requests')
-        settings_doc = settings_ref.get()
+        settings_doc = counted_get(settings_ref)
         if settings_doc.exists:
             settings = settings_doc.to_dict()
             # Ensure both keys exist, falling back to defaults if necessary
             settings['deletion_enabled'] = settings.get('deletion_enabled', default_settings['deletion_enabled'])
             settings['limit'] = int(settings.get('limit', default_settings['limit']))
-            print(f"✅ Loaded feature request settings from Firestore: {settings}")
-            return settings
+            log.info("Loaded feature request settings from Firestore: %s", settings)
+            _feature_request_settings, _feature_request_settings_at = settings, time.monotonic()
+            return dict(settings)
         else:
-            print(f"⚠️ Feature request settings not found. Defaulting to {default_settings}.")
+            log.warning("Feature request settings not found. Defaulting to %s.", default_settings)
             settings_ref.set(default_settings)
-            return default_settings
+            _feature_request_settings, _feature_request_settings_at = default_settings, time.monotonic()
+            return dict(default_settings)
     except Exception as e:
-        print(f"❌ Error getting feature request settings: {e}. Defaulting to {default_settings}.")
+        log.exception("Error getting feature request settings: %s. Defaulting to %s.", e, default_settings)
         return default_settings
 
 
@@ -113,18 +154,18 @@ def get_lap_time_settings():
     default_settings = {'deletion_enabled': False}
     try:
         settings_ref = db.collection('admin_settings').document('lap_times')
-        settings_doc = settings_ref.get()
+        settings_doc = counted_get(settings_ref)
         if settings_doc.exists:
             settings = settings_doc.to_dict()
             settings['deletion_enabled'] = settings.get('deletion_enabled', default_settings['deletion_enabled'])
-            print(f"✅ Loaded lap time settings from Firestore: {settings}")
+            log.info("Loaded lap time settings from Firestore: %s", settings)
             return settings
         else:
-            print(f"⚠️ Lap time settings not found. Defaulting to {default_settings}.")
+            log.warning("Lap time settings not found. Defaulting to %s.", default_settings)
             settings_ref.set(default_settings)
             return default_settings
     except Exception as e:
-        print(f"❌ Error getting lap time settings: {e}. Defaulting to {default_settings}.")
+        log.exception("Error getting lap time settings: %s. Defaulting to %s.", e, default_settings)
         return default_settings
 
 
@@ -137,18 +178,18 @@ def get_garage_settings():
     default_settings = {'deletion_enabled': False}
     try:
         settings_ref = db.collection('admin_settings').document('garages')
-        settings_doc = settings_ref.get()
+        settings_doc = counted_get(settings_ref)
         if settings_doc.exists:
             settings = settings_doc.to_dict()
             settings['deletion_enabled'] = settings.get('deletion_enabled', default_settings['deletion_enabled'])
-            print(f"✅ Loaded garage settings from Firestore: {settings}")
+            log.info("Loaded garage settings from Firestore: %s", settings)
             return settings
         else:
-            print(f"⚠️ Garage settings not found. Defaulting to {default_settings}.")
+            log.warning("Garage settings not found. Defaulting to %s.", default_settings)
             settings_ref.set(default_settings)
             return default_settings
     except Exception as e:
-        print(f"❌ Error getting garage settings: {e}. Defaulting to {default_settings}.")
+        log.exception("Error getting garage settings: %s. Defaulting to %s.", e, default_settings)
         return default_settings
 
 
@@ -157,21 +198,131 @@ def get_maintenance_settings():
     default_settings = {'enabled': False}
     try:
         settings_ref = db.collection('config').document('maintenance')
-        settings_doc = settings_ref.get()
+        settings_doc = counted_get(settings_ref)
         if settings_doc.exists:
             return settings_doc.to_dict()
         else:
             settings_ref.set(default_settings)
             return default_settings
     except Exception as e:
-        print(f"❌ Error getting maintenance settings: {e}")
+        log.exception("Error getting maintenance settings: %s", e)
         return default_settings
 
 
+# --- Function to get admission control settings from Firestore ---
+def get_admission_settings():
+    """
+    Retrieves the rate and concurrency limits for write requests from
+    admin_settings in Firestore. Defaults to admission.DEFAULT_SETTINGS.
+    """
+    try:
+        settings_ref = db.collection('admin_settings').document('admission')
+        settings_doc = counted_get(settings_ref)
+        if settings_doc.exists:
+            settings = admission.validate_settings(settings_doc.to_dict())
+            log.info("Loaded admission settings from Firestore: %s", settings)
+            return settings
+        else:
+            log.warning("Admission settings not found. Defaulting to %s.", admission.DEFAULT_SETTINGS)
+            settings_ref.set(admission.DEFAULT_SETTINGS)
+            return admission.validate_settings({})
+    except Exception as e:
+        log.exception("Error getting admission settings: %s. Using the defaults.", e)
+        return admission.validate_settings({})
+
+
 # Initialize the Flask application
 app = Flask(__name__)
 
 
+# --- Request Logging ---
+# Every request gets one summary record with its status, duration and Firestore
+# read count. Server errors and slow requests are logged as warnings, so they
+# are never sampled away.
+@app.before_request
+def begin_request_log():
+    route = request.url_rule.rule if request.url_rule else request.path
+    g.log_token = app_logging.begin_request(route, request.method, (request.view_args or {}).get('profile_id'))
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def log_request(response):
+    context = app_logging.current_request()
+    if context is not None and 'request_started' in g:
+        duration_ms = round((time.perf_counter() - g.request_started) * 1000, 1)
+        slow = duration_ms >= app_logging.slow_request_ms()
+        level = logging.WARNING if response.status_code >= 500 or slow else logging.INFO
+        log.log(level, "%s %s -> %s in %sms", request.method, context['route'], response.status_code, duration_ms,
+                extra={'status': response.status_code, 'duration_ms': duration_ms, 'reads': context['reads']})
+    return response
+
+
+# --- Conditional GETs ---
+# JSON GET responses carry an ETag so the frontend's data cache (static/js/utils.js)
+# can revalidate with If-None-Match and get an empty 304 when nothing changed.
+# Registered after log_request so the summary record shows the 304.
+@app.after_request
+def add_etag(response):
+    if (request.method == 'GET' and response.status_code == 200 and response.mimetype == 'application/json'
+            and not response.is_streamed):
+        response.add_etag()
+        response.headers['Cache-Control'] = 'no-cache'
+        response.make_conditional(request)
+    return response
+
+
+# --- Admission Control ---
+# Write requests pass a per-client, per-route token bucket and a global limit on
+# concurrent writes before any handler runs; see admission.py. Rejected requests
+# get 429 (rate limited) or 503 (overloaded) with Retry-After.
+WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+ADMISSION_EXEMPT_ROUTES = ('/update-admission-settings',)
+admission_controller = admission.AdmissionController(get_admission_settings)
+
+
+def admission_client():
+    """Identifies who sent the request: the profile in the URL or body, the username, or the address."""
+    profile_id = (request.view_args or {}).get('profile_id')
+    data = request.get_json(silent=True) if request.is_json else None
+    if not profile_id and isinstance(data, dict):
+        profile_id = data.get('profileId')
+        if not profile_id and data.get('username'):
+            return f"user:{data['username']}"
+    if profile_id and isinstance(profile_id, str):
+        return f'profile:{profile_id}'
+    return f'ip:{request.remote_addr}'
+
+
+@app.before_request
+def admit_request():
+    if request.method not in WRITE_METHODS or request.url_rule is None:
+        return None
+    route = request.url_rule.rule
+    if route in ADMISSION_EXEMPT_ROUTES:
+        return None
+    rejection = admission_controller.admit(admission_client(), route)
+    if rejection is None:
+        g.admitted = True
+        return None
+    status, retry_after = rejection
+    message = 'Too many requests. Please slow down.' if status == 429 else 'The server is busy. Please try again.'
+    return jsonify({'success': False, 'message': message}), status, {'Retry-After': str(retry_after)}
+
+
+@app.teardown_request
+def release_admission(exc):
+    if g.pop('admitted', False):
+        admission_controller.release()
+
+
+@app.teardown_request
+def end_request_log(exc):
+    token = g.pop('log_token', None)
+    if token is not None:
+        app_logging.end_request(token)
+
+
 # Define the main route for the application
 @app.route('/')
 def index():
@@ -199,7 +350,7 @@ def index():
 def get_admin_pin():
     try:
         pin_ref = db.collection('config').document('admin_pin')
-        pin_doc = pin_ref.get()
+        pin_doc = counted_get(pin_ref)
         if pin_doc.exists:
             pin = pin_doc.to_dict().get('pin')
             return jsonify({'success': True, 'pin': pin}), 200
@@ -212,39 +363,213 @@ def get_admin_pin():
 
 
 # --- Route to check for and retrieve driver profiles ---
+PROFILE_LIST_FIELDS = ('username', 'helmetColor', 'pinEnabled', 'pin', 'theme')
+
+
 @app.route('/check-profiles', methods=['GET'])
 def check_profiles():
     """
     Checks for driver profiles and returns them if they exist.
     """
     try:
-        profiles_ref = db.collection('driver_profiles').stream()
-        profiles = []
-        for doc in profiles_ref:
-            profile_data = doc.to_dict()
-            profiles.append({
-                'id': doc.id,
-                'username': profile_data.get('username'),
-                'helmetColor': profile_data.get('helmetColor', '#ffffff'),
-                'pinEnabled': profile_data.get('pinEnabled', False),
-                'pin': profile_data.get('pin'),
-                'theme': profile_data.get('theme', 'dark')
-            })
+        profiles = [Profile.from_doc(doc).to_json(PROFILE_LIST_FIELDS)
+                    for doc in counted(db.collection('driver_profiles').stream())]
 
         profile_limit = get_limit('admin_settings', 'profiles', 3)
         limit_reached = len(profiles) >= profile_limit
 
         if profiles:
-            print(f"✅ DB Check: Found {len(profiles)} driver profile(s).")
+            log.info("DB Check: Found %s driver profile(s).", len(profiles))
             return jsonify({'profiles_exist': True, 'profiles': profiles, 'limit_reached': limit_reached}), 200
         else:
-            print("ℹ️ DB Check: No driver profiles found in the system.")
+            log.info("DB Check: No driver profiles found in the system.")
             return jsonify({'profiles_exist': False, 'profiles': [], 'limit_reached': limit_reached}), 200
     except Exception as e:
-        print(f"❌ Error checking profiles: {e}")
+        log.exception("Error checking profiles: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
+# --- Unique Name Reservations ---
+# Usernames and per-profile garage names are kept unique with reservation documents
+# keyed on the normalized name: 'usernames/<key>' and
+# 'driver_profiles/<profile_id>/garage_names/<key>'. A reservation is claimed or
+# released in the same transaction that creates, renames or deletes its owner, so
+# the uniqueness check is a single-key read that holds under concurrent requests.
+class DuplicateNameError(Exception):
+    pass
+
+
+def unique_name_key(name):
+    """Case- and whitespace-insensitive key that is always a valid document ID."""
+    return urllib.parse.quote(name.strip().casefold(), safe='').replace('.', '%2E').replace('_', '%5F')
+
+
+def username_ref(username):
+    return db.collection('usernames').document(unique_name_key(username))
+
+
+def garage_name_ref(profile_id, garage_name):
+    return db.collection('driver_profiles').document(profile_id).collection('garage_names').document(
+        unique_name_key(garage_name))
+
+
+def claim_name(transaction, reservation_ref, owner_field, owner_id, name):
+    """Claims a reservation inside a transaction, or raises DuplicateNameError."""
+    reservation = counted_get(reservation_ref, transaction=transaction)
+    if reservation.exists and reservation.to_dict().get(owner_field) != owner_id:
+        raise DuplicateNameError(name)
+    transaction.set(reservation_ref, {owner_field: owner_id, 'name': name})
+
+
+def release_name(transaction, reservation_ref, owner_field, owner_id):
+    """Releases a reservation inside a transaction if it still belongs to owner_id."""
+    reservation = counted_get(reservation_ref, transaction=transaction)
+    if reservation.exists and reservation.to_dict().get(owner_field) == owner_id:
+        transaction.delete(reservation_ref)
+
+
+@firestore.transactional
+def create_profile_transaction(transaction, profile_ref, profile_data):
+    claim_name(transaction, username_ref(profile_data['username']), 'profileId', profile_ref.id,
+               profile_data['username'])
+    transaction.set(profile_ref, profile_data)
+
+
+@firestore.transactional
+def update_profile_transaction(transaction, profile_ref, updates):
+    if 'username' in updates:
+        profile = counted_get(profile_ref, transaction=transaction)
+        old_username = profile.to_dict().get('username') if profile.exists else None
+        if old_username is None or unique_name_key(old_username) != unique_name_key(updates['username']):
+            new_ref = username_ref(updates['username'])
+            reservation = counted_get(new_ref, transaction=transaction)
+            if reservation.exists and reservation.to_dict().get('profileId') != profile_ref.id:
+                raise DuplicateNameError(updates['username'])
+            if old_username:
+                release_name(transaction, username_ref(old_username), 'profileId', profile_ref.id)
+            transaction.set(new_ref, {'profileId': profile_ref.id, 'name': updates['username']})
+    transaction.update(profile_ref, updates)
+
+
+@firestore.transactional
+def add_garage_transaction(transaction, profile_id, garage_ref, garage_data):
+    claim_name(transaction, garage_name_ref(profile_id, garage_data['name']), 'garageId', garage_ref.id,
+               garage_data['name'])
+    transaction.set(garage_ref, garage_data)
+
+
+@firestore.transactional
+def rename_garage_transaction(transaction, profile_id, garage_ref, new_name):
+    garage = counted_get(garage_ref, transaction=transaction)
+    if not garage.exists:
+        raise KeyError(garage_ref.id)
+    old_name = garage.to_dict().get('name')
+    new_ref = garage_name_ref(profile_id, new_name)
+    if old_name is None or unique_name_key(old_name) != unique_name_key(new_name):
+        reservation = counted_get(new_ref, transaction=transaction)
+        if reservation.exists and reservation.to_dict().get('garageId') != garage_ref.id:
+            raise DuplicateNameError(new_name)
+        if old_name:
+            release_name(transaction, garage_name_ref(profile_id, old_name), 'garageId', garage_ref.id)
+    transaction.set(new_ref, {'garageId': garage_ref.id, 'name': new_name})
+    now = datetime.datetime.now(datetime.timezone.utc)
+    transaction.update(garage_ref, {'name': new_name, 'updated_at': now})
+    if garage.to_dict().get('shared'):
+        # Merged rather than updated, so a missing index entry is recreated instead of failing the rename.
+        transaction.set(shared_garage_ref(profile_id, garage_ref.id), {
+            'ownerId': profile_id,
+            'garageId': garage_ref.id,
+            'name': new_name,
+            'codeVersion': garage.to_dict().get('codeVersion', 0),
+            'updated_at': now
+        }, merge=True)
+
+
+@firestore.transactional
+def delete_garage_transaction(transaction, profile_id, garage_ref):
+    garage = counted_get(garage_ref, transaction=transaction)
+    if garage.exists and garage.to_dict().get('name'):
+        release_name(transaction, garage_name_ref(profile_id, garage.to_dict()['name']), 'garageId', garage_ref.id)
+    transaction.delete(garage_ref)
+    transaction.delete(shared_garage_ref(profile_id, garage_ref.id))
+    transaction.set(garage_ref.parent.parent.collection('tombstones').document(f'garages_{garage_ref.id}'), {
+        'collection': 'garages',
+        'docId': garage_ref.id,
+        'deleted_at': datetime.datetime.now(datetime.timezone.utc)
+    })
+
+
+def create_reservation(reservation_ref, owner_field, owner_id, name):
+    @firestore.transactional
+    def claim(transaction):
+        claim_name(transaction, reservation_ref, owner_field, owner_id, name)
+    claim(db.transaction())
+
+
+def unique_index_marker_ref():
+    return db.collection('config').document('unique_index')
+
+
+def rebuild_unique_index():
+    """
+    Claims reservations for every existing username and garage name (for data
+    created before the reservation index existed). Names already claimed by
+    another owner are returned as conflicts rather than overwritten. Records a
+    marker so ensure_unique_index knows the backfill has run.
+    """
+    conflicts = []
+    for profile in counted(db.collection('driver_profiles').stream()):
+        username = profile.to_dict().get('username')
+        if username:
+            try:
+                create_reservation(username_ref(username), 'profileId', profile.id, username)
+            except DuplicateNameError:
+                conflicts.append({'type': 'username', 'name': username, 'profileId': profile.id})
+        for garage in counted(profile.reference.collection('garages').stream()):
+            name = garage.to_dict().get('name')
+            if name:
+                try:
+                    create_reservation(garage_name_ref(profile.id, name), 'garageId', garage.id, name)
+                except DuplicateNameError:
+                    conflicts.append({'type': 'garage', 'name': name, 'profileId': profile.id, 'garageId': garage.id})
+    unique_index_marker_ref().set({'built_at': datetime.datetime.now(datetime.timezone.utc),
+                                   'conflicts': len(conflicts)})
+    return conflicts
+
+
+def ensure_unique_index():
+    """Runs the backfill once per database: at warm-up, if no earlier run left its marker."""
+    if counted_get(unique_index_marker_ref()).exists:
+        return
+    conflicts = rebuild_unique_index()
+    log.info("Unique name index backfilled with %s conflict(s).", len(conflicts))
+    if conflicts:
+        log.warning("Existing data has %s duplicate name(s): %s", len(conflicts), conflicts)
+
+
+@firestore.transactional
+def delete_profile_transaction(transaction, profile_ref):
+    """Deletes the profile document and releases its username together."""
+    profile = counted_get(profile_ref, transaction=transaction)
+    if profile.exists and profile.to_dict().get('username'):
+        release_name(transaction, username_ref(profile.to_dict()['username']), 'profileId', profile_ref.id)
+    transaction.delete(profile_ref)
+
+
+@app.route('/rebuild-unique-index', methods=['POST'])
+def rebuild_unique_index_route():
+    """
+    Backfills username and garage name reservations for existing data.
+    """
+    try:
+        conflicts = rebuild_unique_index()
+        log.info("Unique name index rebuilt with %s conflict(s).", len(conflicts))
+        return jsonify({'success': True, 'message': 'Unique name index rebuilt.', 'conflicts': conflicts}), 200
+    except Exception as e:
+        log.exception("Error rebuilding unique name index: %s", e)
+        return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
+
+
 # --- Route to create a driver profile ---
 @app.route('/create-profile', methods=['POST'])
 def create_profile():
@@ -254,40 +579,25 @@ def create_profile():
     try:
         # Check against the profile limit first
         profile_limit = get_limit('admin_settings', 'profiles', 3)
-        current_profiles = list(db.collection('driver_profiles').stream())
+        current_profiles = list(counted(db.collection('driver_profiles').stream()))
         if len(current_profiles) >= profile_limit:
             return jsonify({'success': False, 'message': f'Profile limit of {profile_limit} reached.'}), 403
 
-        data = request.get_json()
-        username = data.get('username')
-        helmet_color = data.get('helmetColor', '#ffffff')
-        pin = data.get('pin')
-        pin_enabled = data.get('pinEnabled', False)
-        theme = data.get('theme', 'dark')
-
-        if not username:
-            return jsonify({'success': False, 'message': 'Username is required.'}), 400
-        if len(username) > 12:
-            return jsonify({'success': False, 'message': 'Username cannot exceed 12 characters.'}), 400
-
-        existing_profiles = db.collection('driver_profiles').where('username', '==', username).limit(1).get()
-        if existing_profiles:
-            print(f"⚠️ Attempted to create a duplicate profile for: {username}")
-            return jsonify({'success': False, 'message': f'Username "{username}" is already taken.'}), 409
+        profile = Profile.from_request(request.get_json()).stamp(created=True)
+        username = profile.username
 
         doc_ref = db.collection('driver_profiles').document()
-        doc_ref.set({
-            'username': username,
-            'helmetColor': helmet_color,
-            'pin': pin,
-            'pinEnabled': pin_enabled,
-            'theme': theme,
-            'created_at': datetime.datetime.now(datetime.timezone.utc)
-        })
-        print(f"✅ New driver profile created: {username}")
+        try:
+            create_profile_transaction(db.transaction(), doc_ref, profile.to_document())
+        except DuplicateNameError:
+            log.warning("Attempted to create a duplicate profile for: %s", username)
+            return jsonify({'success': False, 'message': f'Username "{username}" is already taken.'}), 409
+        log.info("New driver profile created: %s", username)
         return jsonify({'success': True, 'message': f'Profile for {username} created successfully!'}), 201
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
-        print(f"❌ Error creating profile: {e}")
+        log.exception("Error creating profile: %s", e)
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
 
@@ -298,30 +608,24 @@ def update_profile(profile_id):
     Updates a driver profile's username and/or helmet color in Firestore.
     """
     try:
-        data = request.get_json()
-        updates = {}
-        if 'username' in data:
-            new_username = data['username']
-            if len(new_username) > 12:
-                return jsonify({'success': False, 'message': 'Username cannot exceed 12 characters.'}), 400
-            updates['username'] = new_username
-        if 'helmetColor' in data:
-            updates['helmetColor'] = data['helmetColor']
-        if 'pin' in data:
-            updates['pin'] = data['pin']
-        if 'pinEnabled' in data:
-            updates['pinEnabled'] = data['pinEnabled']
-        if 'theme' in data:
-            updates['theme'] = data['theme']
+        updates = Profile.validate_patch(request.get_json())
 
         if not profile_id or not updates:
             return jsonify({'success': False, 'message': 'Profile ID and update data are required.'}), 400
 
-        db.collection('driver_profiles').document(profile_id).update(updates)
-        print(f"✅ Driver profile updated: {profile_id} with {updates}")
+        updates['updated_at'] = datetime.datetime.now(datetime.timezone.utc)
+        try:
+            update_profile_transaction(db.transaction(), db.collection('driver_profiles').document(profile_id), updates)
+        except DuplicateNameError:
+            return jsonify({'success': False, 'message': f'Username "{updates["username"]}" is already taken.'}), 409
+        if 'username' in updates:
+            update_shared_garage_owner(profile_id, updates['username'])
+        log.info("Driver profile updated: %s", profile_id, extra={'data': {'fields': sorted(updates)}})
         return jsonify({'success': True, 'message': 'Profile updated successfully!'}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
-        print(f"❌ Error updating profile: {e}")
+        log.exception("Error updating profile: %s", e)
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
 
@@ -336,20 +640,20 @@ def verify_pin(profile_id):
         submitted_pin = data.get('pin')
 
         doc_ref = db.collection('driver_profiles').document(profile_id)
-        doc = doc_ref.get()
+        doc = counted_get(doc_ref)
 
         if not doc.exists:
             return jsonify({'success': False, 'message': 'Profile not found.'}), 404
 
         stored_pin = doc.to_dict().get('pin')
         if stored_pin == submitted_pin:
-            print(f"✅ PIN verified for profile: {profile_id}")
+            log.info("PIN verified for profile: %s", profile_id)
             return jsonify({'success': True}), 200
         else:
-            print(f"❌ PIN verification failed for profile: {profile_id}")
+            log.error("PIN verification failed for profile: %s", profile_id)
             return jsonify({'success': False, 'message': 'Incorrect PIN.'}), 401
     except Exception as e:
-        print(f"❌ Error verifying PIN: {e}")
+        log.exception("Error verifying PIN: %s", e)
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
 
@@ -366,48 +670,382 @@ def delete_profile(profile_id):
         profile_ref = db.collection('driver_profiles').document(profile_id)
 
         # Delete subcollections
-        for collection in ['garages', 'vehicles', 'events', 'checklists', 'tracks']:
-            docs = profile_ref.collection(collection).stream()
+        delete_shared_garages_for_owner(profile_id)
+        for collection in ['garages', 'vehicles', 'events', 'checklists', 'tracks', 'tombstones', 'garage_names',
+                           'unlocked_garages']:
+            docs = counted(profile_ref.collection(collection).stream())
             for doc in docs:
                 doc.reference.delete()
-            print(f"✅ Deleted {collection} for profile {profile_id}")
+                if collection == 'events':
+                    unindex_event(doc.id)
+            log.info("Deleted %s for profile %s", collection, profile_id)
 
-        # Delete the main profile document
-        profile_ref.delete()
-        print(f"✅ Driver profile deleted: {profile_id}")
+        # Delete the main profile document last, releasing its username in the same
+        # transaction, so a failure above leaves the profile and its name together.
+        delete_profile_transaction(db.transaction(), profile_ref)
+        log.info("Driver profile deleted: %s", profile_id)
 
         return jsonify({'success': True, 'message': 'Profile and all associated data deleted successfully!'}), 200
     except Exception as e:
-        print(f"❌ Error deleting profile: {e}")
+        log.exception("Error deleting profile: %s", e)
+        return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
+
+
+# --- Readiness Check Retention ---
+# Every readiness check is counted into a per-day rollup doc in
+# 'readiness_rollups' ({date, total, users: {name: n}, versions: {version: n}})
+# as it is written, so usage stats never scan the raw checks. A background
+# compactor deletes raw checks older than the configured retention period.
+DEFAULT_READINESS_SETTINGS = {'retention_days': 90}
+READINESS_COMPACT_INTERVAL = 6 * 60 * 60
+READINESS_COMPACT_PAGE = 200
+_readiness_compactor_started = False
+_readiness_compactor_lock = threading.Lock()
+
+
+def get_readiness_settings():
+    """
+    Retrieves readiness check settings from admin_settings in Firestore.
+    Defaults to keeping raw checks for 90 days if not set.
+    """
+    try:
+        settings_ref = db.collection('admin_settings').document('readiness_checks')
+        settings_doc = counted_get(settings_ref)
+        if settings_doc.exists:
+            settings = {**DEFAULT_READINESS_SETTINGS, **settings_doc.to_dict()}
+            settings['retention_days'] = int(settings['retention_days'])
+            return settings
+        log.warning("Readiness check settings not found. Defaulting to %s.", DEFAULT_READINESS_SETTINGS)
+        settings_ref.set(DEFAULT_READINESS_SETTINGS)
+        return dict(DEFAULT_READINESS_SETTINGS)
+    except Exception as e:
+        log.exception("Error getting readiness check settings: %s. Defaulting to %s.", e, DEFAULT_READINESS_SETTINGS)
+        return dict(DEFAULT_READINESS_SETTINGS)
+
+
+def readiness_rollup_ref(day):
+    return db.collection('readiness_rollups').document(day)
+
+
+def readiness_rollup_update(day, total, users, versions):
+    """Builds a merge write adding the given counts to one day's rollup."""
+    return {
+        'date': day,
+        'total': firestore.Increment(total),
+        'users': {name: firestore.Increment(count) for name, count in users.items()},
+        'versions': {version: firestore.Increment(count) for version, count in versions.items()},
+        'updated_at': datetime.datetime.now(datetime.timezone.utc)
+    }
+
+
+def add_checks_to_rollups(batch, checks):
+    """Adds one rollup write per day covered by the given raw check dicts to a batch or transaction."""
+    days = {}
+    for check in checks:
+        timestamp = check.get('timestamp') or datetime.datetime.now(datetime.timezone.utc)
+        counts = days.setdefault(timestamp.strftime('%Y-%m-%d'), {'total': 0, 'users': {}, 'versions': {}})
+        counts['total'] += 1
+        username = check.get('username') or 'Unknown'
+        version = check.get('app_version') or 'unknown'
+        counts['users'][username] = counts['users'].get(username, 0) + 1
+        counts['versions'][version] = counts['versions'].get(version, 0) + 1
+    for day, counts in days.items():
+        batch.set(readiness_rollup_ref(day), readiness_rollup_update(day, **counts), merge=True)
+
+
+def rollup_legacy_readiness_checks(cutoff):
+    """
+    One-time pass over checks written before rollups existed: counts them, then
+    deletes the expired ones and marks the rest as rolled up.
+    """
+    processed = 0
+    pending = []
+    for doc in counted(db.collection('readiness_checks').stream()):
+        if not doc.to_dict().get('rolled_up'):
+            pending.append(doc)
+        if len(pending) >= READINESS_COMPACT_PAGE:
+            processed += compact_readiness_page_transaction(db.transaction(), [doc.reference for doc in pending], cutoff)
+            pending = []
+    if pending:
+        processed += compact_readiness_page_transaction(db.transaction(), [doc.reference for doc in pending], cutoff)
+    db.collection('admin_settings').document('readiness_checks').set({'legacy_rolled_up': True}, merge=True)
+    return processed
+
+
+@firestore.transactional
+def compact_readiness_page_transaction(transaction, refs, cutoff):
+    """
+    Counts one page of raw checks into the rollups, then deletes the expired ones
+    and marks the rest as rolled up. The checks are re-read in the transaction, so
+    one that another worker compacts at the same time is never counted twice.
+    Returns the number of checks deleted or marked.
+    """
+    checks = [doc for doc in counted(db.get_all(refs, transaction=transaction)) if doc.exists]
+    unrolled = [doc.to_dict() for doc in checks if not doc.to_dict().get('rolled_up')]
+    if unrolled:
+        add_checks_to_rollups(transaction, unrolled)
+    for doc in checks:
+        check = doc.to_dict()
+        timestamp = check.get('timestamp')
+        if timestamp is not None and timestamp < cutoff:
+            transaction.delete(doc.reference)
+        elif not check.get('rolled_up'):
+            transaction.update(doc.reference, {'rolled_up': True})
+    return len(checks)
+
+
+def compact_readiness_checks():
+    """Deletes raw checks past the retention period in batches. Returns counts for logging."""
+    settings = get_readiness_settings()
+    cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=settings['retention_days'])
+    legacy = 0
+    if not settings.get('legacy_rolled_up'):
+        legacy = rollup_legacy_readiness_checks(cutoff)
+
+    deleted = 0
+    expired = db.collection('readiness_checks').where('timestamp', '<', cutoff).limit(READINESS_COMPACT_PAGE)
+    while True:
+        docs = list(counted(expired.stream()))
+        if not docs:
+            break
+        deleted += compact_readiness_page_transaction(db.transaction(), [doc.reference for doc in docs], cutoff)
+    return {'legacy_rolled_up': legacy, 'deleted': deleted, 'retention_days': settings['retention_days']}
+
+
+def _run_readiness_compactor():
+    while True:
+        try:
+            result = compact_readiness_checks()
+            log.info("Readiness check compaction finished: %s", result)
+        except Exception as e:
+            log.exception("Error compacting readiness checks: %s", e)
+        time.sleep(READINESS_COMPACT_INTERVAL)
+
+
+def start_readiness_compactor():
+    """Starts the background compactor once per process."""
+    global _readiness_compactor_started
+    with _readiness_compactor_lock:
+        if _readiness_compactor_started:
+            return
+        _readiness_compactor_started = True
+    threading.Thread(target=_run_readiness_compactor, name='readiness-compactor', daemon=True).start()
+
+
+@app.route('/compact-readiness-checks', methods=['POST'])
+def compact_readiness_checks_route():
+    """
+    Runs the readiness check compaction now instead of waiting for the next cycle.
+    """
+    try:
+        result = compact_readiness_checks()
+        log.info("Readiness check compaction finished: %s", result)
+        return jsonify({'success': True, 'message': f"Deleted {result['deleted']} expired check(s).", **result}), 200
+    except Exception as e:
+        log.exception("Error compacting readiness checks: %s", e)
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
 
+@app.route('/update-readiness-settings', methods=['POST'])
+def update_readiness_settings():
+    """
+    Updates how many days raw readiness checks are kept.
+    """
+    try:
+        data = request.get_json()
+        try:
+            retention_days = int(data.get('retention_days'))
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'message': 'Retention days must be a number.'}), 400
+        if not 1 <= retention_days <= 3650:
+            return jsonify({'success': False, 'message': 'Retention days must be between 1 and 3650.'}), 400
+
+        db.collection('admin_settings').document('readiness_checks').set({'retention_days': retention_days},
+                                                                         merge=True)
+        log.info("Readiness check retention set to %s days.", retention_days)
+        return jsonify({'success': True, 'message': 'Readiness check settings updated.'}), 200
+    except Exception as e:
+        log.exception("Error updating readiness check settings: %s", e)
+        return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
+
+
+@app.route('/readiness-stats', methods=['GET'])
+def get_readiness_stats():
+    """
+    Summarises readiness checks per day, user and app version from the rollups.
+    'from' and 'to' are YYYY-MM-DD dates (default: the last 30 days); 'username'
+    narrows the daily counts to one driver.
+    """
+    try:
+        today = datetime.datetime.now(datetime.timezone.utc).date()
+        date_from = request.args.get('from', (today - datetime.timedelta(days=29)).isoformat())
+        date_to = request.args.get('to', today.isoformat())
+        username = request.args.get('username')
+        try:
+            datetime.date.fromisoformat(date_from)
+            datetime.date.fromisoformat(date_to)
+        except ValueError:
+            return jsonify({'success': False, 'message': 'from and to must be YYYY-MM-DD dates.'}), 400
+
+        rollups = counted(db.collection('readiness_rollups').where('date', '>=', date_from) \
+            .where('date', '<=', date_to).order_by('date').stream())
+        days, users, versions, total = [], {}, {}, 0
+        for doc in rollups:
+            rollup = doc.to_dict()
+            day_users = rollup.get('users', {})
+            day_total = day_users.get(username, 0) if username else rollup.get('total', 0)
+            days.append({'date': rollup['date'], 'total': day_total})
+            total += day_total
+            for name, count in day_users.items():
+                users[name] = users.get(name, 0) + count
+            if not username:
+                for version, count in rollup.get('versions', {}).items():
+                    versions[version] = versions.get(version, 0) + count
+
+        stats = {'from': date_from, 'to': date_to, 'total': total, 'days': days}
+        if username:
+            stats['username'] = username
+        else:
+            stats['users'] = dict(sorted(users.items(), key=lambda item: -item[1]))
+            stats['versions'] = versions
+        start_readiness_compactor()
+        return jsonify({'success': True, 'stats': stats}), 200
+    except Exception as e:
+        log.exception("Error getting readiness stats: %s", e)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 # --- Route to handle readiness check ---
 @app.route('/get-ready', methods=['POST'])
 def get_ready():
     """
-    Logs a readiness check for a selected driver profile.
+    Logs a readiness check for a selected driver profile and counts it in that day's rollup.
     """
     try:
         data = request.get_json()
         username = data.get('username', 'Anonymous Readiness Check')  # Default username
         app_version = get_app_version()
+        now = datetime.datetime.now(datetime.timezone.utc)
 
-        print(f"LOG: '{username}' is getting ready. Writing to Firestore...")
+        log.info("'%s' is getting ready. Writing to Firestore...", username)
         doc_ref = db.collection('readiness_checks').document()
-        doc_ref.set({
+        batch = db.batch()
+        batch.set(doc_ref, {
             'username': username,
-            'timestamp': datetime.datetime.now(datetime.timezone.utc),
+            'timestamp': now,
             'status': 'Ready!',
-            'app_version': app_version
+            'app_version': app_version,
+            'rolled_up': True
         })
-        print(f"✅ Successfully wrote to Firestore for {username}. Document ID: {doc_ref.id}")
+        day = now.strftime('%Y-%m-%d')
+        batch.set(readiness_rollup_ref(day), readiness_rollup_update(day, 1, {username: 1}, {app_version or 'unknown': 1}),
+                  merge=True)
+        batch.commit()
+        start_readiness_compactor()
+        log.info("Successfully wrote to Firestore for %s. Document ID: %s", username, doc_ref.id)
         return jsonify({'success': True, 'message': f'{username} is now Raceday Ready!'}), 200
     except Exception as e:
-        print(f"❌ Error writing to Firestore: {e}")
+        log.exception("Error writing to Firestore: %s", e)
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
 
+# --- Feature Request Feed ---
+# The feed is paginated by cursor and each page is cached in memory until this
+# worker submits or deletes a request, or for FEATURE_REQUEST_PAGE_TTL seconds so
+# other workers' changes show up. The number of requests is kept in a counter
+# document, so the limit check no longer reads the whole collection.
+FEATURE_REQUEST_PAGE_SIZE = 20
+FEATURE_REQUEST_PAGE_LIMIT = 100
+FEATURE_REQUEST_PAGE_TTL = 30
+
+_feature_request_pages = {}
+_feature_request_lock = threading.Lock()
+
+
+def feature_request_count_ref():
+    return db.collection('counters').document('feature_requests')
+
+
+def invalidate_feature_requests():
+    with _feature_request_lock:
+        _feature_request_pages.clear()
+
+
+def get_feature_request_count():
+    """Reads the maintained count, creating it from the collection the first time."""
+    count_doc = counted_get(feature_request_count_ref())
+    if count_doc.exists:
+        return int(count_doc.to_dict().get('count', 0))
+    count = sum(1 for _ in counted(db.collection('feature_requests').select([]).stream()))
+    feature_request_count_ref().set({'count': count})
+    log.info("Feature request counter initialised at %s.", count)
+    return count
+
+
+@firestore.transactional
+def submit_feature_request_transaction(transaction, request_ref, request_data, limit):
+    count_doc = counted_get(feature_request_count_ref(), transaction=transaction)
+    count = int(count_doc.to_dict().get('count', 0)) if count_doc.exists else None
+    if count is None:
+        count = sum(1 for _ in counted(db.collection('feature_requests').select([]).stream()))
+    if count >= limit:
+        raise PermissionError(f"Feature request limit of {limit} reached.")
+    transaction.set(request_ref, request_data)
+    transaction.set(feature_request_count_ref(), {'count': count + 1})
+
+
+@firestore.transactional
+def delete_feature_request_transaction(transaction, request_ref):
+    request_doc = counted_get(request_ref, transaction=transaction)
+    count_doc = counted_get(feature_request_count_ref(), transaction=transaction)
+    if not request_doc.exists:
+        return False
+    transaction.delete(request_ref)
+    if count_doc.exists:
+        count = int(count_doc.to_dict().get('count', 0))
+        transaction.set(feature_request_count_ref(), {'count': max(0, count - 1)})
+    return True
+
+
+def load_feature_request_page(cursor, limit):
+    """Returns (requests, next_cursor) for one page, newest first. Raises LookupError if the cursor is gone."""
+    cache_key = (cursor, limit)
+    with _feature_request_lock:
+        cached = _feature_request_pages.get(cache_key)
+    if cached is not None and time.monotonic() - cached[1] < FEATURE_REQUEST_PAGE_TTL:
+        return cached[0]
+
+    query = db.collection('feature_requests').order_by('submitted_at', direction=firestore.Query.DESCENDING)
+    if cursor:
+        cursor_doc = counted_get(db.collection('feature_requests').document(cursor))
+        if not cursor_doc.exists:
+            raise LookupError('The cursor feature request no longer exists.')
+        query = query.start_after(cursor_doc)
+    # One extra request tells us whether there is another page.
+    docs = list(counted(query.limit(limit + 1).stream()))
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = docs[-1].id
+
+    requests = []
+    for doc in docs:
+        request_data = doc.to_dict()
+        requests.append({
+            'id': doc.id,
+            'username': request_data.get('username'),
+            'requestText': request_data.get('requestText')
+        })
+    page = (requests, next_cursor)
+    now = time.monotonic()
+    with _feature_request_lock:
+        for key in [key for key, (_, cached_at) in _feature_request_pages.items()
+                    if now - cached_at >= FEATURE_REQUEST_PAGE_TTL]:
+            del _feature_request_pages[key]
+        _feature_request_pages[cache_key] = (page, now)
+    return page
+
+
 # --- Route to submit a feature request ---
 @app.route('/submit-feature-request', methods=['POST'])
 def submit_feature_request():
@@ -415,12 +1053,6 @@ def submit_feature_request():
     Saves a new feature request to Firestore.
     """
     try:
-        # Check against the feature request limit
-        settings = get_feature_request_settings()
-        current_requests = list(db.collection('feature_requests').stream())
-        if len(current_requests) >= settings['limit']:
-            return jsonify({'success': False, 'message': f"Feature request limit of {settings['limit']} reached."}), 403
-
         data = request.get_json()
         username = data.get('username')
         request_text = data.get('requestText')
@@ -430,16 +1062,21 @@ def submit_feature_request():
         if len(request_text) > 500:
             return jsonify({'success': False, 'message': 'Feature request cannot exceed 500 characters.'}), 400
 
+        # The limit is checked against the counter in the same transaction that adds the request.
+        settings = get_feature_request_settings()
         doc_ref = db.collection('feature_requests').document()
-        doc_ref.set({
+        submit_feature_request_transaction(db.transaction(), doc_ref, {
             'username': username,
             'requestText': request_text,
             'submitted_at': datetime.datetime.now(datetime.timezone.utc)
-        })
-        print(f"✅ New feature request submitted by {username}")
+        }, settings['limit'])
+        invalidate_feature_requests()
+        log.info("New feature request submitted by %s", username)
         return jsonify({'success': True, 'message': 'Your feature request has been submitted!'}), 201
+    except PermissionError as e:
+        return jsonify({'success': False, 'message': str(e)}), 403
     except Exception as e:
-        print(f"❌ Error submitting feature request: {e}")
+        log.exception("Error submitting feature request: %s", e)
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
 
@@ -447,34 +1084,34 @@ def submit_feature_request():
 @app.route('/get-feature-requests', methods=['GET'])
 def get_feature_requests():
     """
-    Retrieves all feature requests from Firestore, ordered by submission time.
+    Retrieves one page of feature requests, newest first.
+    Optional query parameters: limit (page size) and cursor (the nextCursor of the previous page).
     """
     try:
-        requests_ref = db.collection('feature_requests').order_by(
-            'submitted_at', direction=firestore.Query.DESCENDING
-        ).stream()
-
-        requests = []
-        for doc in requests_ref:
-            request_data = doc.to_dict()
-            requests.append({
-                'id': doc.id,
-                'username': request_data.get('username'),
-                'requestText': request_data.get('requestText')
-            })
+        limit = request.args.get('limit', FEATURE_REQUEST_PAGE_SIZE, type=int)
+        if not 1 <= limit <= FEATURE_REQUEST_PAGE_LIMIT:
+            raise ValueError(f'limit must be between 1 and {FEATURE_REQUEST_PAGE_LIMIT}.')
+        try:
+            requests, next_cursor = load_feature_request_page(request.args.get('cursor'), limit)
+        except LookupError as e:
+            return jsonify({'success': False, 'message': str(e)}), 410
 
         settings = get_feature_request_settings()
-        limit_reached = len(requests) >= settings['limit']
+        count = get_feature_request_count()
 
-        print(f"✅ DB Check: Found {len(requests)} feature request(s).")
+        log.info("DB Check: Returning %s of %s feature request(s).", len(requests), count)
         return jsonify({
             'success': True,
             'requests': requests,
+            'nextCursor': next_cursor,
+            'count': count,
             'deletion_enabled': settings['deletion_enabled'],
-            'limit_reached': limit_reached
+            'limit_reached': count >= settings['limit']
         }), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
-        print(f"❌ Error getting feature requests: {e}")
+        log.exception("Error getting feature requests: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -488,11 +1125,13 @@ def delete_feature_request(request_id):
         if not request_id:
             return jsonify({'success': False, 'message': 'Request ID is required.'}), 400
 
-        db.collection('feature_requests').document(request_id).delete()
-        print(f"✅ Feature request deleted: {request_id}")
+        if not delete_feature_request_transaction(db.transaction(), db.collection('feature_requests').document(request_id)):
+            return jsonify({'success': False, 'message': 'Feature request not found.'}), 404
+        invalidate_feature_requests()
+        log.info("Feature request deleted: %s", request_id)
         return jsonify({'success': True, 'message': 'Feature request deleted successfully!'}), 200
     except Exception as e:
-        print(f"❌ Error deleting feature request: {e}")
+        log.exception("Error deleting feature request: %s", e)
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
 
@@ -518,6 +1157,37 @@ def get_admin_settings():
     }), 200
 
 
+@app.route('/admission-stats', methods=['GET'])
+def get_admission_stats():
+    """
+    Reports the admission limits in effect, writes in progress and, per route,
+    how many requests were admitted, rate limited (429) or shed (503).
+    """
+    return jsonify({'success': True, 'admission': admission_controller.stats()}), 200
+
+
+@app.route('/update-admission-settings', methods=['POST'])
+def update_admission_settings():
+    """
+    Updates the admission control settings in Firestore. Keys left out keep
+    their current values; 'routes' replaces the per-route overrides.
+    """
+    try:
+        data = request.get_json()
+        if not isinstance(data, dict) or not data:
+            return jsonify({'success': False, 'message': 'No settings to update.'}), 400
+        settings = admission.validate_settings({**admission_controller.settings, **data})
+        db.collection('admin_settings').document('admission').set(settings)
+        admission_controller.reload()
+        log.info("Admission settings updated: %s", data)
+        return jsonify({'success': True, 'message': 'Admission settings updated.', 'settings': settings}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        log.exception("Error updating admission settings: %s", e)
+        return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
+
+
 def update_limit(collection_name, document_name, min_val, max_val):
     try:
         data = request.get_json()
@@ -535,10 +1205,10 @@ def update_limit(collection_name, document_name, min_val, max_val):
             return jsonify({'success': False, 'message': f'Limit must be between {min_val} and {max_val}.'}), 400
 
         db.collection(collection_name).document(document_name).set({'limit': new_limit})
-        print(f"✅ {document_name.capitalize()} limit updated to: {new_limit}")
+        log.info("%s limit updated to: %s", document_name.capitalize(), new_limit)
         return jsonify({'success': True, 'message': f'{document_name.capitalize()} limit updated to {new_limit}.'}), 200
     except Exception as e:
-        print(f"❌ Error updating {document_name} limit: {e}")
+        log.exception("Error updating %s limit: %s", document_name, e)
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
 
@@ -562,6 +1232,7 @@ def update_feature_request_settings():
     """
     Updates the feature request settings in Firestore.
     """
+    global _feature_request_settings
     try:
         data = request.get_json()
         new_limit = data.get('limit')
@@ -586,10 +1257,11 @@ def update_feature_request_settings():
             return jsonify({'success': False, 'message': 'No settings to update.'}), 400
 
         db.collection('admin_settings').document('feature_requests').update(updates)
-        print(f"✅ Feature request settings updated: {updates}")
+        _feature_request_settings = None
+        log.info("Feature request settings updated: %s", updates)
         return jsonify({'success': True, 'message': 'Feature request settings updated.'}), 200
     except Exception as e:
-        print(f"❌ Error updating feature request settings: {e}")
+        log.exception("Error updating feature request settings: %s", e)
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
 
@@ -611,10 +1283,10 @@ def update_lap_time_settings():
             return jsonify({'success': False, 'message': 'No settings to update.'}), 400
 
         db.collection('admin_settings').document('lap_times').update(updates)
-        print(f"✅ Lap time settings updated: {updates}")
+        log.info("Lap time settings updated: %s", updates)
         return jsonify({'success': True, 'message': 'Lap time settings updated.'}), 200
     except Exception as e:
-        print(f"❌ Error updating lap time settings: {e}")
+        log.exception("Error updating lap time settings: %s", e)
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
 
@@ -636,10 +1308,10 @@ def update_garage_settings():
             return jsonify({'success': False, 'message': 'No settings to update.'}), 400
 
         db.collection('admin_settings').document('garages').update(updates)
-        print(f"✅ Garage settings updated: {updates}")
+        log.info("Garage settings updated: %s", updates)
         return jsonify({'success': True, 'message': 'Garage settings updated.'}), 200
     except Exception as e:
-        print(f"❌ Error updating garage settings: {e}")
+        log.exception("Error updating garage settings: %s", e)
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
 
@@ -658,6 +1330,285 @@ def update_maintenance_mode():
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
 
+# --- Field-Mask (PATCH) Updates ---
+def apply_patch(doc_ref, data, fields, array_fields=(), required=(), extra=None):
+    """
+    Writes only the fields present in a PATCH body. 'fields' maps request keys to
+    document fields. Array fields take either a full replacement list or
+    {'add': [...], 'remove': [...]}, applied with ArrayUnion/ArrayRemove so
+    concurrent edits to other elements of the same array are kept. 'extra' holds
+    derived document fields written alongside the patch.
+    Raises ValueError for an invalid body. Returns the document fields written.
+    """
+    updates, removals = {}, {}
+    for key, field in fields.items():
+        if key not in data:
+            continue
+        value = data[key]
+        if key in required and not value:
+            raise ValueError(f'{key} cannot be empty.')
+        if field in array_fields and isinstance(value, dict):
+            if set(value) - {'add', 'remove'}:
+                raise ValueError(f"{key} only supports 'add' and 'remove'.")
+            if value.get('remove'):
+                removals[field] = firestore.ArrayRemove(list(value['remove']))
+            if value.get('add'):
+                updates[field] = firestore.ArrayUnion(list(value['add']))
+        elif field in array_fields and not isinstance(value, list):
+            raise ValueError(f'{key} must be a list.')
+        else:
+            updates[field] = value
+
+    if not updates and not removals:
+        raise ValueError('No fields to update.')
+
+    updates.update(extra or {})
+    # Firestore allows one transform per field in a single write, so removals go
+    # first in their own write; both writes commit atomically in one batch.
+    updates['updated_at'] = datetime.datetime.now(datetime.timezone.utc)
+    if removals:
+        batch = db.batch()
+        batch.update(doc_ref, removals)
+        batch.update(doc_ref, updates)
+        batch.commit()
+    else:
+        doc_ref.update(updates)
+    return sorted(set(updates) | set(removals))
+
+
+# --- Shared Garage Index ---
+# Shared garages are listed in a top-level 'shared_garages' collection (one doc
+# per garage, without the door code) so other drivers can find them without
+# scanning every profile. Each profile keeps the garages it has unlocked in an
+# 'unlocked_garages' subcollection. Changing a door code bumps codeVersion,
+# which locks the garage again for everyone who unlocked it with the old code.
+def shared_garage_key(owner_id, garage_id):
+    return f'{owner_id}_{garage_id}'
+
+
+def shared_garage_ref(owner_id, garage_id):
+    return db.collection('shared_garages').document(shared_garage_key(owner_id, garage_id))
+
+
+def unlocked_garage_ref(profile_id, owner_id, garage_id):
+    return db.collection('driver_profiles').document(profile_id).collection('unlocked_garages').document(
+        shared_garage_key(owner_id, garage_id))
+
+
+@firestore.transactional
+def share_garage_transaction(transaction, profile_id, garage_ref, shared, code):
+    garage = counted_get(garage_ref, transaction=transaction)
+    if not garage.exists:
+        raise KeyError(garage_ref.id)
+    profile = counted_get(db.collection('driver_profiles').document(profile_id), transaction=transaction)
+    garage_data = garage.to_dict()
+    now = datetime.datetime.now(datetime.timezone.utc)
+    index_ref = shared_garage_ref(profile_id, garage_ref.id)
+    if not shared:
+        transaction.update(garage_ref, {'shared': False, 'updated_at': now})
+        transaction.delete(index_ref)
+        return
+
+    if not code:
+        raise ValueError('A garage door code is required to share a garage.')
+    code_version = garage_data.get('codeVersion', 0)
+    if not garage_data.get('shared') or garage_data.get('garageDoorCode') != code:
+        code_version += 1
+    transaction.update(garage_ref, {'shared': True, 'garageDoorCode': code, 'codeVersion': code_version,
+                                    'updated_at': now})
+    transaction.set(index_ref, {
+        'ownerId': profile_id,
+        'ownerUsername': profile.to_dict().get('username') if profile.exists else None,
+        'garageId': garage_ref.id,
+        'name': garage_data.get('name'),
+        'codeVersion': code_version,
+        'updated_at': now
+    })
+
+
+def update_shared_garage_owner(profile_id, username):
+    """Copies a renamed owner's username onto their shared garage index entries."""
+    batch = db.batch()
+    count = 0
+    for doc in counted(db.collection('shared_garages').where('ownerId', '==', profile_id).stream()):
+        batch.update(doc.reference, {'ownerUsername': username})
+        count += 1
+    if count:
+        batch.commit()
+
+
+def delete_shared_garages_for_owner(profile_id):
+    for doc in counted(db.collection('shared_garages').where('ownerId', '==', profile_id).stream()):
+        doc.reference.delete()
+
+
+def valid_unlocks(profile_id):
+    """
+    Returns {index_key: shared garage entry} for the garages a profile has
+    unlocked with their current door code, deleting unlocks that no longer apply.
+    """
+    unlocked = list(counted(
+        db.collection('driver_profiles').document(profile_id).collection('unlocked_garages').stream()))
+    if not unlocked:
+        return {}
+    entries = counted(db.get_all([db.collection('shared_garages').document(doc.id) for doc in unlocked]))
+    entries = {doc.id: doc.to_dict() for doc in entries if doc.exists}
+    valid = {}
+    for doc in unlocked:
+        entry = entries.get(doc.id)
+        if entry is not None and entry.get('codeVersion') == doc.to_dict().get('codeVersion'):
+            valid[doc.id] = entry
+        else:
+            doc.reference.delete()
+    return valid
+
+
+def shared_garage_vehicles(entry):
+    vehicles_ref = counted(db.collection('driver_profiles').document(entry['ownerId']).collection('vehicles') \
+        .where('garageId', '==', entry['garageId']).stream())
+    vehicles = []
+    for doc in vehicles_ref:
+        vehicle = doc.to_dict()
+        vehicle['id'] = doc.id
+        vehicle['ownerId'] = entry['ownerId']
+        vehicle['ownerUsername'] = entry.get('ownerUsername')
+        vehicles.append(vehicle)
+    return vehicles
+
+
+@app.route('/get-shared-garages/<profile_id>', methods=['GET'])
+def get_shared_garages(profile_id):
+    """
+    Lists garages other drivers have shared. Vehicles are only read and returned
+    for the garages this profile has unlocked.
+    """
+    try:
+        unlocked = valid_unlocks(profile_id)
+        garages = []
+        for doc in counted(db.collection('shared_garages').stream()):
+            entry = doc.to_dict()
+            if entry.get('ownerId') == profile_id:
+                continue
+            is_unlocked = doc.id in unlocked
+            garages.append({
+                'id': entry['garageId'],
+                'ownerId': entry['ownerId'],
+                'ownerUsername': entry.get('ownerUsername'),
+                'name': entry.get('name'),
+                'unlocked': is_unlocked,
+                'vehicles': shared_garage_vehicles(entry) if is_unlocked else []
+            })
+        garages.sort(key=lambda g: ((g['ownerUsername'] or '').casefold(), (g['name'] or '').casefold()))
+        return jsonify({'success': True, 'garages': garages}), 200
+    except Exception as e:
+        log.exception("Error getting shared garages: %s", e)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/verify-garage-code/<owner_id>/<garage_id>', methods=['POST'])
+def verify_garage_code(owner_id, garage_id):
+    """
+    Checks a shared garage's door code and, if it matches, records the garage as
+    unlocked for the requesting profile.
+    """
+    try:
+        data = request.get_json()
+        profile_id = data.get('profileId')
+        code = str(data.get('code') or '').strip()
+        if not profile_id or not code:
+            return jsonify({'success': False, 'message': 'Profile ID and code are required.'}), 400
+
+        garage_doc = counted_get(db.collection('driver_profiles').document(owner_id).collection('garages').document(
+            garage_id))
+        if not garage_doc.exists or not garage_doc.to_dict().get('shared'):
+            return jsonify({'success': False, 'message': 'This garage is not shared.'}), 404
+        garage = garage_doc.to_dict()
+        if not hmac.compare_digest(code, str(garage.get('garageDoorCode', ''))):
+            return jsonify({'success': False, 'message': 'Incorrect garage door code.'}), 403
+
+        unlocked_garage_ref(profile_id, owner_id, garage_id).set({
+            'ownerId': owner_id,
+            'garageId': garage_id,
+            'codeVersion': garage.get('codeVersion', 0),
+            'unlocked_at': datetime.datetime.now(datetime.timezone.utc)
+        })
+        log.info("Garage %s of %s unlocked for profile %s", garage_id, owner_id, profile_id)
+        return jsonify({'success': True, 'message': 'Garage unlocked!'}), 200
+    except Exception as e:
+        log.exception("Error verifying garage code: %s", e)
+        return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
+
+
+@app.route('/lock-garage/<profile_id>/<owner_id>/<garage_id>', methods=['DELETE'])
+def lock_garage(profile_id, owner_id, garage_id):
+    """
+    Removes a shared garage from a profile's unlocked garages.
+    """
+    try:
+        unlocked_garage_ref(profile_id, owner_id, garage_id).delete()
+        return jsonify({'success': True, 'message': 'Garage locked.'}), 200
+    except Exception as e:
+        log.exception("Error locking garage: %s", e)
+        return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
+
+
+@app.route('/get-vehicles-for-event-form/<profile_id>', methods=['GET'])
+def get_vehicles_for_event_form(profile_id):
+    """
+    Returns the vehicles a driver can enter in an event: their own, followed by
+    those in shared garages they have unlocked.
+    """
+    try:
+        vehicles = []
+        for doc in counted(db.collection('driver_profiles').document(profile_id).collection('vehicles').order_by(
+                'order').stream()):
+            vehicle = doc.to_dict()
+            vehicle['id'] = doc.id
+            vehicles.append(vehicle)
+        for entry in valid_unlocks(profile_id).values():
+            vehicles.extend(shared_garage_vehicles(entry))
+        return jsonify({'success': True, 'vehicles': vehicles}), 200
+    except Exception as e:
+        log.exception("Error getting vehicles for event form: %s", e)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+def rebuild_shared_garage_index():
+    """Recreates the shared garage index from the garages themselves. Returns the number indexed."""
+    usernames = {doc.id: doc.to_dict().get('username') for doc in counted(db.collection('driver_profiles').stream())}
+    live = set()
+    for doc in counted(db.collection_group('garages').where('shared', '==', True).stream()):
+        owner_id = doc.reference.parent.parent.id
+        garage = doc.to_dict()
+        shared_garage_ref(owner_id, doc.id).set({
+            'ownerId': owner_id,
+            'ownerUsername': usernames.get(owner_id),
+            'garageId': doc.id,
+            'name': garage.get('name'),
+            'codeVersion': garage.get('codeVersion', 0),
+            'updated_at': datetime.datetime.now(datetime.timezone.utc)
+        })
+        live.add(shared_garage_key(owner_id, doc.id))
+    for doc in counted(db.collection('shared_garages').stream()):
+        if doc.id not in live:
+            doc.reference.delete()
+    return len(live)
+
+
+@app.route('/rebuild-shared-garage-index', methods=['POST'])
+def rebuild_shared_garage_index_route():
+    """
+    Backfills the shared garage index for garages shared before it existed.
+    """
+    try:
+        count = rebuild_shared_garage_index()
+        log.info("Shared garage index rebuilt with %s garage(s).", count)
+        return jsonify({'success': True, 'message': f'Indexed {count} shared garage(s).', 'count': count}), 200
+    except Exception as e:
+        log.exception("Error rebuilding shared garage index: %s", e)
+        return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
+
+
 # --- Garage Management Routes ---
 @app.route('/add-garage', methods=['POST'])
 def add_garage():
@@ -667,39 +1618,45 @@ def add_garage():
     try:
         data = request.get_json()
         profile_id = data.get('profileId')
-        garage_name = data.get('garageName')
-
-        if not profile_id or not garage_name:
-            return jsonify({'success': False, 'message': 'Profile ID and garage name are required.'}), 400
-
-        if len(garage_name) > 25:
-            return jsonify({'success': False, 'message': 'Garage name cannot exceed 25 characters.'}), 400
+        if not profile_id:
+            return jsonify({'success': False, 'message': Garage.REQUIRED_MESSAGE}), 400
+        garage = Garage.from_request(data).stamp(created=True)
+        garage_name = garage.name
 
         garage_limit = get_limit('admin_settings', 'garages', 10)
         garages_ref = db.collection('driver_profiles').document(profile_id).collection('garages')
-        current_garages = list(garages_ref.stream())
+        current_garages = list(counted(garages_ref.stream()))
         if len(current_garages) >= garage_limit:
             return jsonify({'success': False, 'message': f'Garage limit of {garage_limit} reached.'}), 403
 
-        # Check for duplicate name
-        existing_garage = garages_ref.where('name', '==', garage_name).limit(1).get()
-        if existing_garage:
+        doc_ref = garages_ref.document()
+        try:
+            add_garage_transaction(db.transaction(), profile_id, doc_ref, garage.to_document())
+        except DuplicateNameError:
             return jsonify(
                 {'success': False, 'message': f'A garage with the name "{garage_name}" already exists.'}), 409
-
-        doc_ref = garages_ref.document()
-        doc_ref.set({
-            'name': garage_name,
-            'created_at': datetime.datetime.now(datetime.timezone.utc)
-        })
-        print(f"✅ New garage '{garage_name}' added for profile {profile_id}")
+        log.info("New garage '%s' added for profile %s", garage_name, profile_id)
         return jsonify(
             {'success': True, 'message': f"Garage '{garage_name}' added successfully!", 'garageId': doc_ref.id}), 201
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
-        print(f"❌ Error adding garage: {e}")
+        log.exception("Error adding garage: %s", e)
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
 
+def garage_json(garage, owner_id, vehicles):
+    """The get-garages entry for one garage, with the given vehicles that are parked in it."""
+    return {
+        'id': garage.id,
+        'ownerId': owner_id,
+        'name': garage.name,
+        'vehicles': [vehicle.to_json() for vehicle in vehicles if vehicle.garageId == garage.id],
+        'shared': garage.shared,
+        'garageDoorCode': garage.garageDoorCode
+    }
+
+
 @app.route('/get-garages/<profile_id>', methods=['GET'])
 def get_garages(profile_id):
     """
@@ -709,57 +1666,59 @@ def get_garages(profile_id):
         if not profile_id:
             return jsonify({'success': False, 'message': 'Profile ID is required.'}), 400
 
-        vehicles_ref = db.collection('driver_profiles').document(profile_id).collection('vehicles').stream()
-        all_vehicles = []
-        for doc in vehicles_ref:
-            vehicle = doc.to_dict()
-            vehicle['id'] = doc.id
-            all_vehicles.append(vehicle)
-
-        garages_ref = db.collection('driver_profiles').document(profile_id).collection('garages').stream()
-        garages = []
-        for doc in garages_ref:
-            garage_data = doc.to_dict()
-            garage_id = doc.id
-            garages.append({
-                'id': garage_id,
-                'name': garage_data.get('name'),
-                'vehicles': [v for v in all_vehicles if v.get('garageId') == garage_id],
-                'shared': garage_data.get('shared', False),
-                'garageDoorCode': garage_data.get('garageDoorCode', '')
-            })
+        vehicles_ref = counted(db.collection('driver_profiles').document(profile_id).collection('vehicles').stream())
+        all_vehicles = [Vehicle.from_doc(doc) for doc in vehicles_ref]
+        garages_ref = counted(db.collection('driver_profiles').document(profile_id).collection('garages').stream())
+        garages = [garage_json(Garage.from_doc(doc), profile_id, all_vehicles) for doc in garages_ref]
 
         garage_limit = get_limit('admin_settings', 'garages', 10)
         limit_reached = len(garages) >= garage_limit
 
-        print(f"✅ Found {len(garages)} garages for profile {profile_id}")
+        log.info("Found %s garages for profile %s", len(garages), profile_id)
         return jsonify({'success': True, 'garages': garages, 'limit_reached': limit_reached}), 200
     except Exception as e:
-        print(f"❌ Error getting garages: {e}")
+        log.exception("Error getting garages: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
 @app.route('/update-garage/<profile_id>/<garage_id>', methods=['PUT'])
 def update_garage(profile_id, garage_id):
     """
-    Updates a garage's name.
+    Updates a garage's name and/or its sharing settings ('shared' and 'garageDoorCode').
     """
     try:
         data = request.get_json()
-        new_name = data.get('name')
-
-        if not new_name:
-            return jsonify({'success': False, 'message': 'New garage name is required.'}), 400
-        if len(new_name) > 25:
-            return jsonify({'success': False, 'message': 'Garage name cannot exceed 25 characters.'}), 400
-
-        db.collection('driver_profiles').document(profile_id).collection('garages').document(garage_id).update({
-            'name': new_name
-        })
-        print(f"✅ Garage {garage_id} updated to '{new_name}' for profile {profile_id}")
+        if 'name' not in data and 'shared' not in data:
+            return jsonify({'success': False, 'message': 'New garage name or share settings are required.'}), 400
+
+        garage_ref = db.collection('driver_profiles').document(profile_id).collection('garages').document(garage_id)
+        if 'name' in data:
+            new_name = data.get('name')
+            if not new_name:
+                return jsonify({'success': False, 'message': 'New garage name is required.'}), 400
+            Garage.validate_value('name', new_name)
+            try:
+                rename_garage_transaction(db.transaction(), profile_id, garage_ref, new_name)
+            except DuplicateNameError:
+                return jsonify(
+                    {'success': False, 'message': f'A garage with the name "{new_name}" already exists.'}), 409
+            except KeyError:
+                return jsonify({'success': False, 'message': 'Garage not found.'}), 404
+            log.info("Garage %s updated to '%s' for profile %s", garage_id, new_name, profile_id)
+
+        if 'shared' in data:
+            shared = bool(data['shared'])
+            try:
+                share_garage_transaction(db.transaction(), profile_id, garage_ref, shared,
+                                         str(data.get('garageDoorCode') or '').strip())
+            except KeyError:
+                return jsonify({'success': False, 'message': 'Garage not found.'}), 404
+            log.info("Garage %s %s for profile %s", garage_id, 'shared' if shared else 'unshared', profile_id)
         return jsonify({'success': True, 'message': 'Garage updated successfully!'}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
-        print(f"❌ Error updating garage: {e}")
+        log.exception("Error updating garage: %s", e)
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
 
@@ -769,11 +1728,12 @@ def delete_garage(profile_id, garage_id):
     Deletes a garage.
     """
     try:
-        db.collection('driver_profiles').document(profile_id).collection('garages').document(garage_id).delete()
-        print(f"✅ Garage {garage_id} deleted for profile {profile_id}")
+        garage_ref = db.collection('driver_profiles').document(profile_id).collection('garages').document(garage_id)
+        delete_garage_transaction(db.transaction(), profile_id, garage_ref)
+        log.info("Garage %s deleted for profile %s", garage_id, profile_id)
         return jsonify({'success': True, 'message': 'Garage deleted successfully!'}), 200
     except Exception as e:
-        print(f"❌ Error deleting garage: {e}")
+        log.exception("Error deleting garage: %s", e)
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
 
@@ -782,96 +1742,96 @@ def delete_garage(profile_id, garage_id):
 def add_vehicle(profile_id):
     try:
         vehicle_limit = get_limit('admin_settings', 'vehicles', 25)
-        current_vehicles = list(db.collection('driver_profiles').document(profile_id).collection('vehicles').stream())
+        current_vehicles = list(counted(
+            db.collection('driver_profiles').document(profile_id).collection('vehicles').stream()))
         if len(current_vehicles) >= vehicle_limit:
             return jsonify({'success': False, 'message': f'Vehicle limit of {vehicle_limit} reached.'}), 403
+        # Orders can be fractional after drag-and-drop moves, so append after the current last vehicle.
+        last_order = max((doc.to_dict().get('order', 0) for doc in current_vehicles), default=-1)
 
-        data = request.get_json()
-        vehicle_data = {
-            'year': data.get('year'),
-            'make': data.get('make'),
-            'model': data.get('model'),
-            'garageId': data.get('garageId'),
-            'photo': data.get('photo'),  # Base64 string
-            'photoURL': data.get('photoURL'),  # URL string
-            'created_at': datetime.datetime.now(datetime.timezone.utc),
-            'order': len(current_vehicles)
-        }
-
-        if not all([vehicle_data['year'], vehicle_data['make'], vehicle_data['model']]):
-            return jsonify({'success': False, 'message': 'Year, Make, and Model are required.'}), 400
+        vehicle = Vehicle.from_request(request.get_json()).stamp(created=True)
+        vehicle.order = math.floor(last_order) + 1
 
         doc_ref = db.collection('driver_profiles').document(profile_id).collection('vehicles').document()
-        doc_ref.set(vehicle_data)
-        print(f"✅ New vehicle added for profile {profile_id}")
+        doc_ref.set(vehicle.to_document())
+        log.info("New vehicle added for profile %s", profile_id)
         return jsonify({'success': True, 'message': 'Vehicle added successfully!', 'vehicleId': doc_ref.id}), 201
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
-        print(f"❌ Error adding vehicle: {e}")
+        log.exception("Error adding vehicle: %s", e)
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
 
 @app.route('/get-vehicles/<profile_id>', methods=['GET'])
 def get_vehicles(profile_id):
     try:
-        garages_ref = db.collection('driver_profiles').document(profile_id).collection('garages').stream()
+        garages_ref = counted(db.collection('driver_profiles').document(profile_id).collection('garages').stream())
         garage_map = {doc.id: doc.to_dict().get('name', 'Unknown') for doc in garages_ref}
 
-        vehicles_ref = db.collection('driver_profiles').document(profile_id).collection('vehicles').order_by(
-            'order').stream()
+        vehicles_ref = counted(db.collection('driver_profiles').document(profile_id).collection('vehicles').order_by(
+            'order').stream())
         vehicles = []
         for doc in vehicles_ref:
-            vehicle = doc.to_dict()
-            vehicle['id'] = doc.id
-            vehicle['garageName'] = garage_map.get(vehicle.get('garageId'))
-            vehicles.append(vehicle)
+            vehicle = Vehicle.from_doc(doc)
+            vehicles.append({**vehicle.to_json(), 'garageName': garage_map.get(vehicle.garageId)})
 
         vehicle_limit = get_limit('admin_settings', 'vehicles', 25)
         limit_reached = len(vehicles) >= vehicle_limit
 
-        print(f"✅ Found {len(vehicles)} vehicles for profile {profile_id}")
+        log.info("Found %s vehicles for profile %s", len(vehicles), profile_id)
         return jsonify({'success': True, 'vehicles': vehicles, 'limit_reached': limit_reached}), 200
     except Exception as e:
-        print(f"❌ Error getting vehicles: {e}")
+        log.exception("Error getting vehicles: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@app.route('/update-vehicle/<profile_id>/<vehicle_id>', methods=['PUT'])
+@app.route('/update-vehicle/<profile_id>/<vehicle_id>', methods=['PUT', 'PATCH'])
 def update_vehicle(profile_id, vehicle_id):
     try:
         data = request.get_json()
-        updates = {
-            'year': data.get('year'),
-            'make': data.get('make'),
-            'model': data.get('model'),
-            'garageId': data.get('garageId'),
-        }
+        if request.method == 'PATCH':
+            # A vehicle has either an uploaded photo or a photo URL, never both.
+            if data.get('photo'):
+                data['photoURL'] = None
+            elif data.get('photoURL'):
+                data['photo'] = None
+            vehicle_ref = db.collection('driver_profiles').document(profile_id).collection('vehicles').document(
+                vehicle_id)
+            Vehicle.validate_patch(data)
+            written = apply_patch(vehicle_ref, data, Vehicle.PATCH_FIELDS, required=Vehicle.REQUIRED_KEYS)
+            log.info("Vehicle %s patched for profile %s: %s", vehicle_id, profile_id, written)
+            return jsonify({'success': True, 'message': 'Vehicle updated successfully!'}), 200
+
+        vehicle = Vehicle.from_request(data).stamp()
+        updates = vehicle.to_document()
+        # Photos are only replaced when the body carries one; an uploaded photo clears the URL and vice versa.
         if data.get('photo'):
-            updates['photo'] = data.get('photo')
             updates['photoURL'] = None
         elif 'photoURL' in data:
-            updates['photoURL'] = data.get('photoURL')
             updates['photo'] = None
-
-        if not all([updates['year'], updates['make'], updates['model']]):
-            return jsonify({'success': False, 'message': 'Year, Make, and Model are required.'}), 400
+        else:
+            del updates['photo'], updates['photoURL']
 
         db.collection('driver_profiles').document(profile_id).collection('vehicles').document(vehicle_id).update(
             updates)
-        print(f"✅ Vehicle {vehicle_id} updated for profile {profile_id}")
+        log.info("Vehicle %s updated for profile %s", vehicle_id, profile_id)
         return jsonify({'success': True, 'message': 'Vehicle updated successfully!'}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
-        print(f"❌ Error updating vehicle: {e}")
+        log.exception("Error updating vehicle: %s", e)
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
 
 @app.route('/delete-vehicle/<profile_id>/<vehicle_id>', methods=['DELETE'])
 def delete_vehicle(profile_id, vehicle_id):
     try:
-        db.collection('driver_profiles').document(profile_id).collection('vehicles').document(vehicle_id).delete()
-        print(f"✅ Vehicle {vehicle_id} deleted for profile {profile_id}")
+        delete_with_tombstone(profile_id, 'vehicles', vehicle_id)
+        log.info("Vehicle %s deleted for profile %s", vehicle_id, profile_id)
         return jsonify({'success': True, 'message': 'Vehicle deleted successfully!'}), 200
     except Exception as e:
-        print(f"❌ Error deleting vehicle: {e}")
+        log.exception("Error deleting vehicle: %s", e)
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
 
@@ -881,77 +1841,497 @@ def update_vehicle_order(profile_id):
         data = request.get_json()
         ordered_ids = data.get('order')
         batch = db.batch()
+        now = datetime.datetime.now(datetime.timezone.utc)
         for index, vehicle_id in enumerate(ordered_ids):
             vehicle_ref = db.collection('driver_profiles').document(profile_id).collection('vehicles').document(
                 vehicle_id)
-            batch.update(vehicle_ref, {'order': index})
+            batch.update(vehicle_ref, {'order': index, 'updated_at': now})
         batch.commit()
-        print(f"✅ Vehicle order updated for profile {profile_id}")
+        log.info("Vehicle order updated for profile %s", profile_id)
         return jsonify({'success': True, 'message': 'Vehicle order saved!'}), 200
     except Exception as e:
-        print(f"❌ Error updating vehicle order: {e}")
+        log.exception("Error updating vehicle order: %s", e)
+        return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
+
+
+# Vehicle 'order' values are fractional ranks: a vehicle dragged between two
+# neighbours takes the midpoint of their orders, so a move writes one document.
+# Repeated moves into the same gap halve it each time; once it gets small the
+# profile's orders are respread to whole numbers in the background. The respread
+# runs in a transaction, so one that races a move is retried rather than
+# writing the moved vehicle back to its old place.
+ORDER_REBALANCE_GAP = 1e-6
+ORDER_MIN_GAP = 1e-12
+ORDER_REBALANCE_WAIT = 5  # Seconds a move waits for a respread already in progress
+_rebalancing_profiles = {}  # profile_id -> Event set when its respread finishes
+_rebalancing_lock = threading.Lock()
+
+
+@firestore.transactional
+def rebalance_vehicle_order_transaction(transaction, vehicles_ref):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    changed = 0
+    for index, doc in enumerate(counted(vehicles_ref.order_by('order').stream(transaction=transaction))):
+        if doc.to_dict().get('order') != index:
+            transaction.update(doc.reference, {'order': index, 'updated_at': now})
+            changed += 1
+    return changed
+
+
+def rebalance_vehicle_order(profile_id):
+    """
+    Rewrites a profile's vehicle orders to 0, 1, 2, ... keeping their current
+    sequence. Only vehicles whose order actually changes are written. The caller
+    must have claimed the profile with claim_vehicle_order_rebalance.
+    """
+    try:
+        vehicles_ref = db.collection('driver_profiles').document(profile_id).collection('vehicles')
+        changed = rebalance_vehicle_order_transaction(db.transaction(), vehicles_ref)
+        log.info("Rebalanced vehicle order for profile %s (%s vehicle(s) rewritten)", profile_id, changed)
+    except Exception as e:
+        log.exception("Error rebalancing vehicle order for profile %s: %s", profile_id, e)
+    finally:
+        with _rebalancing_lock:
+            _rebalancing_profiles.pop(profile_id).set()
+
+
+def claim_vehicle_order_rebalance(profile_id):
+    """Returns True if the caller may respread the profile, or False if a respread is already running."""
+    with _rebalancing_lock:
+        if profile_id in _rebalancing_profiles:
+            return False
+        _rebalancing_profiles[profile_id] = threading.Event()
+        return True
+
+
+def schedule_vehicle_order_rebalance(profile_id):
+    if claim_vehicle_order_rebalance(profile_id):
+        threading.Thread(target=rebalance_vehicle_order, args=(profile_id,), daemon=True).start()
+
+
+def wait_for_vehicle_order_rebalance(profile_id, timeout=ORDER_REBALANCE_WAIT):
+    with _rebalancing_lock:
+        finished = _rebalancing_profiles.get(profile_id)
+    if finished is not None:
+        finished.wait(timeout)
+
+
+@app.route('/move-vehicle/<profile_id>', methods=['POST'])
+def move_vehicle(profile_id):
+    """
+    Moves one vehicle between its new neighbours ('afterId' is the vehicle now
+    above it, 'beforeId' the one now below it; either may be omitted at the ends).
+    """
+    try:
+        data = request.get_json()
+        vehicle_id = data.get('vehicleId')
+        after_id = data.get('afterId')
+        before_id = data.get('beforeId')
+        if not vehicle_id:
+            return jsonify({'success': False, 'message': 'Vehicle ID is required.'}), 400
+
+        if vehicle_id in (after_id, before_id):
+            return jsonify({'success': False, 'message': 'A vehicle cannot be its own neighbour.'}), 400
+
+        vehicles_ref = db.collection('driver_profiles').document(profile_id).collection('vehicles')
+        neighbour_refs = [vehicles_ref.document(doc_id) for doc_id in (after_id, before_id) if doc_id]
+        for attempt in range(2):
+            neighbour_orders = {doc.id: doc.to_dict().get('order', 0)
+                                for doc in counted(db.get_all(neighbour_refs)) if doc.exists} if neighbour_refs else {}
+            low = neighbour_orders.get(after_id)
+            high = neighbour_orders.get(before_id)
+            if low is None or high is None or high - low >= ORDER_MIN_GAP:
+                break
+            if after_id == before_id or low >= high or attempt:
+                # The client's list no longer matches the stored order; respreading would not help.
+                return jsonify({'success': False,
+                                'message': 'The vehicle order changed. Please reload and try again.'}), 409
+            # No usable space left between the neighbours; respread now (or let the
+            # respread already running finish) and read them again.
+            if claim_vehicle_order_rebalance(profile_id):
+                rebalance_vehicle_order(profile_id)
+            else:
+                wait_for_vehicle_order_rebalance(profile_id)
+
+        if low is not None and high is not None:
+            new_order = (low + high) / 2
+        elif low is not None:
+            new_order = math.floor(low) + 1
+        elif high is not None:
+            new_order = math.ceil(high) - 1
+        else:
+            new_order = 0
+
+        vehicles_ref.document(vehicle_id).update({
+            'order': new_order,
+            'updated_at': datetime.datetime.now(datetime.timezone.utc)
+        })
+        # Only after the move is written, so the respread sees it.
+        if low is not None and high is not None and high - low < ORDER_REBALANCE_GAP:
+            schedule_vehicle_order_rebalance(profile_id)
+        log.info("Vehicle %s moved to order %s for profile %s", vehicle_id, new_order, profile_id)
+        return jsonify({'success': True, 'message': 'Vehicle order saved!', 'order': new_order}), 200
+    except Exception as e:
+        log.exception("Error moving vehicle: %s", e)
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
 
 # --- Race Schedule Routes ---
+# 'start_time' keeps the ISO string the client sent; 'start_at' holds the same
+# instant as a Firestore timestamp so date windows are indexed range queries.
+EVENT_PAGE_LIMIT = 200
+EVENT_SUMMARY_FIELDS = ['name', 'start_time', 'end_time', 'trackId', 'is_raceday', 'vehicles']
+
+
+def parse_event_time(value):
+    """Parses an ISO 8601 event time into a UTC datetime. Raises ValueError if it is unreadable."""
+    try:
+        parsed = datetime.datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f'Invalid event time: {value}')
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed.astimezone(datetime.timezone.utc)
+
+
+def event_times_marker_ref():
+    return db.collection('config').document('event_times')
+
+
+def backfill_event_start_at():
+    """Adds 'start_at' to events written before it existed. Returns the number of events updated."""
+    updated = 0
+    batch = db.batch()
+    for doc in counted(db.collection_group('events').stream()):
+        event = doc.to_dict()
+        if event.get('start_at') is not None or not event.get('start_time'):
+            continue
+        try:
+            start_at = parse_event_time(event['start_time'])
+        except ValueError:
+            log.warning("Skipping event %s with unreadable start time '%s'.", doc.reference.path, event['start_time'])
+            continue
+        batch.update(doc.reference, {'start_at': start_at})
+        updated += 1
+        if updated % 400 == 0:
+            batch.commit()
+            batch = db.batch()
+    if updated % 400:
+        batch.commit()
+    event_times_marker_ref().set({'backfilled_at': datetime.datetime.now(datetime.timezone.utc), 'updated': updated})
+    return updated
+
+
+def ensure_event_start_at():
+    """Runs the backfill once per database: at warm-up, if no earlier run left its marker."""
+    if counted_get(event_times_marker_ref()).exists:
+        return
+    updated = backfill_event_start_at()
+    log.info("Backfilled start_at on %s event(s).", updated)
+
+
+# --- Event Conflict Index ---
+# Process-local interval index over every event, keyed by vehicle and by driver,
+# so double bookings are found without comparing events pairwise. It is built
+# from one collection group read at warm-up and kept current by this process's
+# event routes. Other workers write events too, so a background thread rebuilds
+# it every EVENT_INDEX_REFRESH_SECONDS and swaps the new one in; writes this
+# process makes during a rebuild are replayed onto the new index.
+DEFAULT_EVENT_HOURS = 8
+EVENT_INDEX_REFRESH_SECONDS = 300
+event_index = EventIntervalIndex()
+_event_index_built = False
+_event_index_pending = None  # event_id -> (profile_id, event or None) written during a rebuild
+_event_index_lock = threading.Lock()  # Guards the swap and _event_index_pending
+_event_index_build_lock = threading.Lock()
+_event_index_refresher_started = False
+
+
+def event_interval(event):
+    """
+    Returns an event's [start, end) as epoch seconds. A missing, unreadable or
+    earlier end time is treated as start + DEFAULT_EVENT_HOURS.
+    """
+    start = parse_event_time(event['start_time'])
+    try:
+        end = parse_event_time(event['end_time']) if event.get('end_time') else None
+    except ValueError:
+        end = None
+    if end is None or end <= start:
+        end = start + datetime.timedelta(hours=DEFAULT_EVENT_HOURS)
+    return start.timestamp(), end.timestamp()
+
+
+def event_index_keys(profile_id, event):
+    return [f'vehicle:{vehicle_id}' for vehicle_id in event.get('vehicles') or []] + [f'driver:{profile_id}']
+
+
+def index_event(profile_id, event_id, event, index=None):
+    """Adds or refreshes one event in the conflict index (or the given index)."""
+    if index is None:
+        with _event_index_lock:
+            index = event_index
+            if _event_index_pending is not None:
+                _event_index_pending[event_id] = (profile_id, event)
+    try:
+        start, end = event_interval(event)
+    except (KeyError, TypeError, ValueError):
+        index.remove(event_id)
+        return
+    info = {'profileId': profile_id, 'name': event.get('name'), 'start_time': event.get('start_time'),
+            'end_time': event.get('end_time')}
+    index.put(event_id, start, end, event_index_keys(profile_id, event), info)
+
+
+def unindex_event(event_id):
+    """Removes a deleted event from the conflict index."""
+    with _event_index_lock:
+        index = event_index
+        if _event_index_pending is not None:
+            _event_index_pending[event_id] = (None, None)
+    index.remove(event_id)
+
+
+def build_event_index(if_missing=False):
+    """Reads every event into a new index and swaps it in. With if_missing, only if none was built yet."""
+    global event_index, _event_index_built, _event_index_pending
+    with _event_index_build_lock:
+        if if_missing and _event_index_built:
+            return
+        with _event_index_lock:
+            _event_index_pending = {}
+        try:
+            fresh = EventIntervalIndex()
+            for doc in counted(db.collection_group('events').stream()):
+                index_event(doc.reference.parent.parent.id, doc.id, doc.to_dict(), fresh)
+        except Exception:
+            with _event_index_lock:
+                _event_index_pending = None
+            raise
+        with _event_index_lock:
+            for event_id, (profile_id, event) in _event_index_pending.items():
+                if event is None:
+                    fresh.remove(event_id)
+                else:
+                    index_event(profile_id, event_id, event, fresh)
+            event_index, _event_index_pending, _event_index_built = fresh, None, True
+        log.info("Event conflict index built with %s event(s).", len(fresh))
+
+
+def ensure_event_index():
+    """Builds the index on first use if warm-up has not built it yet."""
+    build_event_index(if_missing=True)
+
+
+def _run_event_index_refresher():
+    while True:
+        time.sleep(EVENT_INDEX_REFRESH_SECONDS)
+        try:
+            build_event_index()
+        except Exception as e:
+            log.exception("Error refreshing the event conflict index: %s", e)
+
+
+def warm_event_index():
+    """Builds the index and starts refreshing it in the background, once per process."""
+    global _event_index_refresher_started
+    ensure_event_index()
+    with _event_index_lock:
+        if _event_index_refresher_started:
+            return
+        _event_index_refresher_started = True
+    threading.Thread(target=_run_event_index_refresher, name='event-index-refresher', daemon=True).start()
+
+
+def find_event_conflicts(profile_id, event_id, event):
+    """
+    Lists other events that overlap this one and use one of its vehicles or
+    belong to the same driver.
+    """
+    ensure_event_index()
+    start, end = event_interval(event)
+    conflicts = {}
+    for key, other_id, info in event_index.conflicts(start, end, event_index_keys(profile_id, event), exclude=event_id):
+        conflict = conflicts.setdefault(other_id, {'eventId': other_id, **info, 'vehicles': [], 'driver': False})
+        kind, _, value = key.partition(':')
+        if kind == 'vehicle':
+            conflict['vehicles'].append(value)
+        else:
+            conflict['driver'] = True
+    return sorted(conflicts.values(), key=lambda c: c['start_time'] or '')
+
+
+def record_event_write(profile_id, event_id, event):
+    """Re-indexes an event after a write and returns the events it conflicts with."""
+    conflicts = find_event_conflicts(profile_id, event_id, event)
+    index_event(profile_id, event_id, event)
+    if conflicts:
+        log.warning("Event %s for profile %s overlaps %s other event(s).", event_id, profile_id, len(conflicts))
+    return conflicts
+
+
+@app.route('/event-conflicts/<profile_id>', methods=['GET'])
+def get_event_conflicts(profile_id):
+    """
+    Reports every event of a profile that overlaps another event using the same
+    vehicle or the same driver.
+    """
+    try:
+        report = []
+        for doc in counted(db.collection('driver_profiles').document(profile_id).collection('events').stream()):
+            event = doc.to_dict()
+            if not event.get('start_time'):
+                continue
+            index_event(profile_id, doc.id, event)
+            conflicts = find_event_conflicts(profile_id, doc.id, event)
+            if conflicts:
+                report.append({'eventId': doc.id, 'name': event.get('name'), 'start_time': event.get('start_time'),
+                               'end_time': event.get('end_time'), 'conflicts': conflicts})
+        report.sort(key=lambda r: r['start_time'])
+        return jsonify({'success': True, 'events': report}), 200
+    except Exception as e:
+        log.exception("Error building event conflict report: %s", e)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/backfill-event-times', methods=['POST'])
+def backfill_event_times_route():
+    """
+    Backfills the 'start_at' timestamp used by date-windowed event queries.
+    """
+    try:
+        updated = backfill_event_start_at()
+        log.info("Backfilled start_at on %s event(s).", updated)
+        return jsonify({'success': True, 'message': f'Updated {updated} event(s).', 'updated': updated}), 200
+    except Exception as e:
+        log.exception("Error backfilling event times: %s", e)
+        return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
+
+
+def event_from_request(data):
+    """Builds an Event from an add/PUT body, deriving start_at and checking both times. Raises ValueError."""
+    event = Event.from_request(data)
+    event.start_at = parse_event_time(event.start_time)
+    if event.end_time:
+        parse_event_time(event.end_time)
+    return event
+
+
 @app.route('/add-event/<profile_id>', methods=['POST'])
 def add_event(profile_id):
     try:
-        data = request.get_json()
-        event_data = {
-            'name': data.get('name'),
-            'start_time': data.get('startTime'),
-            'end_time': data.get('endTime'),
-            'vehicles': data.get('vehicles', []),
-            'checklists': data.get('checklists', []),
-            'trackId': data.get('trackId'),
-            'is_raceday': data.get('isRaceday', False),
-            'created_at': datetime.datetime.now(datetime.timezone.utc)
-        }
-        if not event_data['name'] or not event_data['start_time']:
-            return jsonify({'success': False, 'message': 'Event name and start time are required.'}), 400
+        event = event_from_request(request.get_json()).stamp(created=True)
+        event_data = event.to_document()
 
         doc_ref = db.collection('driver_profiles').document(profile_id).collection('events').document()
         doc_ref.set(event_data)
-        print(f"✅ New event '{event_data['name']}' added for profile {profile_id}")
-        return jsonify({'success': True, 'message': 'Event added successfully!', 'eventId': doc_ref.id}), 201
+        conflicts = record_event_write(profile_id, doc_ref.id, event_data)
+        log.info("New event '%s' added for profile %s", event_data['name'], profile_id)
+        return jsonify({'success': True, 'message': 'Event added successfully!', 'eventId': doc_ref.id,
+                        'conflicts': conflicts}), 201
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
-        print(f"❌ Error adding event: {e}")
+        log.exception("Error adding event: %s", e)
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
 
-@app.route('/get-events/<profile_id>', methods=['GET'])
-def get_events(profile_id):
-    try:
-        vehicles_ref = db.collection('driver_profiles').document(profile_id).collection('vehicles').stream()
-        vehicle_map = {doc.id: doc.to_dict() for doc in vehicles_ref}
+def parse_events_args(args):
+    """Returns (summary, limit) from get-events query parameters. Raises ValueError for a bad limit."""
+    summary = args.get('summary', 'false').lower() == 'true'
+    limit = args.get('limit', type=int)
+    if 'limit' in args and (limit is None or not 1 <= limit <= EVENT_PAGE_LIMIT):
+        raise ValueError(f'limit must be between 1 and {EVENT_PAGE_LIMIT}.')
+    return summary, limit
 
-        tracks_ref = db.collection('tracks').stream()
-        track_map = {doc.id: doc.to_dict() for doc in tracks_ref}
 
-        events_ref = db.collection('driver_profiles').document(profile_id).collection('events').order_by(
-            'start_time').stream()
-        events = []
-        for doc in events_ref:
-            event = doc.to_dict()
-            event['id'] = doc.id
+def build_events_query(events_coll, args, summary, limit, cursor_doc=None):
+    """
+    Applies get-events' date window, cursor, summary projection and page size to
+    an events collection. Works with both the sync and async Firestore clients.
+    """
+    if any(key in args for key in ('from', 'to', 'limit', 'cursor')):
+        query = events_coll
+        if args.get('from'):
+            query = query.where('start_at', '>=', parse_event_time(args['from']))
+        if args.get('to'):
+            query = query.where('start_at', '<', parse_event_time(args['to']))
+        query = query.order_by('start_at')
+        if cursor_doc is not None:
+            query = query.start_after(cursor_doc)
+    else:
+        query = events_coll.order_by('start_time')
+    if summary:
+        query = query.select(EVENT_SUMMARY_FIELDS)
+    if limit:
+        # One extra event tells us whether there is another page.
+        query = query.limit(limit + 1)
+    return query
+
+
+def join_event_details(docs, limit, summary, vehicle_map, track_map):
+    """Turns event snapshots into the get-events payload: (events, next_cursor)."""
+    next_cursor = None
+    if limit and len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = docs[-1].id
+
+    events = []
+    for doc in docs:
+        event = Event.from_doc(doc).to_json(EVENT_SUMMARY_FIELDS if summary else None)
 
-            track_id = event.get('trackId')
-            if track_id in track_map:
-                event['trackName'] = track_map[track_id].get('name', 'Unknown Track')
-                event['trackPhoto'] = track_map[track_id].get('photo')
-                event['trackPhotoURL'] = track_map[track_id].get('photoURL')
+        track_id = event.get('trackId')
+        if track_id in track_map:
+            event['trackName'] = track_map[track_id].get('name', 'Unknown Track')
+            event['trackPhoto'] = track_map[track_id].get('photo')
+            event['trackPhotoURL'] = track_map[track_id].get('photoURL')
 
+        if not summary:
             event_vehicles = []
             for vehicle_id in event.get('vehicles', []):
                 if vehicle_id in vehicle_map:
                     event_vehicles.append(vehicle_map[vehicle_id])
             event['vehicles'] = event_vehicles
 
-            events.append(event)
-        return jsonify({'success': True, 'events': events}), 200
+        events.append(event)
+    return events, next_cursor
+
+
+@app.route('/get-events/<profile_id>', methods=['GET'])
+def get_events(profile_id):
+    """
+    Lists a profile's events ordered by start time. Optional query parameters:
+      from, to  ISO 8601 bounds on the start time (from inclusive, to exclusive)
+      limit     page size; the response carries nextCursor while more events remain
+      cursor    the nextCursor of the previous page
+      summary   'true' to skip the vehicle join and read only the fields a list needs
+    Without any of from, to, limit or cursor the whole history is returned.
+    """
+    try:
+        args = request.args
+        summary, limit = parse_events_args(args)
+        events_coll = db.collection('driver_profiles').document(profile_id).collection('events')
+        cursor_doc = None
+        if args.get('cursor'):
+            cursor_doc = counted_get(events_coll.document(args['cursor']))
+            if not cursor_doc.exists:
+                return jsonify({'success': False, 'message': 'The cursor event no longer exists.'}), 410
+        docs = list(counted(build_events_query(events_coll, args, summary, limit, cursor_doc).stream()))
+
+        vehicle_map = {}
+        if not summary:
+            vehicle_ids = {vehicle_id for doc in docs for vehicle_id in doc.to_dict().get('vehicles', [])}
+            vehicles_coll = db.collection('driver_profiles').document(profile_id).collection('vehicles')
+            vehicle_refs = [vehicles_coll.document(vehicle_id) for vehicle_id in vehicle_ids]
+            vehicle_map = {doc.id: {**doc.to_dict(), 'id': doc.id}
+                           for doc in (counted(db.get_all(vehicle_refs)) if vehicle_refs else []) if doc.exists}
+
+        events, next_cursor = join_event_details(docs, limit, summary, vehicle_map, get_track_map())
+        return jsonify({'success': True, 'events': events, 'nextCursor': next_cursor}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
-        print(f"❌ Error getting events: {e}")
+        log.exception("Error getting events: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -961,7 +2341,7 @@ def get_all_events():
     Retrieves all events from all profiles for the global lap time feature.
     """
     try:
-        events_ref = db.collection_group('events').stream()
+        events_ref = counted(db.collection_group('events').stream())
         events = []
         for doc in events_ref:
             event = doc.to_dict()
@@ -970,45 +2350,52 @@ def get_all_events():
 
         events.sort(key=lambda x: x.get('start_time', ''), reverse=True)
 
-        print(f"✅ Found and sorted {len(events)} total events for Winner's Circle.")
+        log.info("Found and sorted %s total events for Winner's Circle.", len(events))
         return jsonify({'success': True, 'events': events}), 200
     except Exception as e:
-        print(f"❌ Error getting all events: {e}")
+        log.exception("Error getting all events: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@app.route('/update-event/<profile_id>/<event_id>', methods=['PUT'])
+@app.route('/update-event/<profile_id>/<event_id>', methods=['PUT', 'PATCH'])
 def update_event(profile_id, event_id):
     try:
         data = request.get_json()
-        updates = {
-            'name': data.get('name'),
-            'start_time': data.get('startTime'),
-            'end_time': data.get('endTime'),
-            'vehicles': data.get('vehicles', []),
-            'checklists': data.get('checklists', []),
-            'trackId': data.get('trackId'),
-            'is_raceday': data.get('isRaceday', False)
-        }
-        if not updates['name'] or not updates['start_time']:
-            return jsonify({'success': False, 'message': 'Event name and start time are required.'}), 400
+        if request.method == 'PATCH':
+            event_ref = db.collection('driver_profiles').document(profile_id).collection('events').document(event_id)
+            Event.validate_patch(data)
+            extra = {'start_at': parse_event_time(data['startTime'])} if data.get('startTime') else None
+            if data.get('endTime'):
+                parse_event_time(data['endTime'])
+            written = apply_patch(event_ref, data, Event.PATCH_FIELDS, array_fields=Event.ARRAY_FIELDS,
+                                  required=Event.REQUIRED_KEYS, extra=extra)
+            # Array add/remove results are only known after the write, so read the event back.
+            conflicts = record_event_write(profile_id, event_id, counted_get(event_ref).to_dict())
+            log.info("Event %s patched for profile %s: %s", event_id, profile_id, written)
+            return jsonify({'success': True, 'message': 'Event updated successfully!', 'conflicts': conflicts}), 200
+
+        updates = event_from_request(data).stamp().to_document()
 
         db.collection('driver_profiles').document(profile_id).collection('events').document(event_id).update(updates)
-        print(f"✅ Event {event_id} updated for profile {profile_id}")
-        return jsonify({'success': True, 'message': 'Event updated successfully!'}), 200
+        conflicts = record_event_write(profile_id, event_id, updates)
+        log.info("Event %s updated for profile %s", event_id, profile_id)
+        return jsonify({'success': True, 'message': 'Event updated successfully!', 'conflicts': conflicts}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
-        print(f"❌ Error updating event: {e}")
+        log.exception("Error updating event: %s", e)
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
 
 @app.route('/delete-event/<profile_id>/<event_id>', methods=['DELETE'])
 def delete_event(profile_id, event_id):
     try:
-        db.collection('driver_profiles').document(profile_id).collection('events').document(event_id).delete()
-        print(f"✅ Event {event_id} deleted for profile {profile_id}")
+        delete_with_tombstone(profile_id, 'events', event_id)
+        unindex_event(event_id)
+        log.info("Event %s deleted for profile %s", event_id, profile_id)
         return jsonify({'success': True, 'message': 'Event deleted successfully!'}), 200
     except Exception as e:
-        print(f"❌ Error deleting event: {e}")
+        log.exception("Error deleting event: %s", e)
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
 
@@ -1017,8 +2404,8 @@ def get_next_raceday(profile_id):
     try:
         now = datetime.datetime.now(datetime.timezone.utc)
 
-        events_ref = db.collection('driver_profiles').document(profile_id).collection('events') \
-            .where('is_raceday', '==', True).stream()
+        events_ref = counted(db.collection('driver_profiles').document(profile_id).collection('events') \
+            .where('is_raceday', '==', True).stream())
 
         future_events = []
         for doc in events_ref:
@@ -1027,7 +2414,7 @@ def get_next_raceday(profile_id):
             if start_time_str:
                 event_time = datetime.datetime.fromisoformat(start_time_str.replace('Z', '+00:00'))
                 if event_time > now:
-                    future_events.append(event)
+                    future_events.append({**event, 'id': doc.id})
 
         if not future_events:
             return jsonify({'success': True, 'event': None}), 200
@@ -1037,28 +2424,162 @@ def get_next_raceday(profile_id):
 
         return jsonify({'success': True, 'event': next_event}), 200
     except Exception as e:
-        print(f"❌ Error getting next raceday for profile {profile_id}: {e}")
+        log.exception("Error getting next raceday for profile %s: %s", profile_id, e)
         return jsonify({'success': False, 'event': None}), 500
 
 
+# --- Race Day Bundle ---
+# Everything race_day_prep_view shows for one event (the event, its vehicles,
+# checklists and track) in one payload. Uploaded photos are split out into
+# separate image URLs carrying the bundle version, so the JSON stays small and
+# the service worker (static/js/sw.js) can precache the bundle, its images and
+# the app shell for offline use at the track. Compiled bundles are kept per
+# event and rebuilt only when their version changes.
+RACEDAY_BUNDLE_CACHE_SIZE = 64
+_raceday_bundles = {}
+_raceday_bundles_lock = threading.Lock()
+_DATA_URL = re.compile(r'data:(image/[\w.+-]+);base64,(.*)', re.DOTALL)
+
+
+class RacedayBundle:
+    __slots__ = ('version', 'body', 'images')
+
+    def __init__(self, version, body, images):
+        self.version = version
+        self.body = body  # Serialized JSON response
+        self.images = images  # {name: (mimetype, bytes)}
+
+
+def read_raceday_source(profile_id, event_id):
+    """Reads the event with its vehicles, checklists and track, or returns None if the event is missing."""
+    profile_ref = db.collection('driver_profiles').document(profile_id)
+    event_doc = counted_get(profile_ref.collection('events').document(event_id))
+    if not event_doc.exists:
+        return None
+    event = Event.from_doc(event_doc)
+    refs = [profile_ref.collection('vehicles').document(vehicle_id) for vehicle_id in event.vehicles] + \
+           [profile_ref.collection('checklists').document(checklist_id) for checklist_id in event.checklists]
+    docs = {doc.reference.path: doc for doc in (counted(db.get_all(refs)) if refs else []) if doc.exists}
+    vehicles = [Vehicle.from_doc(docs[ref.path]).to_json() for ref in refs[:len(event.vehicles)] if ref.path in docs]
+    checklists = [Checklist.from_doc(docs[ref.path]).to_json() for ref in refs[len(event.vehicles):]
+                  if ref.path in docs]
+    track = get_track(event.trackId) if event.trackId else None
+    if track is not None:
+        track = {**track, 'id': event.trackId}
+    return {'event': event.to_json(), 'vehicles': vehicles, 'checklists': checklists, 'track': track}
+
+
+def compile_raceday_bundle(profile_id, event_id, source, version):
+    """Builds the bundle payload, replacing inline photos with versioned image URLs."""
+    images = {}
+    image_urls = []
+
+    def image_ref(name, photo, photo_url):
+        match = _DATA_URL.match(photo or '')
+        if match:
+            images[name] = (match.group(1), base64.b64decode(match.group(2)))
+            url = f'/raceday-bundle/{profile_id}/{event_id}/images/{name}?v={version}'
+        else:
+            url = photo or photo_url or None
+        if url and not url.startswith('data:'):
+            image_urls.append(url)
+        return url
+
+    vehicles = []
+    for vehicle in source['vehicles']:
+        entry = {key: value for key, value in vehicle.items() if key not in ('photo', 'photoURL')}
+        entry['image'] = image_ref(f"vehicle-{vehicle['id']}", vehicle.get('photo'), vehicle.get('photoURL'))
+        vehicles.append(entry)
+
+    track = source['track']
+    if track is not None:
+        track = {key: value for key, value in track.items()
+                 if key not in ('photo', 'photoURL', 'layout_photo', 'layout_photoURL')}
+        track['image'] = image_ref('track', source['track'].get('photo'), source['track'].get('photoURL'))
+        track['layoutImage'] = image_ref('track-layout', source['track'].get('layout_photo'),
+                                         source['track'].get('layout_photoURL'))
+
+    bundle = {'version': version, 'profileId': profile_id, 'event': source['event'], 'track': track,
+              'vehicles': vehicles, 'checklists': source['checklists'], 'images': image_urls,
+              'generatedAt': datetime.datetime.now(datetime.timezone.utc).isoformat()}
+    body = app.json.dumps({'success': True, 'bundle': bundle})
+    return RacedayBundle(version, body, images)
+
+
+def get_raceday_bundle(profile_id, event_id):
+    """Returns the compiled bundle for an event, rebuilding it if the data changed. None if the event is missing."""
+    source = read_raceday_source(profile_id, event_id)
+    if source is None:
+        return None
+    version = hashlib.sha1(app.json.dumps(source, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+    key = (profile_id, event_id)
+    with _raceday_bundles_lock:
+        bundle = _raceday_bundles.get(key)
+    if bundle is not None and bundle.version == version:
+        return bundle
+    bundle = compile_raceday_bundle(profile_id, event_id, source, version)
+    with _raceday_bundles_lock:
+        _raceday_bundles.pop(key, None)
+        _raceday_bundles[key] = bundle
+        while len(_raceday_bundles) > RACEDAY_BUNDLE_CACHE_SIZE:
+            del _raceday_bundles[next(iter(_raceday_bundles))]
+    return bundle
+
+
+@app.route('/raceday-bundle/<profile_id>/<event_id>', methods=['GET'])
+def get_raceday_bundle_route(profile_id, event_id):
+    """
+    Returns the race day prep bundle for one event: the event, its vehicles,
+    checklists and track, a version and the list of image URLs it references.
+    """
+    try:
+        bundle = get_raceday_bundle(profile_id, event_id)
+        if bundle is None:
+            return jsonify({'success': False, 'message': 'Event not found.'}), 404
+        return Response(bundle.body, mimetype='application/json')
+    except Exception as e:
+        log.exception("Error building race day bundle for event %s: %s", event_id, e)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/raceday-bundle/<profile_id>/<event_id>/images/<name>', methods=['GET'])
+def get_raceday_bundle_image(profile_id, event_id, name):
+    """Serves an uploaded photo referenced by a bundle. Versioned URLs never change, so they cache forever."""
+    try:
+        with _raceday_bundles_lock:
+            bundle = _raceday_bundles.get((profile_id, event_id))
+        if bundle is None or bundle.version != request.args.get('v'):
+            bundle = get_raceday_bundle(profile_id, event_id)
+        if bundle is None or name not in bundle.images:
+            return jsonify({'success': False, 'message': 'Image not found.'}), 404
+        mimetype, data = bundle.images[name]
+        response = Response(data, mimetype=mimetype)
+        if bundle.version == request.args.get('v'):
+            response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        return response
+    except Exception as e:
+        log.exception("Error serving race day bundle image %s: %s", name, e)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/sw.js', methods=['GET'])
+def service_worker():
+    """Serves the service worker from the root so its scope covers the whole app."""
+    response = app.send_static_file('js/sw.js')
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
 # --- Checklist Routes ---
 @app.route('/add-checklist/<profile_id>', methods=['POST'])
 def add_checklist(profile_id):
     try:
-        data = request.get_json()
-        checklist_data = {
-            'name': data.get('name'),
-            'pre_race_tasks': data.get('pre_race_tasks', []),
-            'mid_day_tasks': data.get('mid_day_tasks', []),
-            'post_race_tasks': data.get('post_race_tasks', []),
-            'created_at': datetime.datetime.now(datetime.timezone.utc)
-        }
-        if not checklist_data['name']:
-            return jsonify({'success': False, 'message': 'Checklist name is required.'}), 400
-
+        checklist = Checklist.from_request(request.get_json()).stamp(created=True)
         doc_ref = db.collection('driver_profiles').document(profile_id).collection('checklists').document()
-        doc_ref.set(checklist_data)
+        doc_ref.set(checklist.to_document())
         return jsonify({'success': True, 'message': 'Checklist created successfully!', 'checklistId': doc_ref.id}), 201
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
@@ -1066,31 +2587,33 @@ def add_checklist(profile_id):
 @app.route('/get-checklists/<profile_id>', methods=['GET'])
 def get_checklists(profile_id):
     try:
-        checklists_ref = db.collection('driver_profiles').document(profile_id).collection('checklists').stream()
-        checklists = [doc.to_dict() for doc in checklists_ref]
-        for checklist, doc in zip(checklists, checklists_ref):
-            checklist['id'] = doc.id
+        checklists_ref = counted(
+            db.collection('driver_profiles').document(profile_id).collection('checklists').stream())
+        checklists = [Checklist.from_doc(doc).to_json() for doc in checklists_ref]
         return jsonify({'success': True, 'checklists': checklists}), 200
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@app.route('/update-checklist/<profile_id>/<checklist_id>', methods=['PUT'])
+@app.route('/update-checklist/<profile_id>/<checklist_id>', methods=['PUT', 'PATCH'])
 def update_checklist(profile_id, checklist_id):
     try:
         data = request.get_json()
-        updates = {
-            'name': data.get('name'),
-            'pre_race_tasks': data.get('pre_race_tasks', []),
-            'mid_day_tasks': data.get('mid_day_tasks', []),
-            'post_race_tasks': data.get('post_race_tasks', []),
-        }
-        if not updates['name']:
-            return jsonify({'success': False, 'message': 'Checklist name is required.'}), 400
+        if request.method == 'PATCH':
+            checklist_ref = db.collection('driver_profiles').document(profile_id).collection('checklists').document(
+                checklist_id)
+            Checklist.validate_patch(data)
+            apply_patch(checklist_ref, data, Checklist.PATCH_FIELDS, array_fields=Checklist.ARRAY_FIELDS,
+                        required=Checklist.REQUIRED_KEYS)
+            return jsonify({'success': True, 'message': 'Checklist updated successfully!'}), 200
+
+        updates = Checklist.from_request(data).stamp().to_document()
 
         db.collection('driver_profiles').document(profile_id).collection('checklists').document(checklist_id).update(
             updates)
         return jsonify({'success': True, 'message': 'Checklist updated successfully!'}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
@@ -1098,32 +2621,358 @@ def update_checklist(profile_id, checklist_id):
 @app.route('/delete-checklist/<profile_id>/<checklist_id>', methods=['DELETE'])
 def delete_checklist(profile_id, checklist_id):
     try:
-        db.collection('driver_profiles').document(profile_id).collection('checklists').document(checklist_id).delete()
+        delete_with_tombstone(profile_id, 'checklists', checklist_id)
         return jsonify({'success': True, 'message': 'Checklist deleted successfully!'}), 200
     except Exception as e:
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
 
+# --- Delta Sync Routes ---
+# Synced collections carry an 'updated_at' stamp on every write, and deletes leave a
+# tombstone in the profile's 'tombstones' subcollection, so offline-capable
+# clients can pull only what changed since their last sync.
+SYNC_COLLECTIONS = ['garages', 'vehicles', 'events', 'checklists']
+# Re-send changes from slightly before the token to cover writes that were still
+# in flight when the previous sync ran. Clients apply changes by ID, so repeats are harmless.
+SYNC_OVERLAP = datetime.timedelta(seconds=5)
+TOMBSTONE_RETENTION = datetime.timedelta(days=30)
+
+
+def delete_with_tombstone(profile_id, collection, doc_id):
+    """
+    Deletes a profile subcollection document and records a tombstone for delta sync
+    in the same atomic batch.
+    """
+    profile_ref = db.collection('driver_profiles').document(profile_id)
+    batch = db.batch()
+    batch.delete(profile_ref.collection(collection).document(doc_id))
+    batch.set(profile_ref.collection('tombstones').document(f'{collection}_{doc_id}'), {
+        'collection': collection,
+        'docId': doc_id,
+        'deleted_at': datetime.datetime.now(datetime.timezone.utc)
+    })
+    batch.commit()
+
+
+def prune_tombstones(profile_ref, now):
+    expired = profile_ref.collection('tombstones').where('deleted_at', '<', now - TOMBSTONE_RETENTION).limit(100)
+    batch = db.batch()
+    pruned = 0
+    for doc in counted(expired.stream()):
+        batch.delete(doc.reference)
+        pruned += 1
+    if pruned:
+        batch.commit()
+
+
+@app.route('/sync/<profile_id>', methods=['GET'])
+def sync_profile(profile_id):
+    """
+    Returns garages, vehicles, events and checklists changed since the 'since' token,
+    plus the IDs deleted since then. Without a token (or with one older than the
+    tombstone retention window) everything is returned and 'full' is true.
+    The returned 'token' is passed as 'since' on the next call.
+    """
+    try:
+        now = datetime.datetime.now(datetime.timezone.utc)
+        since = request.args.get('since')
+        since_time = None
+        if since:
+            try:
+                since_time = datetime.datetime.fromisoformat(since.replace('Z', '+00:00'))
+            except ValueError:
+                return jsonify({'success': False, 'message': 'Invalid sync token.'}), 400
+            if since_time.tzinfo is None:
+                since_time = since_time.replace(tzinfo=datetime.timezone.utc)
+            if since_time < now - TOMBSTONE_RETENTION:
+                since_time = None
+
+        profile_ref = db.collection('driver_profiles').document(profile_id)
+        changes = {}
+        for collection in SYNC_COLLECTIONS:
+            query = profile_ref.collection(collection)
+            if since_time:
+                query = query.where('updated_at', '>', since_time - SYNC_OVERLAP)
+            changes[collection] = []
+            for doc in counted(query.stream()):
+                item = doc.to_dict()
+                item['id'] = doc.id
+                changes[collection].append(item)
+
+        deleted = {collection: [] for collection in SYNC_COLLECTIONS}
+        if since_time:
+            tombstones = profile_ref.collection('tombstones').where('deleted_at', '>', since_time - SYNC_OVERLAP)
+            for doc in counted(tombstones.stream()):
+                tombstone = doc.to_dict()
+                if tombstone.get('collection') in deleted:
+                    deleted[tombstone['collection']].append(tombstone.get('docId'))
+        else:
+            prune_tombstones(profile_ref, now)
+
+        change_count = sum(len(items) for items in changes.values())
+        log.info("Sync for profile %s: %s change(s), full=%s", profile_id, change_count, since_time is None)
+        return jsonify({
+            'success': True,
+            'full': since_time is None,
+            'token': now.strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+            'changes': changes,
+            'deleted': deleted
+        }), 200
+    except Exception as e:
+        log.exception("Error syncing profile %s: %s", profile_id, e)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+# --- Batch Operations ---
+# /batch runs a multi-step client action (set up a profile with its garages,
+# vehicles and checklists, import a season of events) in one round-trip. Every
+# operation is validated and every limit and name checked before anything is
+# written; document IDs are allocated up front so a later operation can point at
+# an earlier one with {"$ref": "<name>"}. Writes go out in as few Firestore
+# batches as possible (one, unless the request needs more than 500 writes), with
+# the operations that claim unique names first, so a name taken by a concurrent
+# request fails the whole request before anything else is committed.
+BATCH_OPERATION_LIMIT = 500
+BATCH_WRITE_LIMIT = 500  # Firestore's limit per batch
+CLAIMING_OPERATIONS = ('create-profile', 'add-garage')
+
+
+class BatchError(ValueError):
+    """An invalid operation in a /batch request."""
+
+    def __init__(self, index, message):
+        super().__init__(f'Operation {index}: {message}')
+        self.index = index
+
+
+class BatchPlan:
+    """The validated writes of a /batch request, built by plan_batch."""
+
+    def __init__(self):
+        self.refs = {}  # name -> (op, profile_id, doc_id)
+        self.steps = []  # {'index', 'op', 'ref', 'id', 'profile_id', 'model', 'writes'}
+        self.usernames = {}
+        self.garage_names = {}
+        self.new_profiles = set()
+
+    def resolve(self, value, index):
+        """Replaces {'$ref': name} values, at any depth, with the ID created by an earlier operation."""
+        if isinstance(value, dict):
+            if set(value) == {'$ref'}:
+                name = value['$ref']
+                if name not in self.refs:
+                    raise BatchError(index, f'Unknown reference "{name}". References must name an earlier operation.')
+                return self.refs[name][2]
+            return {key: self.resolve(item, index) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.resolve(item, index) for item in value]
+        return value
+
+    def profile_id(self, operation, index):
+        value = operation.get('profileId')
+        if isinstance(value, dict) and set(value) == {'$ref'}:
+            target = self.refs.get(value['$ref'])
+            if target is not None and target[0] != 'create-profile':
+                raise BatchError(index, f'"{value["$ref"]}" is not a profile.')
+        profile_id = self.resolve(value, index)
+        if not profile_id or not isinstance(profile_id, str):
+            raise BatchError(index, 'profileId is required.')
+        return profile_id
+
+
+def plan_create_profile(plan, index, operation, data):
+    profile = Profile.from_request(data).stamp(created=True)
+    key = unique_name_key(profile.username)
+    if key in plan.usernames:
+        raise BatchError(index, f'Username "{profile.username}" is used twice in this batch.')
+    profile_ref = db.collection('driver_profiles').document()
+    plan.usernames[key] = profile.username
+    plan.new_profiles.add(profile_ref.id)
+    return profile_ref, None, profile, [
+        ('create', username_ref(profile.username), {'profileId': profile_ref.id, 'name': profile.username}),
+        ('set', profile_ref, profile.to_document())]
+
+
+def plan_add_garage(plan, index, operation, data):
+    profile_id = plan.profile_id(operation, index)
+    garage = Garage.from_request(data).stamp(created=True)
+    key = (profile_id, unique_name_key(garage.name))
+    if key in plan.garage_names:
+        raise BatchError(index, f'Garage name "{garage.name}" is used twice in this batch.')
+    garage_ref = db.collection('driver_profiles').document(profile_id).collection('garages').document()
+    plan.garage_names[key] = garage.name
+    return garage_ref, profile_id, garage, [
+        ('create', garage_name_ref(profile_id, garage.name), {'garageId': garage_ref.id, 'name': garage.name}),
+        ('set', garage_ref, garage.to_document())]
+
+
+def plan_profile_child(model, collection):
+    def plan_child(plan, index, operation, data):
+        profile_id = plan.profile_id(operation, index)
+        item = (event_from_request(data) if model is Event else model.from_request(data)).stamp(created=True)
+        doc_ref = db.collection('driver_profiles').document(profile_id).collection(collection).document()
+        return doc_ref, profile_id, item, [('set', doc_ref, None)]
+    return plan_child
+
+
+BATCH_OPERATIONS = {
+    'create-profile': plan_create_profile,
+    'add-garage': plan_add_garage,
+    'add-vehicle': plan_profile_child(Vehicle, 'vehicles'),
+    'add-checklist': plan_profile_child(Checklist, 'checklists'),
+    'add-event': plan_profile_child(Event, 'events'),
+}
+
+
+def plan_batch(operations):
+    """
+    Validates a /batch request and returns its BatchPlan. Raises BatchError for
+    a bad operation, PermissionError for a limit, LookupError for a missing
+    profile and DuplicateNameError for a name that is already taken.
+    """
+    if not isinstance(operations, list) or not operations:
+        raise ValueError('operations must be a non-empty list.')
+    if len(operations) > BATCH_OPERATION_LIMIT:
+        raise ValueError(f'A batch can have at most {BATCH_OPERATION_LIMIT} operations.')
+
+    plan = BatchPlan()
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict) or operation.get('op') not in BATCH_OPERATIONS:
+            raise BatchError(index, f'op must be one of {", ".join(BATCH_OPERATIONS)}.')
+        name = operation.get('ref')
+        if name is not None and (not isinstance(name, str) or name in plan.refs):
+            raise BatchError(index, 'ref must be a name not used by an earlier operation.')
+        try:
+            data = plan.resolve(operation.get('data') or {}, index)
+            doc_ref, profile_id, model, writes = BATCH_OPERATIONS[operation['op']](plan, index, operation, data)
+        except BatchError:
+            raise
+        except ValueError as e:
+            raise BatchError(index, str(e))
+        if name is not None:
+            plan.refs[name] = (operation['op'], profile_id, doc_ref.id)
+        plan.steps.append({'index': index, 'op': operation['op'], 'ref': name, 'id': doc_ref.id,
+                           'profile_id': profile_id, 'model': model, 'writes': writes})
+
+    claiming_writes = sum(len(step['writes']) for step in plan.steps if step['op'] in CLAIMING_OPERATIONS)
+    if claiming_writes > BATCH_WRITE_LIMIT:
+        raise ValueError(f'A batch can create at most {BATCH_WRITE_LIMIT // 2} profiles and garages.')
+    check_batch_state(plan)
+    return plan
+
+
+def check_batch_state(plan):
+    """The checks that need Firestore: existing profiles, limits and name reservations."""
+    new_profiles = sum(1 for step in plan.steps if step['op'] == 'create-profile')
+    if new_profiles:
+        profile_limit = get_limit('admin_settings', 'profiles', 3)
+        if len(list(counted(db.collection('driver_profiles').stream()))) + new_profiles > profile_limit:
+            raise PermissionError(f'Profile limit of {profile_limit} reached.')
+
+    profile_ids = {step['profile_id'] for step in plan.steps if step['profile_id']}
+    for profile_id in profile_ids - plan.new_profiles:
+        if not counted_get(db.collection('driver_profiles').document(profile_id)).exists:
+            raise LookupError(f'Profile {profile_id} not found.')
+
+    for op, collection, setting, default in (('add-garage', 'garages', 'garages', 10),
+                                             ('add-vehicle', 'vehicles', 'vehicles', 25)):
+        steps = [step for step in plan.steps if step['op'] == op]
+        if not steps:
+            continue
+        limit = get_limit('admin_settings', setting, default)
+        for profile_id in {step['profile_id'] for step in steps}:
+            existing = [] if profile_id in plan.new_profiles else list(
+                counted(db.collection('driver_profiles').document(profile_id).collection(collection).stream()))
+            added = [step for step in steps if step['profile_id'] == profile_id]
+            if len(existing) + len(added) > limit:
+                raise PermissionError(f'{setting.capitalize()[:-1]} limit of {limit} reached.')
+            if op == 'add-vehicle':
+                # Append after the profile's current last vehicle, in batch order.
+                last_order = max((doc.to_dict().get('order', 0) for doc in existing), default=-1)
+                for offset, step in enumerate(added, start=1):
+                    step['model'].order = math.floor(last_order) + offset
+
+    for step in plan.steps:
+        for method, ref, data in step['writes']:
+            if method == 'create' and counted_get(ref).exists:
+                raise DuplicateNameError(data['name'])
+
+
+def commit_batch(plan):
+    """
+    Commits the plan in as few batches as possible, name-claiming operations first.
+    Reservations are written with create(), which fails if a concurrent request
+    claimed the name after check_batch_state, so the first batch is all or nothing.
+    """
+    ordered = sorted(plan.steps, key=lambda step: step['op'] not in CLAIMING_OPERATIONS)
+    batch, writes = db.batch(), 0
+    for step in ordered:
+        if writes + len(step['writes']) > BATCH_WRITE_LIMIT:
+            batch.commit()
+            batch, writes = db.batch(), 0
+        for method, ref, data in step['writes']:
+            if method == 'create':
+                batch.create(ref, data)
+            else:
+                batch.set(ref, data if data is not None else step['model'].to_document())
+        writes += len(step['writes'])
+    batch.commit()
+
+
+@app.route('/batch', methods=['POST'])
+def run_batch():
+    """
+    Runs an ordered list of operations in one request, e.g.:
+    {"operations": [
+        {"op": "create-profile", "ref": "me", "data": {"username": "Ana"}},
+        {"op": "add-garage", "ref": "home", "profileId": {"$ref": "me"}, "data": {"garageName": "Home"}},
+        {"op": "add-vehicle", "profileId": {"$ref": "me"}, "data": {"year": "2020", "make": "Mazda",
+                                                                    "model": "MX-5", "garageId": {"$ref": "home"}}}
+    ]}
+    Returns each operation's new document ID, in request order.
+    """
+    try:
+        plan = plan_batch((request.get_json() or {}).get('operations'))
+        try:
+            commit_batch(plan)
+        except Conflict:
+            return jsonify({'success': False, 'message': 'A name in this batch was just taken. Nothing was saved.'}), 409
+
+        results = []
+        for step in plan.steps:
+            result = {'op': step['op'], 'ref': step['ref'], 'id': step['id']}
+            if step['op'] == 'add-event':
+                result['conflicts'] = record_event_write(step['profile_id'], step['id'], step['model'].to_document())
+            results.append(result)
+        log.info("Batch of %s operation(s) committed.", len(results))
+        return jsonify({'success': True, 'message': f'{len(results)} operation(s) completed.', 'results': results,
+                        'refs': {name: target[2] for name, target in plan.refs.items()}}), 201
+    except BatchError as e:
+        return jsonify({'success': False, 'message': str(e), 'index': e.index}), 400
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except PermissionError as e:
+        return jsonify({'success': False, 'message': str(e)}), 403
+    except LookupError as e:
+        return jsonify({'success': False, 'message': str(e)}), 404
+    except DuplicateNameError as e:
+        return jsonify({'success': False, 'message': f'The name "{e}" is already taken.'}), 409
+    except Exception as e:
+        log.exception("Error running batch: %s", e)
+        return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
+
+
 # --- Lap Time Routes ---
 @app.route('/add-lap-time', methods=['POST'])
 def add_lap_time():
     try:
-        data = request.get_json()
-        event_id = data.get('eventId')
-        lap_time = data.get('lapTime')
-        username = data.get('username')
-
-        if not all([event_id, lap_time, username]):
-            return jsonify({'success': False, 'message': 'Missing data.'}), 400
-
+        lap = LapTime.from_request(request.get_json()).stamp(created=True)
         doc_ref = db.collection('lap_times').document()
-        doc_ref.set({
-            'eventId': event_id,
-            'lapTime': lap_time,
-            'username': username,
-            'timestamp': datetime.datetime.now(datetime.timezone.utc)
-        })
+        doc_ref.set(lap.to_document())
+        invalidate_lap_analytics(event_ids=[lap.eventId], usernames=[lap.username])
         return jsonify({'success': True, 'message': 'Lap time recorded!', 'lapId': doc_ref.id}), 201
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -1132,14 +2981,9 @@ def add_lap_time():
 def get_lap_times(event_id):
     try:
         lap_time_settings = get_lap_time_settings()
-        times_ref = db.collection('lap_times').where('eventId', '==', event_id).stream()
-        lap_times = []
-        for doc in times_ref:
-            time = doc.to_dict()
-            time['id'] = doc.id
-            lap_times.append(time)
-
-        lap_times.sort(key=lambda x: x['lapTime'])
+        times_ref = counted(db.collection('lap_times').where('eventId', '==', event_id).stream())
+        laps = sorted((LapTime.from_doc(doc) for doc in times_ref), key=lambda lap: lap.lapTime)
+        lap_times = [lap.to_json() for lap in laps]
         return jsonify({
             'success': True,
             'lap_times': lap_times,
@@ -1156,8 +3000,9 @@ def update_lap_time(lap_id):
         new_lap_time = data.get('lapTime')
         requesting_user = data.get('username')
 
+        LapTime.validate_value('lapTime', new_lap_time)
         lap_ref = db.collection('lap_times').document(lap_id)
-        lap_doc = lap_ref.get()
+        lap_doc = counted_get(lap_ref)
 
         if not lap_doc.exists:
             return jsonify({'success': False, 'message': 'Lap time not found.'}), 404
@@ -1166,10 +3011,13 @@ def update_lap_time(lap_id):
             return jsonify({'success': False, 'message': 'You can only edit your own lap times.'}), 403
 
         lap_ref.update({'lapTime': new_lap_time})
-        print(f"✅ Lap time updated: {lap_id}")
+        invalidate_lap_analytics(event_ids=[lap_doc.to_dict().get('eventId')], usernames=[requesting_user])
+        log.info("Lap time updated: %s", lap_id)
         return jsonify({'success': True, 'message': 'Lap time updated successfully!'}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
-        print(f"❌ Error updating lap time: {e}")
+        log.exception("Error updating lap time: %s", e)
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
 
@@ -1180,37 +3028,372 @@ def delete_lap_time(lap_id):
         if not settings['deletion_enabled']:
             return jsonify({'success': False, 'message': 'Deletion is not enabled.'}), 403
 
-        db.collection('lap_times').document(lap_id).delete()
-        print(f"✅ Lap time deleted: {lap_id}")
+        lap_ref = db.collection('lap_times').document(lap_id)
+        lap_doc = counted_get(lap_ref)
+        lap_ref.delete()
+        if lap_doc.exists:
+            lap = lap_doc.to_dict()
+            invalidate_lap_analytics(event_ids=[lap.get('eventId')], usernames=[lap.get('username')])
+            if lap.get('telemetry'):
+                telemetry_store.remove_lap(lap.get('eventId'), lap_id)
+        log.info("Lap time deleted: %s", lap_id)
         return jsonify({'success': True, 'message': 'Lap time deleted successfully!'}), 200
     except Exception as e:
-        print(f"❌ Error deleting lap time: {e}")
+        log.exception("Error deleting lap time: %s", e)
+        return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
+
+
+@app.route('/import-lap-times', methods=['POST'])
+def import_lap_times():
+    """
+    Bulk imports lap times from a timing-system CSV or NDJSON export.
+    The file can be sent as a multipart 'file' upload or as the raw request body.
+    Rows are stream-parsed and written in batches; bad rows are reported, not fatal.
+    """
+    try:
+        options = request.form if request.files else request.args
+        event_id = options.get('eventId')
+        username = options.get('username')
+        driver_map = json.loads(options['driverMap']) if options.get('driverMap') else None
+        if driver_map is not None and not isinstance(driver_map, dict):
+            raise ValueError('driverMap must be an object mapping names or transponders to usernames.')
+
+        upload = request.files.get('file')
+        if upload:
+            stream = upload.stream
+            input_format = options.get('format') or lap_import.detect_format(upload.filename, upload.mimetype)
+        else:
+            stream = request.stream
+            input_format = options.get('format') or lap_import.detect_format(content_type=request.content_type)
+
+        text = lap_import.text_stream(stream)
+        rows = lap_import.iter_ndjson_rows(text) if input_format == 'ndjson' else lap_import.iter_csv_rows(text)
+        summary = lap_import.import_lap_rows(db, rows, event_id, username, driver_map)
+        invalidate_lap_analytics(event_ids=summary['event_ids'], all_drivers=True)
+
+        log.info("Imported %s lap time(s) with %s row error(s).", summary['imported'], summary['error_count'])
+        return jsonify({
+            'success': True,
+            'message': f"Imported {summary['imported']} lap time(s).",
+            **summary
+        }), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'message': f'Invalid import options: {e}'}), 400
+    except Exception as e:
+        log.exception("Error importing lap times: %s", e)
+        return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
+
+
+# --- Lap Time Analytics ---
+# Aggregates are cached per event and per driver, and dropped whenever a lap
+# time for that event or driver is added, edited, deleted or imported. Every
+# invalidation bumps a generation, and a result computed while the generation
+# changed is returned but not stored, since it may predate the write.
+LAP_ANALYTICS_CACHE_SIZE = 256
+_lap_analytics_cache = {}
+_lap_analytics_generation = 0
+_lap_analytics_lock = threading.Lock()
+
+
+def invalidate_lap_analytics(event_ids=(), usernames=(), all_drivers=False):
+    global _lap_analytics_generation
+    with _lap_analytics_lock:
+        _lap_analytics_generation += 1
+        for event_id in event_ids:
+            _lap_analytics_cache.pop(('event', event_id), None)
+        for username in usernames:
+            _lap_analytics_cache.pop(('driver', username), None)
+        if all_drivers:
+            for key in [key for key in _lap_analytics_cache if key[0] == 'driver']:
+                del _lap_analytics_cache[key]
+
+
+def get_cached_lap_analytics(kind, key, field, group_by):
+    cache_key = (kind, key)
+    with _lap_analytics_lock:
+        cached = _lap_analytics_cache.get(cache_key)
+        generation = _lap_analytics_generation
+    if cached is not None:
+        return cached
+
+    laps = [doc.to_dict() for doc in counted(db.collection('lap_times').where(field, '==', key).stream())]
+    stats = lap_analytics.compute_lap_stats(laps, group_by=group_by)
+    with _lap_analytics_lock:
+        if generation == _lap_analytics_generation:
+            _lap_analytics_cache[cache_key] = stats
+            while len(_lap_analytics_cache) > LAP_ANALYTICS_CACHE_SIZE:
+                del _lap_analytics_cache[next(iter(_lap_analytics_cache))]
+    return stats
+
+
+@app.route('/lap-analytics/event/<event_id>', methods=['GET'])
+def get_event_lap_analytics(event_id):
+    """
+    Returns per-driver lap statistics for one event: best, mean, median,
+    consistency (standard deviation), gap to the leader and lap-over-lap improvement.
+    """
+    try:
+        stats = get_cached_lap_analytics('event', event_id, 'eventId', 'username')
+        return jsonify({'success': True, 'eventId': event_id, 'drivers': stats['groups'],
+                        'overall': stats['overall'], 'lap_count': stats['lap_count']}), 200
+    except Exception as e:
+        log.exception("Error computing lap analytics for event %s: %s", event_id, e)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/lap-analytics/driver/<username>', methods=['GET'])
+def get_driver_lap_analytics(username):
+    """
+    Returns one driver's lap statistics broken down by event.
+    """
+    try:
+        stats = get_cached_lap_analytics('driver', username, 'username', 'eventId')
+        return jsonify({'success': True, 'username': username, 'events': stats['groups'],
+                        'overall': stats['overall'], 'lap_count': stats['lap_count']}), 200
+    except Exception as e:
+        log.exception("Error computing lap analytics for driver %s: %s", username, e)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+# --- Lap Telemetry ---
+# Sector splits and logger channels are stored column-wise on local disk (see
+# lap_telemetry.py); the lap_times document only gets a 'telemetry' summary.
+telemetry_store = lap_telemetry.TelemetryStore()
+
+
+@app.route('/lap-telemetry/<lap_id>', methods=['POST'])
+def add_lap_telemetry(lap_id):
+    """
+    Attaches sector times and/or telemetry channels to a lap, replacing any sent before.
+    Body: {'username', 'sectors': [31.2, '0:29.874', ...], 'channels': {'speed': [...], ...}}
+    """
+    try:
+        data = request.get_json()
+        lap_ref = db.collection('lap_times').document(lap_id)
+        lap_doc = counted_get(lap_ref)
+        if not lap_doc.exists:
+            return jsonify({'success': False, 'message': 'Lap time not found.'}), 404
+
+        lap = lap_doc.to_dict()
+        if lap.get('username') != data.get('username'):
+            return jsonify({'success': False, 'message': 'You can only add telemetry to your own lap times.'}), 403
+
+        summary = telemetry_store.add_lap(lap.get('eventId'), lap_id, lap.get('username'),
+                                          sectors=data.get('sectors'), channels=data.get('channels'))
+        lap_ref.update({'telemetry': summary})
+        log.info("Telemetry stored for lap %s: %s sample(s)", lap_id, summary['samples'])
+        return jsonify({'success': True, 'message': 'Telemetry saved!', 'telemetry': summary}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        log.exception("Error storing lap telemetry: %s", e)
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
 
+@app.route('/lap-telemetry/<lap_id>', methods=['GET'])
+def get_lap_telemetry(lap_id):
+    """Returns one lap's sector times and full channel traces."""
+    try:
+        lap_doc = counted_get(db.collection('lap_times').document(lap_id))
+        detail = None
+        if lap_doc.exists:
+            detail = lap_telemetry.lap_detail(telemetry_store.load(lap_doc.to_dict().get('eventId')), lap_id)
+        if detail is None:
+            return jsonify({'success': False, 'message': 'No telemetry for this lap.'}), 404
+        return jsonify({'success': True, **detail}), 200
+    except Exception as e:
+        log.exception("Error getting lap telemetry: %s", e)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/lap-telemetry/event/<event_id>', methods=['GET'])
+def get_event_telemetry(event_id):
+    """
+    Theoretical best laps (sum of best sectors), each driver's sector deltas to a
+    reference driver (?reference=, default the fastest) and sector distributions.
+    ?channel=speed adds each lap's min/mean/max for that channel.
+    """
+    try:
+        view = telemetry_store.load(event_id)
+        return jsonify({
+            'success': True,
+            'eventId': event_id,
+            'theoretical_best': lap_telemetry.theoretical_best(view),
+            'deltas': lap_telemetry.sector_deltas(view, request.args.get('reference')),
+            'distributions': lap_telemetry.distributions(view, request.args.get('channel'))
+        }), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        log.exception("Error computing telemetry for event %s: %s", event_id, e)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 # --- Track Management Routes ---
+# Tracks are global and read-mostly, so reads are served from an in-memory replica
+# kept current by a Firestore listener (see tracks_replica.py).
+tracks_replica = TracksReplica(db.collection('tracks'))
+# The search index follows every replica change, including this process's own writes.
+track_search_index = TrackSearchIndex()
+tracks_replica.subscribe(track_search_index.update)
+TRACK_SEARCH_LIMIT = 100
+NEARBY_DEFAULT_RADIUS_KM = 50
+NEARBY_MAX_RADIUS_KM = 1000
+TRACK_LOCATION_FIELDS = ('lat', 'lon', 'geohash')
+
+
+def track_location_fields(data, resolve=True):
+    """
+    Returns the lat, lon and geohash to store for a track. Explicit lat/lon win;
+    otherwise coordinates are read from google_url. Returns {} when neither gives
+    a location. Raises ValueError for out-of-range coordinates.
+    """
+    if data.get('lat') is not None and data.get('lon') is not None:
+        try:
+            coordinates = float(data['lat']), float(data['lon'])
+        except (TypeError, ValueError):
+            raise ValueError('lat and lon must be numbers.')
+        if not geo.valid_coordinates(*coordinates):
+            raise ValueError('lat must be between -90 and 90 and lon between -180 and 180.')
+    else:
+        coordinates = geo.coordinates_from_url(data.get('google_url'), resolve=resolve)
+    if coordinates is None:
+        return {}
+    lat, lon = coordinates
+    return {'lat': lat, 'lon': lon, 'geohash': geo.encode(lat, lon)}
+
+
+def get_track_map():
+    """Returns {track_id: track}, reading Firestore only if the replica is not ready."""
+    if tracks_replica.wait_until_ready():
+        return tracks_replica.as_dict()
+    return {doc.id: doc.to_dict() for doc in counted(db.collection('tracks').stream())}
+
+
+def get_track(track_id):
+    """Returns one track, falling back to Firestore if the replica does not have it yet."""
+    if tracks_replica.wait_until_ready():
+        track = tracks_replica.get(track_id)
+        if track is not None:
+            return track
+    track_doc = counted_get(db.collection('tracks').document(track_id))
+    return track_doc.to_dict() if track_doc.exists else None
+
+
+@app.route('/tracks-replica-stats', methods=['GET'])
+def get_tracks_replica_stats():
+    """
+    Reports the tracks replica's size, mode and how far behind Firestore it may be.
+    """
+    return jsonify({'success': True, 'replica': tracks_replica.metrics()}), 200
+
+
+@app.route('/search-tracks', methods=['GET'])
+def search_tracks():
+    """
+    Typeahead search over track name, location and type. Every word in 'q' is
+    matched as a prefix. Results are paged with 'offset' and 'limit'.
+    """
+    try:
+        query = request.args.get('q', '')
+        offset = request.args.get('offset', 0, type=int)
+        limit = request.args.get('limit', 20, type=int)
+        if offset < 0 or not 1 <= limit <= TRACK_SEARCH_LIMIT:
+            return jsonify({'success': False,
+                            'message': f'offset must be 0 or more and limit between 1 and {TRACK_SEARCH_LIMIT}.'}), 400
+        if not tracks_replica.wait_until_ready():
+            return jsonify({'success': False, 'message': 'Track search is still loading. Try again shortly.'}), 503
+
+        total, track_ids = track_search_index.search(query, offset, limit)
+        tracks = []
+        for track_id in track_ids:
+            track = tracks_replica.get(track_id)
+            if track is not None:
+                track['id'] = track_id
+                tracks.append(track)
+        next_offset = offset + limit if offset + limit < total else None
+        return jsonify({'success': True, 'tracks': tracks, 'total': total, 'nextOffset': next_offset}), 200
+    except Exception as e:
+        log.exception("Error searching tracks: %s", e)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/tracks/nearby', methods=['GET'])
+def get_nearby_tracks():
+    """
+    Lists tracks within 'radius' km of lat/lon, nearest first. The circle is
+    covered by at most nine geohash cells, each read with one range query on the
+    geohash field, and the candidates are then filtered by true distance.
+    """
+    try:
+        lat = request.args.get('lat', type=float)
+        lon = request.args.get('lon', type=float)
+        radius = request.args.get('radius', NEARBY_DEFAULT_RADIUS_KM, type=float)
+        if lat is None or lon is None or not geo.valid_coordinates(lat, lon):
+            return jsonify({'success': False, 'message': 'Valid lat and lon are required.'}), 400
+        if not 0 < radius <= NEARBY_MAX_RADIUS_KM:
+            return jsonify({'success': False,
+                            'message': f'radius must be between 0 and {NEARBY_MAX_RADIUS_KM} km.'}), 400
+
+        tracks = []
+        for prefix in geo.query_prefixes(lat, lon, radius):
+            cell_query = db.collection('tracks').order_by('geohash').start_at([prefix]).end_at([prefix + '~'])
+            for doc in counted(cell_query.stream()):
+                track = doc.to_dict()
+                distance = geo.haversine_km(lat, lon, track['lat'], track['lon'])
+                if distance <= radius:
+                    track['id'] = doc.id
+                    track['distance_km'] = round(distance, 2)
+                    tracks.append(track)
+        tracks.sort(key=lambda t: t['distance_km'])
+        return jsonify({'success': True, 'tracks': tracks}), 200
+    except Exception as e:
+        log.exception("Error finding nearby tracks: %s", e)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+def backfill_track_locations():
+    """Adds lat, lon and geohash to tracks saved before they existed. Returns the number located."""
+    located = 0
+    for doc in counted(db.collection('tracks').stream()):
+        track = doc.to_dict()
+        if 'geohash' in track:
+            continue
+        fields = track_location_fields(track)
+        if fields:
+            doc.reference.update(fields)
+            tracks_replica.apply_local(doc.id, {**track, **fields})
+            located += 1
+    return located
+
+
+@app.route('/backfill-track-locations', methods=['POST'])
+def backfill_track_locations_route():
+    """
+    Derives coordinates for existing tracks from their map links.
+    """
+    try:
+        located = backfill_track_locations()
+        log.info("Located %s track(s) from their map links.", located)
+        return jsonify({'success': True, 'message': f'Located {located} track(s).', 'located': located}), 200
+    except Exception as e:
+        log.exception("Error backfilling track locations: %s", e)
+        return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
+
+
 @app.route('/add-track', methods=['POST'])
 def add_track():
     try:
         data = request.get_json()
-        track_data = {
-            'name': data.get('name'),
-            'location': data.get('location'),
-            'type': data.get('type'),
-            'photo': data.get('photo'),
-            'photoURL': data.get('photoURL'),
-            'layout_photo': data.get('layout_photo'),
-            'layout_photoURL': data.get('layout_photoURL'),
-            'google_url': data.get('google_url'),
-            'profileId': data.get('profileId'),  # Creator's ID for ownership
-            'created_at': datetime.datetime.now(datetime.timezone.utc)
-        }
-        if not all([track_data['name'], track_data['location'], track_data['type'], track_data['profileId']]):
-            return jsonify({'success': False, 'message': 'Missing required track data.'}), 400
+        track_data = Track.from_request(data).stamp(created=True).to_document()
+        track_data.update(track_location_fields(data))
 
         doc_ref = db.collection('tracks').document()
         doc_ref.set(track_data)
+        tracks_replica.apply_local(doc_ref.id, track_data)
         return jsonify({'success': True, 'message': 'Track added successfully!', 'trackId': doc_ref.id}), 201
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
@@ -1218,7 +3401,7 @@ def add_track():
 @app.route('/get-all-tracks', methods=['GET'])
 def get_all_tracks():
     try:
-        all_events_ref = db.collection_group('events').stream()
+        all_events_ref = counted(db.collection_group('events').stream())
         events_by_track = {}
         for doc in all_events_ref:
             event = doc.to_dict()
@@ -1228,15 +3411,11 @@ def get_all_tracks():
                     events_by_track[track_id] = []
                 events_by_track[track_id].append(event.get('name'))
 
-        tracks_ref = db.collection('tracks').stream()
         tracks = []
-        for doc in tracks_ref:
-            track = doc.to_dict()
-            track['id'] = doc.id
-            track['events'] = events_by_track.get(doc.id, [])
-            tracks.append(track)
+        for track_id, track in get_track_map().items():
+            tracks.append({**Track.from_data(track_id, track).to_json(), 'events': events_by_track.get(track_id, [])})
 
-        tracks.sort(key=lambda x: x.get('name', ''))
+        tracks.sort(key=lambda x: x.get('name') or '')
         return jsonify({'success': True, 'tracks': tracks}), 200
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -1248,16 +3427,30 @@ def update_track(track_id):
         data = request.get_json()
         requesting_user_id = data.pop('profileId', None)
 
-        track_ref = db.collection('tracks').document(track_id)
-        track_doc = track_ref.get()
-        if not track_doc.exists:
+        track = get_track(track_id)
+        if track is None:
             return jsonify({'success': False, 'message': 'Track not found.'}), 404
 
-        if track_doc.to_dict().get('profileId') != requesting_user_id:
+        if track.get('profileId') != requesting_user_id:
             return jsonify({'success': False, 'message': 'You can only edit tracks you created.'}), 403
 
-        track_ref.update(data)
+        updates = Track.validate_patch(data)
+        # The edit form sends google_url every time, so only a changed value is looked up.
+        changed = {key for key in ('lat', 'lon', 'google_url') if key in data and data[key] != track.get(key)}
+        if changed & {'lat', 'lon'}:
+            # New coordinates; clearing them falls back to the map link, or removes the location.
+            source = {key: data.get(key, track.get(key)) for key in ('lat', 'lon', 'google_url')}
+            updates.update(track_location_fields(source) or dict.fromkeys(TRACK_LOCATION_FIELDS, firestore.DELETE_FIELD))
+        elif changed and (data.get('lat') is None or data.get('lon') is None):
+            # A new map link moves the track only if it gives coordinates; it never clears them.
+            updates.update(track_location_fields({'google_url': data['google_url']}))
+        updates['updated_at'] = datetime.datetime.now(datetime.timezone.utc)
+        db.collection('tracks').document(track_id).update(updates)
+        tracks_replica.apply_local(track_id, {key: value for key, value in {**track, **updates}.items()
+                                              if value is not firestore.DELETE_FIELD})
         return jsonify({'success': True, 'message': 'Track updated successfully!'}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
@@ -1268,23 +3461,130 @@ def delete_track(track_id):
         data = request.get_json()
         requesting_user_id = data.get('profileId')
 
-        track_ref = db.collection('tracks').document(track_id)
-        track_doc = track_ref.get()
-        if not track_doc.exists:
+        track = get_track(track_id)
+        if track is None:
             return jsonify({'success': False, 'message': 'Track not found.'}), 404
 
-        if track_doc.to_dict().get('profileId') != requesting_user_id:
+        if track.get('profileId') != requesting_user_id:
             return jsonify({'success': False, 'message': 'You can only delete tracks you created.'}), 403
 
-        track_ref.delete()
+        db.collection('tracks').document(track_id).delete()
+        tracks_replica.apply_local(track_id, None)
         return jsonify({'success': True, 'message': 'Track deleted successfully!'}), 200
     except Exception as e:
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
 
+# --- Data Export Routes ---
+def parse_export_datetime(value):
+    parsed = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed
+
+
+def build_export_query(kind, args):
+    """
+    Builds the ordered Firestore query for an export, applying the event, driver,
+    profile and date range filters from the query string.
+    """
+    date_from, date_to = args.get('from'), args.get('to')
+    if kind == 'lap_times':
+        query = db.collection('lap_times')
+        if args.get('eventId'):
+            query = query.where('eventId', '==', args['eventId'])
+        if args.get('username'):
+            query = query.where('username', '==', args['username'])
+        if date_from:
+            query = query.where('timestamp', '>=', parse_export_datetime(date_from))
+        if date_to:
+            query = query.where('timestamp', '<', parse_export_datetime(date_to))
+        return query.order_by('timestamp')
+    if kind == 'events':
+        if args.get('profileId'):
+            query = db.collection('driver_profiles').document(args['profileId']).collection('events')
+        else:
+            query = db.collection_group('events')
+        # start_time is stored as an ISO string, so string bounds compare chronologically.
+        if date_from:
+            query = query.where('start_time', '>=', date_from)
+        if date_to:
+            query = query.where('start_time', '<', date_to)
+        return query.order_by('start_time')
+    query = db.collection('driver_profiles')
+    if date_from:
+        query = query.where('created_at', '>=', parse_export_datetime(date_from))
+    if date_to:
+        query = query.where('created_at', '<', parse_export_datetime(date_to))
+    return query.order_by('created_at')
+
+
+# The document field each export is ordered by, which a resume cursor must carry.
+EXPORT_ORDER_FIELDS = {'lap_times': 'timestamp', 'events': 'start_time', 'profiles': 'created_at'}
+
+
+def load_export_cursor(kind, args):
+    """
+    Resolves ?cursor= to the snapshot to resume after. Raises ValueError unless it
+    names a document of the collection being exported, so a bad cursor is a 400
+    before streaming starts rather than a failure halfway through the response.
+    """
+    segments = data_export.decode_cursor(args['cursor']).split('/')
+    if kind == 'events':
+        expected = len(segments) == 4 and segments[0] == 'driver_profiles' and segments[2] == 'events' \
+            and (not args.get('profileId') or segments[1] == args['profileId'])
+    else:
+        collection = 'lap_times' if kind == 'lap_times' else 'driver_profiles'
+        expected = len(segments) == 2 and segments[0] == collection
+    if not expected or not all(segments):
+        raise ValueError('The cursor does not belong to this export.')
+    snapshot = counted_get(db.document('/'.join(segments)))
+    if snapshot.exists and (snapshot.to_dict() or {}).get(EXPORT_ORDER_FIELDS[kind]) is None:
+        raise ValueError('The cursor does not belong to this export.')
+    return snapshot
+
+
+@app.route('/export/<kind>', methods=['GET'])
+def export_data(kind):
+    """
+    Streams lap times, events or profiles as CSV (default) or NDJSON.
+    Every row carries a '_cursor' token; pass the last one received back as
+    ?cursor= to resume an interrupted export after that row.
+    """
+    try:
+        if kind not in data_export.EXPORT_COLUMNS:
+            return jsonify({'success': False, 'message': f'Unknown export type "{kind}".'}), 404
+        export_format = request.args.get('format', 'csv')
+        if export_format not in ('csv', 'ndjson'):
+            return jsonify({'success': False, 'message': 'Format must be csv or ndjson.'}), 400
+
+        query = build_export_query(kind, request.args)
+        start_after = None
+        if request.args.get('cursor'):
+            start_after = load_export_cursor(kind, request.args)
+            if not start_after.exists:
+                return jsonify({'success': False, 'message': 'Cursor document no longer exists.'}), 410
+
+        docs = counted(data_export.stream_documents(query, start_after))
+        if export_format == 'ndjson':
+            lines, mimetype = data_export.ndjson_lines(kind, docs), 'application/x-ndjson'
+        else:
+            lines, mimetype = data_export.csv_lines(kind, docs, include_header=start_after is None), 'text/csv'
+
+        log.info("Starting %s export of %s.", export_format, kind)
+        return Response(stream_with_context(lines), mimetype=mimetype, headers={
+            'Content-Disposition': f'attachment; filename={kind}.{export_format}'
+        })
+    except ValueError as e:
+        return jsonify({'success': False, 'message': f'Invalid export parameters: {e}'}), 400
+    except Exception as e:
+        log.exception("Error exporting %s: %s", kind, e)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 # --- Data Seeding and Clearing Routes ---
 def delete_collection(coll_ref, batch_size):
-    docs = coll_ref.limit(batch_size).stream()
+    docs = counted(coll_ref.limit(batch_size).stream())
     deleted = 0
     for doc in docs:
         # Recursively delete subcollections
@@ -1296,19 +3596,53 @@ def delete_collection(coll_ref, batch_size):
         return delete_collection(coll_ref, batch_size)
 
 
+def take_snapshot(label):
+    archive_dir = os.path.join('snapshots', f"{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}-{label}")
+    manifest = snapshot.create_snapshot(db, archive_dir)
+    app_logging.add_reads(manifest['document_count'])
+    log.info("Snapshot of %s document(s) written to %s.", manifest['document_count'], archive_dir)
+    return archive_dir
+
+
+@app.route('/create-snapshot', methods=['POST'])
+def create_snapshot():
+    """
+    Writes a compressed snapshot of every collection to the local 'snapshots' folder.
+    Restore it with: python snapshot.py restore <snapshot folder>
+    """
+    try:
+        archive_dir = take_snapshot('manual')
+        return jsonify({'success': True, 'message': f'Snapshot saved to {archive_dir}.', 'snapshot': archive_dir}), 200
+    except Exception as e:
+        log.exception("Error creating snapshot: %s", e)
+        return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
+
+
 @app.route('/clear-all-data', methods=['DELETE'])
 def clear_all_data():
     try:
-        print("--- ⚠️ DANGER: Deleting all user data from Firestore. ---")
-        collections_to_delete = ['driver_profiles', 'lap_times', 'tracks', 'readiness_checks']
+        # Take a snapshot first so the data can be restored, unless explicitly skipped.
+        archive_dir = None
+        if request.args.get('snapshot', 'true') != 'false':
+            archive_dir = take_snapshot('before-clear')
+
+        log.warning("DANGER: Deleting all user data from Firestore.")
+        collections_to_delete = ['driver_profiles', 'usernames', 'shared_garages', 'lap_times', 'tracks',
+                                 'readiness_checks', 'readiness_rollups']
         for coll_name in collections_to_delete:
             coll_ref = db.collection(coll_name)
             delete_collection(coll_ref, 50)
-            print(f"✅ Successfully deleted all documents in '{coll_name}'.")
-        print("ℹ️ Skipping deletion of 'feature_requests' collection.")
-        return jsonify({'success': True, 'message': 'All user data has been cleared.'}), 200
+            log.info("Successfully deleted all documents in '%s'.", coll_name)
+        log.info("Skipping deletion of 'feature_requests' collection.")
+        tracks_replica.reload()
+        build_event_index()
+        telemetry_store.clear()
+        message = 'All user data has been cleared.'
+        if archive_dir:
+            message += f' A snapshot was saved to {archive_dir}.'
+        return jsonify({'success': True, 'message': message, 'snapshot': archive_dir}), 200
     except Exception as e:
-        print(f"❌ Error clearing all data: {e}")
+        log.exception("Error clearing all data: %s", e)
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
 
@@ -1323,18 +3657,22 @@ def seed_database():
         track_id_map = {}
         for i, track_data in enumerate(mock_tracks):
             track_data['created_at'] = datetime.datetime.now(datetime.timezone.utc)
+            track_data['updated_at'] = track_data['created_at']
             # Add a placeholder profileId, as it's required by the schema
             track_data['profileId'] = "SEED_DATA"
+            track_data.update(track_location_fields(track_data, resolve=False))
             track_ref = db.collection('tracks').document()
             track_ref.set(track_data)
+            tracks_replica.apply_local(track_ref.id, track_data)
             track_id_map[i] = track_ref.id
-        print(f"✅ Seeded {len(mock_tracks)} tracks.")
+        log.info("Seeded %s tracks.", len(mock_tracks))
 
         # 2. Seed Users and their data
         for user_data in mock_users:
             # Create Profile
             profile_data = user_data['profile']
             profile_data['created_at'] = datetime.datetime.now(datetime.timezone.utc)
+            profile_data['updated_at'] = profile_data['created_at']
             profile_ref = db.collection('driver_profiles').document()
             profile_ref.set(profile_data)
 
@@ -1342,6 +3680,7 @@ def seed_database():
             garage_id_map = {}
             for i, garage_data in enumerate(user_data['garages']):
                 garage_data['created_at'] = datetime.datetime.now(datetime.timezone.utc)
+                garage_data['updated_at'] = garage_data['created_at']
                 garage_ref = profile_ref.collection('garages').document()
                 garage_ref.set(garage_data)
                 garage_id_map[i] = garage_ref.id
@@ -1353,6 +3692,7 @@ def seed_database():
                 if garage_index is not None and garage_index in garage_id_map:
                     vehicle_data['garageId'] = garage_id_map[garage_index]
                 vehicle_data['created_at'] = datetime.datetime.now(datetime.timezone.utc)
+                vehicle_data['updated_at'] = vehicle_data['created_at']
                 vehicle_data['order'] = i
                 vehicle_ref = profile_ref.collection('vehicles').document()
                 vehicle_ref.set(vehicle_data)
@@ -1362,6 +3702,7 @@ def seed_database():
             checklist_id_map = {}
             for i, checklist_data in enumerate(user_data['checklists']):
                 checklist_data['created_at'] = datetime.datetime.now(datetime.timezone.utc)
+                checklist_data['updated_at'] = checklist_data['created_at']
                 checklist_ref = profile_ref.collection('checklists').document()
                 checklist_ref.set(checklist_data)
                 checklist_id_map[i] = checklist_ref.id
@@ -1384,9 +3725,11 @@ def seed_database():
                     days=10 + len(user_data['events']))
                 end_time = start_time + datetime.timedelta(hours=8)
                 event_data['start_time'] = start_time.isoformat()
+                event_data['start_at'] = start_time
                 event_data['end_time'] = end_time.isoformat()
 
                 event_data['created_at'] = datetime.datetime.now(datetime.timezone.utc)
+                event_data['updated_at'] = event_data['created_at']
                 event_ref = profile_ref.collection('events').document()
                 event_ref.set(event_data)
                 event_id_map[event_data['name']] = event_ref.id
@@ -1403,13 +3746,145 @@ def seed_database():
                             'timestamp': datetime.datetime.now(datetime.timezone.utc)
                         })
 
-        print(f"✅ Seeded {len(mock_users)} users and their associated data.")
+        build_event_index()
+        conflicts = rebuild_unique_index()
+        if conflicts:
+            log.warning("Seeded data has %s duplicate name(s): %s", len(conflicts), conflicts)
+        log.info("Seeded %s users and their associated data.", len(mock_users))
         return jsonify({'success': True, 'message': 'Database seeded successfully!'}), 200
     except Exception as e:
-        print(f"❌ Error seeding database: {e}")
+        log.exception("Error seeding database: %s", e)
         return jsonify({'success': False, 'message': f'An error occurred: {e}'}), 500
 
 
+# --- Warm-up and Health Probes ---
+# Each worker warms up in the background as soon as it starts: it opens the
+# Firestore channel (and fetches the auth token), compiles every template, and
+# loads the settings, tracks replica and in-memory caches, so the first real
+# requests do not pay for them. A database whose unique name index was never
+# backfilled gets it here, as do events written before 'start_at' existed,
+# before the worker reports ready. /healthz answers as long as the process is
+# up; /readyz answers 200 only once the required steps have succeeded, so a load
+# balancer sends traffic to warm workers only. Failed required steps are retried.
+WARMUP_RETRY_SECONDS = 5
+WARMUP_TRACKS_TIMEOUT = 2  # Seconds to wait for the tracks listener before polling instead
+_warmup_lock = threading.Lock()
+_warmup = {'pid': None, 'state': 'pending', 'attempts': 0, 'started_at': None, 'finished_at': None, 'steps': {}}
+_warmup_done = threading.Event()
+_process_started = time.monotonic()
+
+
+def warm_firestore():
+    counted_get(db.collection('config').document('app_info'))
+
+
+def warm_templates():
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+
+
+def warm_settings():
+    get_app_version()
+    for document_name, default_limit in (('profiles', 3), ('garages', 10), ('vehicles', 25)):
+        get_limit('admin_settings', document_name, default_limit)
+    get_feature_request_settings()
+    get_lap_time_settings()
+    get_garage_settings()
+    get_maintenance_settings()
+    admission_controller.reload()
+    admission_controller.settings  # Reading the property loads and caches them
+
+
+def warm_tracks():
+    # A listener slower than this is swapped for polling, whose first reload counts as ready.
+    if not tracks_replica.wait_until_ready(WARMUP_TRACKS_TIMEOUT):
+        raise TimeoutError('The tracks replica could not be loaded.')
+
+
+def warm_feature_requests():
+    load_feature_request_page(None, FEATURE_REQUEST_PAGE_SIZE)
+
+
+# (name, function, required): a worker is ready once every required step has succeeded.
+WARMUP_STEPS = (
+    ('firestore', warm_firestore, True),
+    ('templates', warm_templates, True),
+    ('settings', warm_settings, True),
+    ('tracks', warm_tracks, True),
+    ('unique_index', ensure_unique_index, True),
+    ('event_times', ensure_event_start_at, True),
+    ('event_index', warm_event_index, False),
+    ('feature_requests', warm_feature_requests, False),
+)
+
+
+def run_warmup():
+    """Runs the warm-up steps until the required ones succeed, retrying every WARMUP_RETRY_SECONDS."""
+    while True:
+        _warmup['attempts'] += 1
+        _warmup['state'] = 'running'
+        failed = False
+        for name, step, required in WARMUP_STEPS:
+            if _warmup['steps'].get(name, {}).get('ok'):
+                continue
+            started = time.perf_counter()
+            try:
+                step()
+                _warmup['steps'][name] = {'ok': True, 'ms': round((time.perf_counter() - started) * 1000, 1)}
+            except Exception as e:
+                log.warning("Warm-up step %s failed: %s", name, e)
+                _warmup['steps'][name] = {'ok': False, 'required': required, 'error': str(e)}
+                failed = failed or required
+        if not failed:
+            break
+        _warmup['state'] = 'retrying'
+        time.sleep(WARMUP_RETRY_SECONDS)
+    _warmup['state'] = 'ready'
+    _warmup['finished_at'] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    _warmup_done.set()
+    log.info("Warm-up finished in %s attempt(s): %s", _warmup['attempts'],
+             {name: step.get('ms') for name, step in _warmup['steps'].items()})
+
+
+def start_warmup():
+    """Starts the warm-up once per process, so a worker forked from a preloaded app warms up itself."""
+    global _warmup_done
+    with _warmup_lock:
+        if _warmup['pid'] == os.getpid():
+            return
+        _warmup.update(pid=os.getpid(), state='pending', attempts=0, finished_at=None, steps={},
+                       started_at=datetime.datetime.now(datetime.timezone.utc).isoformat())
+        _warmup_done = threading.Event()
+    threading.Thread(target=run_warmup, name='warmup', daemon=True).start()
+
+
+def wait_until_warm(timeout=None):
+    start_warmup()
+    return _warmup_done.wait(timeout)
+
+
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """Liveness probe: answers without touching Firestore."""
+    return jsonify({'success': True, 'status': 'alive', 'pid': os.getpid(),
+                    'uptime_seconds': round(time.monotonic() - _process_started)}), 200
+
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """Readiness probe: 200 once this worker has warmed up, 503 with the warm-up progress until then."""
+    start_warmup()
+    ready = _warmup_done.is_set()
+    body = {'success': ready, 'status': 'ready' if ready else _warmup['state'],
+            'warmup': {**_warmup, 'steps': dict(_warmup['steps'])}}
+    if ready:
+        return jsonify(body), 200
+    return jsonify(body), 503, {'Retry-After': str(WARMUP_RETRY_SECONDS)}
+
+
+start_warmup()
+
+
 if __name__ == '__main__':
     # This block allows the script to be run directly.
     # debug=True allows for auto-reloading when you save changes.
@@ -0,0 +1,211 @@
+# app_logging.py
+# Structured, non-blocking logging for the web server. Request threads only put
+# records on an in-memory queue; a background listener thread formats them as
+# one JSON object per line and writes them to stdout, so a slow pipe never
+# stalls a request. Records logged while handling a request carry its route,
+# method, profile and Firestore read count, and chatty INFO records from
+# request handlers can be sampled. Sensitive fields (PINs, door codes) are
+# masked before anything is written.
+#
+# Environment variables:
+#   LOG_LEVEL          minimum level, default INFO
+#   LOG_SAMPLE_RATES   per-level share of request-handler records to keep,
+#                      e.g. "INFO=0.1,DEBUG=0". WARNING and above are always kept.
+#   LOG_SLOW_REQUEST_MS  requests slower than this are logged as warnings, default 1000
+
+import atexit
+import contextvars
+import copy
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+
+LOGGER_NAME = 'app'
+SENSITIVE_KEYS = frozenset({'pin', 'garagedoorcode', 'code', 'password', 'token', 'secret'})
+REDACTED = '***'
+DEFAULT_SAMPLE_RATES = {'DEBUG': 1.0, 'INFO': 1.0}
+DEFAULT_SLOW_REQUEST_MS = 1000
+
+# Masks "'pin': '1234'"-style pairs in messages that format whole dicts. The key must
+# be a whole word, so 'spin: 3' or 'barcode=12' is left alone.
+_SENSITIVE_PAIR = re.compile(
+    r"""(['"]?)\b(pin|garageDoorCode|code|password|token|secret)\b\1(\s*[:=]\s*)('[^']*'|"[^"]*"|[^\s,}]+)""",
+    re.IGNORECASE)
+
+# The request being handled by the current thread (or coroutine), or None.
+_request_context = contextvars.ContextVar('request_context', default=None)
+
+_listener = None
+
+
+def redact(value):
+    """Returns a copy of value with sensitive dict keys masked, at any depth."""
+    if isinstance(value, dict):
+        return {key: REDACTED if str(key).casefold() in SENSITIVE_KEYS else redact(item)
+                for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    return value
+
+
+def redact_text(text):
+    return _SENSITIVE_PAIR.sub(lambda m: f'{m.group(1)}{m.group(2)}{m.group(1)}{m.group(3)}{REDACTED}', text)
+
+
+def parse_sample_rates(text):
+    """Parses "INFO=0.1,DEBUG=0" into {'INFO': 0.1, 'DEBUG': 0.0}."""
+    rates = {}
+    for part in filter(None, (part.strip() for part in (text or '').split(','))):
+        level, _, rate = part.partition('=')
+        rates[level.strip().upper()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+# --- Request Context ---
+def begin_request(route, method, profile_id=None):
+    """Starts collecting context for the request handled by this thread. Returns a token for end_request."""
+    return _request_context.set({'route': route, 'method': method, 'profile': profile_id, 'reads': 0})
+
+
+def end_request(token):
+    """Returns the finished request's context and clears it."""
+    context = _request_context.get()
+    _request_context.reset(token)
+    return context
+
+
+def add_reads(count=1):
+    context = _request_context.get()
+    if context is not None:
+        context['reads'] += count
+
+
+def counted(snapshots):
+    """Yields the snapshots of a Firestore stream or get_all, counting each as a read of the current request."""
+    for snapshot in snapshots:
+        add_reads()
+        yield snapshot
+
+
+def counted_get(ref, **kwargs):
+    """DocumentReference.get, counted as one read of the current request."""
+    add_reads()
+    return ref.get(**kwargs)
+
+
+def current_request():
+    return _request_context.get()
+
+
+class ContextFilter(logging.Filter):
+    """
+    Runs in the thread that logs: copies the request context onto the record and
+    drops a share of request-handler records per level. Records logged outside
+    a request (startup, background jobs) and WARNING and above are never sampled.
+    """
+
+    def __init__(self, sample_rates=None):
+        super().__init__()
+        self.sample_rates = sample_rates or {}
+
+    def filter(self, record):
+        context = _request_context.get()
+        if context is not None:
+            rate = self.sample_rates.get(record.levelname, 1.0)
+            if record.levelno < logging.WARNING and rate < 1.0 and random.random() >= rate:
+                return False
+            for key in ('route', 'method', 'profile', 'reads'):
+                if not hasattr(record, key):
+                    setattr(record, key, context[key])
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record. Extra fields passed with extra={'data': {...}} are redacted."""
+
+    CONTEXT_FIELDS = ('route', 'method', 'profile', 'status', 'duration_ms', 'reads')
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': redact_text(record.getMessage()),
+        }
+        for key in self.CONTEXT_FIELDS:
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value
+        data = getattr(record, 'data', None)
+        if data:
+            entry['data'] = redact(data)
+        if record.exc_text:
+            entry['exception'] = redact_text(record.exc_text)
+        return json.dumps(entry, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # Resolve the message and traceback now, in the thread that logged, so the
+        # listener never touches objects the request may still be changing.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        # Never block a request: if the queue is full, drop the record.
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+def setup_logging(stream=None):
+    """
+    Routes the 'app' logger (and its children) through a queue drained by a
+    background thread. Safe to call more than once. Returns the 'app' logger.
+    """
+    global _listener
+    logger = logging.getLogger(LOGGER_NAME)
+    if _listener is not None:
+        return logger
+
+    level = os.environ.get('LOG_LEVEL', 'INFO').upper()
+    sample_rates = {**DEFAULT_SAMPLE_RATES, **parse_sample_rates(os.environ.get('LOG_SAMPLE_RATES'))}
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter())
+    records = queue.Queue(maxsize=10000)
+    queue_handler = _QueueHandler(records)
+    queue_handler.addFilter(ContextFilter(sample_rates))
+
+    logger.setLevel(level)
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return logger
+
+
+def stop_logging():
+    """Flushes queued records and stops the background thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def slow_request_ms():
+    return float(os.environ.get('LOG_SLOW_REQUEST_MS', DEFAULT_SLOW_REQUEST_MS))
@@ -0,0 +1,325 @@
+# asgi_app.py
+# Async serving mode for the same app. To run this:
+# 1. Install an ASGI server and the WSGI bridge:
+#    pip install uvicorn asgiref
+# 2. Run from your terminal: uvicorn asgi_app:app --port 5000
+#
+# The read fan-out routes below are served natively with Firestore's
+# AsyncClient, so the independent reads inside one request run concurrently and
+# a request waiting on Firestore holds a coroutine instead of a worker thread.
+# /live/leaderboard/<event_id> streams Server-Sent Events; every client watching
+# an event shares one Firestore listener, so thousands of idle connections cost
+# only a queue each. Every other route falls through to the Flask app in app.py.
+# bench_asgi.py compares this mode with the threaded Flask server.
+
+import asyncio
+import hashlib
+import logging
+import re
+import time
+import urllib.parse
+
+import firebase_admin
+from asgiref.wsgi import WsgiToAsgi
+from google.cloud.firestore import AsyncClient
+from werkzeug.datastructures import MultiDict
+from werkzeug.http import parse_etags
+
+import app as flask_module
+import app_logging
+import lap_analytics
+from models import Garage, Vehicle
+
+HEARTBEAT_SECONDS = 15
+LEADERBOARD_POLL_SECONDS = 5
+WARMUP_TIMEOUT_SECONDS = 30  # Startup goes on after this; /readyz keeps reporting the warm-up
+
+log = logging.getLogger('app.asgi')
+
+flask_app = flask_module.app
+wsgi_fallback = WsgiToAsgi(flask_app)
+_async_db = None
+
+
+def get_async_db():
+    """Creates the async client on first use, inside the server's event loop."""
+    global _async_db
+    if _async_db is None:
+        firebase_app = firebase_admin.get_app()
+        _async_db = AsyncClient(project=firebase_app.project_id,
+                                credentials=firebase_app.credential.get_credential())
+    return _async_db
+
+
+async def collect(query):
+    return [doc async for doc in query.stream()]
+
+
+# --- Responses ---
+def request_header(scope, name):
+    for key, value in scope.get('headers', ()):
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+
+async def send_json(send, payload, status=200, scope=None):
+    # Flask's JSON provider keeps the output identical to the threaded routes (e.g. dates).
+    body = flask_app.json.dumps(payload).encode('utf-8')
+    headers = [(b'content-type', b'application/json')]
+    if scope is not None and status == 200:
+        # Same ETag scheme as app.add_etag, so the frontend cache revalidates either serving mode.
+        etag = hashlib.sha1(body).hexdigest()
+        headers += [(b'etag', f'"{etag}"'.encode()), (b'cache-control', b'no-cache')]
+        if parse_etags(request_header(scope, b'if-none-match')).contains_weak(etag):
+            status, body = 304, b''
+    headers.append((b'content-length', str(len(body)).encode()))
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+# --- Native Routes ---
+async def get_events(scope, receive, send, profile_id):
+    """Async twin of app.get_events: the events and vehicles reads run concurrently."""
+    try:
+        args = MultiDict(urllib.parse.parse_qsl(scope.get('query_string', b'').decode('utf-8')))
+        summary, limit = flask_module.parse_events_args(args)
+        profile_ref = get_async_db().collection('driver_profiles').document(profile_id)
+        events_coll = profile_ref.collection('events')
+        cursor_doc = None
+        if args.get('cursor'):
+            cursor_doc = await events_coll.document(args['cursor']).get()
+            if not cursor_doc.exists:
+                return await send_json(send, {'success': False, 'message': 'The cursor event no longer exists.'}, 410)
+
+        reads = [collect(flask_module.build_events_query(events_coll, args, summary, limit, cursor_doc))]
+        if not summary:
+            reads.append(collect(profile_ref.collection('vehicles')))
+        # The track catalog is served from the in-memory replica, so it needs no read here.
+        results = await asyncio.gather(*reads)
+        docs = results[0]
+        vehicle_map = {doc.id: {**doc.to_dict(), 'id': doc.id} for doc in results[1]} if not summary else {}
+        track_map = await asyncio.to_thread(flask_module.get_track_map)
+
+        events, next_cursor = flask_module.join_event_details(docs, limit, summary, vehicle_map, track_map)
+        await send_json(send, {'success': True, 'events': events, 'nextCursor': next_cursor}, scope=scope)
+    except ValueError as e:
+        await send_json(send, {'success': False, 'message': str(e)}, 400)
+    except Exception as e:
+        log.exception("Error getting events (async): %s", e)
+        await send_json(send, {'success': False, 'error': str(e)}, 500)
+
+
+async def get_garages(scope, receive, send, profile_id):
+    """Async twin of app.get_garages: garages, vehicles and the garage limit are read concurrently."""
+    try:
+        async_db = get_async_db()
+        profile_ref = async_db.collection('driver_profiles').document(profile_id)
+        vehicle_docs, garage_docs, settings_doc = await asyncio.gather(
+            collect(profile_ref.collection('vehicles')),
+            collect(profile_ref.collection('garages')),
+            async_db.collection('admin_settings').document('garages').get())
+
+        all_vehicles = [Vehicle.from_doc(doc) for doc in vehicle_docs]
+        garages = [flask_module.garage_json(Garage.from_doc(doc), profile_id, all_vehicles) for doc in garage_docs]
+        garage_limit = int(settings_doc.to_dict().get('limit', 10)) if settings_doc.exists else 10
+        await send_json(send, {'success': True, 'garages': garages, 'limit_reached': len(garages) >= garage_limit},
+                        scope=scope)
+    except Exception as e:
+        log.exception("Error getting garages (async): %s", e)
+        await send_json(send, {'success': False, 'error': str(e)}, 500)
+
+
+# --- Live Leaderboards ---
+class LeaderboardFeed:
+    """
+    Watches one event's lap times and fans each new leaderboard out to every
+    connected client. Uses a Firestore listener, or polls with the async client
+    if a listener cannot be opened.
+    """
+
+    def __init__(self, hub, event_id):
+        self.hub = hub
+        self.event_id = event_id
+        self.queues = set()
+        self.latest = None
+        self._watch = None
+        self._poller = None
+
+    def start(self):
+        query = flask_module.db.collection('lap_times').where('eventId', '==', self.event_id)
+        try:
+            self._watch = query.on_snapshot(self._on_snapshot)
+        except Exception as e:
+            log.warning("Leaderboard listener unavailable for %s (%s). Polling instead.", self.event_id, e)
+            self._poller = asyncio.ensure_future(self._poll())
+
+    def stop(self):
+        if self._watch is not None:
+            self._watch.unsubscribe()
+        if self._poller is not None:
+            self._poller.cancel()
+
+    def _on_snapshot(self, docs, changes, read_time):
+        # Runs on the listener's thread; hand the result to the event loop.
+        payload = self.build([doc.to_dict() for doc in docs])
+        self.hub.loop.call_soon_threadsafe(self.publish, payload)
+
+    async def _poll(self):
+        query = get_async_db().collection('lap_times').where('eventId', '==', self.event_id)
+        while True:
+            try:
+                payload = self.build([doc.to_dict() for doc in await collect(query)])
+                if payload != self.latest:
+                    self.publish(payload)
+            except Exception as e:
+                log.exception("Error polling leaderboard for %s: %s", self.event_id, e)
+            await asyncio.sleep(LEADERBOARD_POLL_SECONDS)
+
+    def build(self, laps):
+        # Same shape as /lap-analytics/event/<event_id>.
+        stats = lap_analytics.compute_lap_stats(laps, group_by='username')
+        return {'eventId': self.event_id, 'drivers': stats['groups'],
+                'overall': stats['overall'], 'lap_count': stats['lap_count']}
+
+    def publish(self, payload):
+        self.latest = payload
+        for queue in self.queues:
+            # Clients only ever need the newest leaderboard, so a slow reader skips stale ones.
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(payload)
+
+
+class LeaderboardHub:
+    def __init__(self):
+        self.loop = None
+        self.feeds = {}
+
+    def subscribe(self, event_id):
+        self.loop = asyncio.get_running_loop()
+        feed = self.feeds.get(event_id)
+        if feed is None:
+            feed = self.feeds[event_id] = LeaderboardFeed(self, event_id)
+            feed.start()
+        queue = asyncio.Queue(maxsize=1)
+        if feed.latest is not None:
+            queue.put_nowait(feed.latest)
+        feed.queues.add(queue)
+        return queue
+
+    def unsubscribe(self, event_id, queue):
+        feed = self.feeds.get(event_id)
+        if feed is None:
+            return
+        feed.queues.discard(queue)
+        if not feed.queues:
+            feed.stop()
+            del self.feeds[event_id]
+
+    def stats(self):
+        return {'events': len(self.feeds), 'connections': sum(len(f.queues) for f in self.feeds.values())}
+
+
+leaderboards = LeaderboardHub()
+
+
+async def wait_for_disconnect(receive):
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+
+
+async def live_leaderboard(scope, receive, send, event_id):
+    """Streams an event's leaderboard as Server-Sent Events whenever a lap time changes."""
+    queue = leaderboards.subscribe(event_id)
+    disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+    try:
+        await send({'type': 'http.response.start', 'status': 200,
+                    'headers': [(b'content-type', b'text/event-stream'), (b'cache-control', b'no-cache'),
+                                (b'x-accel-buffering', b'no')]})
+        while not disconnected.done():
+            update = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({update, disconnected}, timeout=HEARTBEAT_SECONDS,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if update in done:
+                data = flask_app.json.dumps(update.result())
+                chunk = f'event: leaderboard\ndata: {data}\n\n'
+            else:
+                update.cancel()
+                chunk = ': keep-alive\n\n'
+            if not disconnected.done():
+                await send({'type': 'http.response.body', 'body': chunk.encode('utf-8'), 'more_body': True})
+    finally:
+        disconnected.cancel()
+        leaderboards.unsubscribe(event_id, queue)
+
+
+async def live_stats(scope, receive, send):
+    await send_json(send, {'success': True, 'live': leaderboards.stats()})
+
+
+ROUTES = [
+    ('GET', re.compile(r'^/get-events/(?P<profile_id>[^/]+)$'), get_events),
+    ('GET', re.compile(r'^/get-garages/(?P<profile_id>[^/]+)$'), get_garages),
+    ('GET', re.compile(r'^/live/leaderboard/(?P<event_id>[^/]+)$'), live_leaderboard),
+    ('GET', re.compile(r'^/live/stats$'), live_stats),
+]
+
+
+# --- ASGI Entry Point ---
+async def handle_logged(handler, route, scope, receive, send, params):
+    """Runs a native route with the same request context and summary record as the Flask routes."""
+    token = app_logging.begin_request(route, scope['method'], params.get('profile_id'))
+    started = time.perf_counter()
+    status = None
+
+    async def send_with_status(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        await send(message)
+
+    try:
+        await handler(scope, receive, send_with_status, **params)
+    finally:
+        duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        failed = status is None or status >= 500
+        # Live streams stay open by design, so only their failures count as slow requests.
+        slow = handler is not live_leaderboard and duration_ms >= app_logging.slow_request_ms()
+        log.log(logging.WARNING if failed or slow else logging.INFO, "%s %s -> %s in %sms", scope['method'],
+                scope['path'], status, duration_ms,
+                extra={'status': status, 'duration_ms': duration_ms, 'reads': app_logging.current_request()['reads']})
+        app_logging.end_request(token)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            # Open the async channel and let the Flask app's warm-up (settings, templates,
+            # tracks replica, caches) finish before the first request needs them.
+            try:
+                await get_async_db().collection('config').document('app_info').get()
+            except Exception as e:
+                log.warning("Could not warm up the async Firestore client: %s", e)
+            await asyncio.to_thread(flask_module.wait_until_warm, WARMUP_TIMEOUT_SECONDS)
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            for feed in list(leaderboards.feeds.values()):
+                feed.stop()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] == 'http':
+        for method, pattern, handler in ROUTES:
+            match = pattern.match(scope['path'])
+            if match and scope['method'] == method:
+                params = {k: urllib.parse.unquote(v) for k, v in match.groupdict().items()}
+                return await handle_logged(handler, pattern.pattern, scope, receive, send, params)
+    return await wsgi_fallback(scope, receive, send)
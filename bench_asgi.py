@@ -0,0 +1,122 @@
+# bench_asgi.py
+# Load test for comparing the threaded Flask server with the async mode.
+# 1. Install the client: pip install httpx
+# 2. Start one server, e.g. 'python app.py' (threaded, port 5000) or
+#    'uvicorn asgi_app:app --port 8000' (async).
+# 3. Run against it:
+#    python bench_asgi.py http://127.0.0.1:5000 --path /get-events/<profile_id> --requests 2000 --concurrency 100
+#    python bench_asgi.py http://127.0.0.1:8000 --idle-streams 2000 --path /live/leaderboard/<event_id>
+# Run the same command against both servers and compare the printed numbers.
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_requests(base_url, path, total, concurrency):
+    """Sends 'total' GET requests with at most 'concurrency' in flight and reports latency."""
+    latencies, errors = [], 0
+    remaining = iter(range(total))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def worker():
+            nonlocal errors
+            for _ in remaining:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"Requests:    {total} ({errors} errors) at concurrency {concurrency}")
+    print(f"Throughput:  {total / elapsed:.1f} req/s over {elapsed:.2f}s")
+    print(f"Latency ms:  mean {statistics.mean(latencies) * 1000:.1f}  "
+          f"p50 {percentile(latencies, 50) * 1000:.1f}  "
+          f"p95 {percentile(latencies, 95) * 1000:.1f}  "
+          f"p99 {percentile(latencies, 99) * 1000:.1f}")
+
+
+async def hold_streams(base_url, path, count, seconds, probe_path):
+    """
+    Opens 'count' streaming connections, keeps them idle for 'seconds' and
+    measures how quickly the server still answers a normal request meanwhile.
+    """
+    limits = httpx.Limits(max_connections=count + 1)
+    opened, failed = 0, 0
+    stop = asyncio.Event()
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=None) as client:
+        async def hold():
+            nonlocal opened, failed
+            try:
+                async with client.stream('GET', path) as response:
+                    if response.status_code != 200:
+                        failed += 1
+                        return
+                    opened += 1
+                    await stop.wait()
+            except httpx.HTTPError:
+                failed += 1
+
+        holders = [asyncio.ensure_future(hold()) for _ in range(count)]
+        await asyncio.sleep(seconds)
+
+        probe_latencies = []
+        for _ in range(10):
+            started = time.perf_counter()
+            try:
+                await client.get(probe_path, timeout=10)
+                probe_latencies.append(time.perf_counter() - started)
+            except httpx.HTTPError:
+                pass
+
+        stop.set()
+        await asyncio.gather(*holders, return_exceptions=True)
+
+    print(f"Streams:     {opened} open, {failed} failed of {count} after {seconds}s")
+    if probe_latencies:
+        print(f"Probe ms:    mean {statistics.mean(probe_latencies) * 1000:.1f} "
+              f"({len(probe_latencies)}/10 answered) for {probe_path}")
+    else:
+        print(f"Probe:       no answer for {probe_path} while the streams were open")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the threaded or async server.')
+    parser.add_argument('base_url')
+    parser.add_argument('--path', default='/get-all-tracks')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--idle-streams', type=int, default=0,
+                        help='Hold this many streaming connections open on --path instead of sending requests.')
+    parser.add_argument('--hold-seconds', type=float, default=10)
+    parser.add_argument('--probe-path', default='/get-all-tracks')
+    args = parser.parse_args()
+
+    if args.idle_streams:
+        asyncio.run(hold_streams(args.base_url, args.path, args.idle_streams, args.hold_seconds, args.probe_path))
+    else:
+        asyncio.run(run_requests(args.base_url, args.path, args.requests, args.concurrency))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+# data_export.py
+# Streaming CSV/NDJSON export helpers. Documents are read page by page from
+# Firestore query cursors and written out one row at a time, so an export uses
+# the same amount of memory whether it covers one event or a whole season.
+
+import base64
+import csv
+import datetime
+import io
+import json
+
+PAGE_SIZE = 500
+
+# Columns written for each export type, in order. 'pin' is deliberately never exported.
+EXPORT_COLUMNS = {
+    'lap_times': ['id', 'eventId', 'username', 'lapTime', 'timestamp'],
+    'events': ['id', 'profileId', 'name', 'start_time', 'end_time', 'trackId', 'is_raceday', 'vehicles',
+               'checklists'],
+    'profiles': ['id', 'username', 'helmetColor', 'pinEnabled', 'theme', 'created_at'],
+}
+
+
+def encode_cursor(doc_path):
+    """Encodes a document path as an opaque, URL-safe resume token."""
+    return base64.urlsafe_b64encode(doc_path.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Decodes a resume token back into a document path."""
+    padded = token + '=' * (-len(token) % 4)
+    try:
+        return base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError('Invalid cursor token.')
+
+
+def stream_documents(query, start_after=None, page_size=PAGE_SIZE):
+    """
+    Yields document snapshots from a query one page at a time, continuing each
+    page from the last snapshot of the previous one.
+    """
+    cursor = start_after
+    while True:
+        page = query.start_after(cursor) if cursor is not None else query
+        count = 0
+        for doc in page.limit(page_size).stream():
+            count += 1
+            cursor = doc
+            yield doc
+        if count < page_size:
+            return
+
+
+def _serialize(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return [_serialize(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _serialize(v) for k, v in value.items()}
+    return value
+
+
+def doc_to_row(kind, doc):
+    """Flattens a document snapshot into an export row for the given kind."""
+    data = doc.to_dict() or {}
+    row = {'id': doc.id}
+    if kind == 'events':
+        parent = doc.reference.parent.parent
+        row['profileId'] = parent.id if parent is not None else None
+    for column in EXPORT_COLUMNS[kind]:
+        if column not in row:
+            row[column] = _serialize(data.get(column))
+    row['_cursor'] = encode_cursor(doc.reference.path)
+    return row
+
+
+def ndjson_lines(kind, docs):
+    """Yields one NDJSON line per document."""
+    for doc in docs:
+        yield json.dumps(doc_to_row(kind, doc)) + '\n'
+
+
+def csv_lines(kind, docs, include_header=True):
+    """Yields a CSV header (unless resuming) followed by one line per document."""
+    columns = EXPORT_COLUMNS[kind] + ['_cursor']
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if include_header:
+        writer.writerow(columns)
+        yield buffer.getvalue()
+    for doc in docs:
+        buffer.seek(0)
+        buffer.truncate()
+        row = doc_to_row(kind, doc)
+        writer.writerow([';'.join(map(str, v)) if isinstance(v, list) else v for v in (row[c] for c in columns)])
+        yield buffer.getvalue()
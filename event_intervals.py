@@ -0,0 +1,175 @@
+# event_intervals.py
+# Interval index for spotting double-booked vehicles and drivers. Each key
+# (a vehicle, or a driver profile) has its own interval tree: a treap ordered
+# by start time where every node also records the latest end time in its
+# subtree. An overlap query can then skip any subtree that ends before the
+# window opens or starts after it closes, so it costs O(log n + matches).
+
+import random
+import threading
+
+
+class _Node:
+    __slots__ = ('start', 'end', 'item', 'priority', 'max_end', 'left', 'right')
+
+    def __init__(self, start, end, item):
+        self.start = start
+        self.end = end
+        self.item = item
+        self.priority = random.random()
+        self.max_end = end
+        self.left = None
+        self.right = None
+
+
+def _update(node):
+    node.max_end = node.end
+    for child in (node.left, node.right):
+        if child is not None and child.max_end > node.max_end:
+            node.max_end = child.max_end
+    return node
+
+
+def _split(node, key):
+    """Splits a treap into nodes ordered before key and the rest."""
+    if node is None:
+        return None, None
+    if (node.start, node.item) < key:
+        node.right, right = _split(node.right, key)
+        return _update(node), right
+    left, node.left = _split(node.left, key)
+    return left, _update(node)
+
+
+def _merge(left, right):
+    if left is None or right is None:
+        return left or right
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        return _update(left)
+    right.left = _merge(left, right.left)
+    return _update(right)
+
+
+class IntervalTree:
+    """Half-open [start, end) intervals, each tagged with a unique item."""
+
+    def __init__(self):
+        self._root = None
+        self._size = 0
+
+    def insert(self, start, end, item):
+        left, right = _split(self._root, (start, item))
+        self._root = _merge(_merge(left, _Node(start, end, item)), right)
+        self._size += 1
+
+    def remove(self, start, item):
+        left, rest = _split(self._root, (start, item))
+        # Everything in 'rest' sorts at or after (start, item), so the match is its minimum.
+        parent, node = None, rest
+        while node is not None and node.left is not None:
+            parent, node = node, node.left
+        if node is None or (node.start, node.item) != (start, item):
+            self._root = _merge(left, rest)
+            return False
+        if parent is None:
+            rest = node.right
+        else:
+            parent.left = node.right
+            self._refresh_left_spine(rest, parent)
+        self._root = _merge(left, rest)
+        self._size -= 1
+        return True
+
+    @staticmethod
+    def _refresh_left_spine(root, stop):
+        spine = []
+        node = root
+        while node is not stop:
+            spine.append(node)
+            node = node.left
+        spine.append(stop)
+        for node in reversed(spine):
+            _update(node)
+
+    def overlapping(self, start, end):
+        """Yields (start, end, item) for every interval overlapping [start, end)."""
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            if node.max_end <= start:
+                continue
+            if node.left is not None:
+                stack.append(node.left)
+            if node.start < end:
+                if node.end > start:
+                    yield node.start, node.end, node.item
+                if node.right is not None:
+                    stack.append(node.right)
+
+    def __len__(self):
+        return self._size
+
+
+class EventIntervalIndex:
+    """
+    Keeps one IntervalTree per key and remembers each event's placement so an
+    event can be moved or removed by id alone.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._trees = {}
+        self._events = {}  # event_id -> (start, end, keys, info)
+
+    def put(self, event_id, start, end, keys, info=None):
+        """Adds or replaces an event under the given keys."""
+        with self._lock:
+            self.remove(event_id)
+            for key in keys:
+                tree = self._trees.get(key)
+                if tree is None:
+                    tree = self._trees[key] = IntervalTree()
+                tree.insert(start, end, event_id)
+            self._events[event_id] = (start, end, tuple(keys), info or {})
+
+    def remove(self, event_id):
+        with self._lock:
+            placed = self._events.pop(event_id, None)
+            if placed is None:
+                return
+            start, _, keys, _ = placed
+            for key in keys:
+                tree = self._trees[key]
+                tree.remove(start, event_id)
+                if not len(tree):
+                    del self._trees[key]
+
+    def conflicts(self, start, end, keys, exclude=None):
+        """
+        Returns [(key, event_id, info)] for indexed events overlapping
+        [start, end) under any of the keys, skipping the event 'exclude'.
+        """
+        found = []
+        with self._lock:
+            for key in keys:
+                tree = self._trees.get(key)
+                if tree is None:
+                    continue
+                for _, _, event_id in tree.overlapping(start, end):
+                    if event_id != exclude:
+                        found.append((key, event_id, self._events[event_id][3]))
+        return found
+
+    def get(self, event_id):
+        with self._lock:
+            return self._events.get(event_id)
+
+    def clear(self):
+        with self._lock:
+            self._trees.clear()
+            self._events.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._events)
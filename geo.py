@@ -0,0 +1,126 @@
+# geo.py
+# Coordinates and geohashes for tracks. A geohash interleaves longitude and
+# latitude bits into a base-32 string, so nearby points share a prefix and a
+# radius search becomes a handful of prefix range scans over one ordered field.
+
+import logging
+import math
+import re
+import urllib.parse
+import urllib.request
+
+log = logging.getLogger('app.geo')
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 10
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+# Short share links that only redirect to the full maps URL.
+SHORT_LINK_HOSTS = ('maps.app.goo.gl', 'goo.gl')
+RESOLVE_TIMEOUT = 3
+
+# Checked in order: a dropped pin (!3d..!4d..) is the place itself, while '@lat,lon'
+# is only where the map view was centred.
+_NUMBER = r'(-?\d{1,3}(?:\.\d+)?)'
+_URL_PATTERNS = [
+    re.compile(r'!3d' + _NUMBER + r'!4d' + _NUMBER),
+    re.compile(r'[?&](?:q|query|ll|destination|center)=' + _NUMBER + r'(?:,|%2C)\s*' + _NUMBER, re.IGNORECASE),
+    re.compile(r'@' + _NUMBER + ',' + _NUMBER),
+]
+
+
+def valid_coordinates(lat, lon):
+    return -90 <= lat <= 90 and -180 <= lon <= 180
+
+
+def coordinates_from_url(url, resolve=True):
+    """
+    Extracts (lat, lon) from a Google Maps URL, or returns None. Short share links
+    carry no coordinates, so when resolve is True they are followed (with a short
+    timeout) to the full URL first.
+    """
+    if not url:
+        return None
+    text = urllib.parse.unquote(url)
+    for pattern in _URL_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            lat, lon = float(match.group(1)), float(match.group(2))
+            if valid_coordinates(lat, lon):
+                return lat, lon
+    host = urllib.parse.urlparse(url).hostname or ''
+    if resolve and host in SHORT_LINK_HOSTS:
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, method='HEAD'), timeout=RESOLVE_TIMEOUT) as response:
+                final_url = response.geturl()
+        except Exception as e:
+            log.warning("Could not resolve map link %s: %s", url, e)
+            return None
+        if final_url != url:
+            return coordinates_from_url(final_url, resolve=False)
+    return None
+
+
+def encode(lat, lon, precision=GEOHASH_PRECISION):
+    """Encodes a point as a geohash of the given length."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, coordinate = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if coordinate >= mid:
+            value = (value << 1) | 1
+            rng[0] = mid
+        else:
+            value <<= 1
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """Returns (lat_degrees, lon_degrees) covered by one cell at this precision."""
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def query_prefixes(lat, lon, radius_km):
+    """
+    Returns the geohash prefixes whose cells cover a circle: the centre cell and
+    its eight neighbours, at the finest precision where one cell is at least as
+    large as the radius in both directions.
+    """
+    # Longitude degrees shrink towards the poles, so size cells for the edge of
+    # the circle nearest a pole.
+    edge_lat = min(89.9, abs(lat) + radius_km / KM_PER_DEGREE)
+    lon_km_per_degree = KM_PER_DEGREE * math.cos(math.radians(edge_lat))
+    precision = 1
+    for candidate in range(GEOHASH_PRECISION, 0, -1):
+        lat_deg, lon_deg = cell_size(candidate)
+        if lat_deg * KM_PER_DEGREE >= radius_km and lon_deg * lon_km_per_degree >= radius_km:
+            precision = candidate
+            break
+
+    lat_deg, lon_deg = cell_size(precision)
+    prefixes = set()
+    for d_lat in (-lat_deg, 0, lat_deg):
+        for d_lon in (-lon_deg, 0, lon_deg):
+            cell_lat = max(-90.0, min(90.0, lat + d_lat))
+            cell_lon = (lon + d_lon + 180) % 360 - 180
+            prefixes.add(encode(cell_lat, cell_lon, precision))
+    return sorted(prefixes)
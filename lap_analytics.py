@@ -0,0 +1,112 @@
+# lap_analytics.py
+# Lap time statistics for the Winner's Circle, computed with NumPy array
+# operations over every lap at once instead of per-row Python loops.
+
+import numpy as np
+
+from lap_import import RowError, lap_time_to_seconds
+
+
+def _round(values):
+    return np.round(values, 3).tolist()
+
+
+def _laps_to_arrays(laps):
+    """
+    Converts lap_times documents into parallel arrays of lap seconds, driver codes
+    and crossing order. Laps with an unreadable time are skipped.
+    """
+    seconds, drivers, timestamps = [], [], []
+    for lap in laps:
+        try:
+            seconds.append(lap_time_to_seconds(lap.get('lapTime')))
+        except RowError:
+            continue
+        drivers.append(lap.get('username') or 'Unknown')
+        timestamp = lap.get('timestamp')
+        timestamps.append(timestamp.timestamp() if hasattr(timestamp, 'timestamp') else 0.0)
+    names, codes = np.unique(np.array(drivers, dtype=object), return_inverse=True)
+    return np.array(seconds, dtype=np.float64), codes, np.array(timestamps, dtype=np.float64), names
+
+
+def _group_medians(values, codes, counts):
+    # Sort by group, then by value, so each group's laps are contiguous and ordered.
+    order = np.lexsort((values, codes))
+    sorted_values = values[order]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    low = starts + (counts - 1) // 2
+    high = starts + counts // 2
+    return (sorted_values[low] + sorted_values[high]) / 2
+
+
+def _lap_over_lap(values, codes, timestamps, group_count):
+    # Consecutive laps by the same driver, in crossing order.
+    order = np.lexsort((timestamps, codes))
+    sorted_values = values[order]
+    sorted_codes = codes[order]
+    same_driver = sorted_codes[1:] == sorted_codes[:-1]
+    deltas = np.diff(sorted_values)[same_driver]
+    delta_codes = sorted_codes[1:][same_driver]
+    delta_counts = np.bincount(delta_codes, minlength=group_count)
+    delta_sums = np.bincount(delta_codes, weights=deltas, minlength=group_count)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_delta = np.where(delta_counts > 0, delta_sums / np.maximum(delta_counts, 1), 0.0)
+
+    starts = np.flatnonzero(np.concatenate(([True], ~same_driver)))
+    ends = np.concatenate((starts[1:], [len(sorted_values)])) - 1
+    first_to_last = sorted_values[starts] - sorted_values[ends]
+    return mean_delta, first_to_last
+
+
+def compute_lap_stats(laps, group_by='username'):
+    """
+    Computes best, mean, median and standard deviation (consistency) per group,
+    plus the gap to the leader and lap-over-lap improvement.
+    group_by is 'username' for an event leaderboard or 'eventId' for one driver
+    across events. Times are returned in seconds.
+    """
+    if group_by != 'username':
+        laps = [dict(lap, username=lap.get(group_by)) for lap in laps]
+    values, codes, timestamps, names = _laps_to_arrays(laps)
+    if values.size == 0:
+        return {'lap_count': 0, 'overall': None, 'groups': []}
+
+    group_count = len(names)
+    counts = np.bincount(codes, minlength=group_count)
+    sums = np.bincount(codes, weights=values, minlength=group_count)
+    squares = np.bincount(codes, weights=values ** 2, minlength=group_count)
+    means = sums / counts
+    stds = np.sqrt(np.maximum(squares / counts - means ** 2, 0.0))
+    bests = np.full(group_count, np.inf)
+    np.minimum.at(bests, codes, values)
+    medians = _group_medians(values, codes, counts)
+    mean_delta, first_to_last = _lap_over_lap(values, codes, timestamps, group_count)
+
+    leader_best = bests.min()
+    gaps = bests - leader_best
+    gap_pcts = gaps / leader_best * 100
+    # Share of the field a group is faster than or equal to, leader = 100.
+    ranks = np.argsort(np.argsort(bests, kind='stable'), kind='stable')
+    percentiles = 100.0 if group_count == 1 else (1 - ranks / (group_count - 1)) * 100
+
+    rounded = {
+        'best': _round(bests), 'mean': _round(means), 'median': _round(medians), 'std': _round(stds),
+        'gap': _round(gaps), 'gap_pct': _round(gap_pcts), 'percentile': _round(np.broadcast_to(percentiles, bests.shape)),
+        'lap_over_lap': _round(mean_delta), 'improvement': _round(first_to_last)
+    }
+    groups = [{
+        'name': str(names[i]),
+        'laps': int(counts[i]),
+        **{key: column[i] for key, column in rounded.items()}
+    } for i in np.argsort(bests, kind='stable')]
+
+    return {
+        'lap_count': int(values.size),
+        'overall': {
+            'best': round(float(values.min()), 3),
+            'mean': round(float(values.mean()), 3),
+            'median': round(float(np.median(values)), 3),
+            'std': round(float(values.std()), 3)
+        },
+        'groups': groups
+    }
@@ -0,0 +1,253 @@
+# lap_import.py
+# Bulk lap time import for timing-system exports (CSV or NDJSON).
+# Rows are parsed one at a time from the input stream, so a full-day export is
+# never held in memory, and lap times are written with batched Firestore commits.
+#
+# Command line usage (uses the same serviceAccountKey.json as app.py):
+#    python lap_import.py session.csv --event-id <eventId>
+#    python lap_import.py laps.ndjson --format ndjson --driver-map drivers.json
+
+import argparse
+import codecs
+import csv
+import datetime
+import json
+import math
+import re
+
+# Firestore allows at most 500 writes in a single batch.
+BATCH_SIZE = 400
+# Only the first few row errors are reported back in full; the rest are counted.
+MAX_REPORTED_ERRORS = 100
+
+# Header aliases used by common transponder timing exports.
+EVENT_COLUMNS = ('eventid', 'event_id', 'event')
+USERNAME_COLUMNS = ('username', 'driver', 'driver_name', 'name', 'competitor')
+LAP_TIME_COLUMNS = ('laptime', 'lap_time', 'lap time', 'time', 'best_lap')
+LAP_TIME_MS_COLUMNS = ('laptimems', 'lap_time_ms', 'time_ms', 'milliseconds')
+TIMESTAMP_COLUMNS = ('timestamp', 'time_of_day', 'crossing_time', 'datetime')
+
+_LAP_TIME_RE = re.compile(r'^(?:(?:(\d+):)?(\d{1,2}):)?(\d+(?:\.\d+)?)$')
+
+
+class RowError(ValueError):
+    """Raised when a single import row cannot be turned into a lap time."""
+
+
+def lap_time_to_seconds(value):
+    """
+    Converts a lap time such as '1:45.123', '01:45.1', '105.123' or '0:01:45.123'
+    into seconds. Raises RowError if the value is not a recognisable lap time.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        seconds = float(value)
+    else:
+        match = _LAP_TIME_RE.match(str(value or '').strip())
+        if not match:
+            raise RowError(f'Unrecognised lap time "{value}".')
+        hours, minutes, secs = match.groups()
+        seconds = int(hours or 0) * 3600 + int(minutes or 0) * 60 + float(secs)
+    if not math.isfinite(seconds):
+        raise RowError(f'Lap time "{value}" is not a finite number.')
+    if seconds <= 0:
+        raise RowError(f'Lap time "{value}" must be greater than zero.')
+    return seconds
+
+
+def format_lap_time(seconds):
+    """
+    Formats seconds into the MM:SS.mmm string used by the Winner's Circle.
+    """
+    total_ms = int(round(seconds * 1000))
+    minutes, ms = divmod(total_ms, 60000)
+    return f'{minutes:02d}:{ms // 1000:02d}.{ms % 1000:03d}'
+
+
+def normalize_lap_time(value):
+    """
+    Normalizes any supported lap time representation to MM:SS.mmm.
+    """
+    return format_lap_time(lap_time_to_seconds(value))
+
+
+def _pick(row, columns):
+    for column in columns:
+        value = row.get(column)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def _parse_timestamp(value):
+    if not value:
+        return None
+    try:
+        parsed = datetime.datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        raise RowError(f'Unrecognised timestamp "{value}".')
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed
+
+
+def row_to_lap(row, default_event_id=None, default_username=None, driver_map=None):
+    """
+    Maps a parsed import row to a lap_times document.
+    Column names are matched case-insensitively against the known aliases, and
+    driver names or transponder numbers can be mapped to usernames via driver_map.
+    """
+    row = {str(key).strip().lower(): value for key, value in row.items() if key is not None}
+
+    event_id = _pick(row, EVENT_COLUMNS) or default_event_id
+    username = _pick(row, USERNAME_COLUMNS) or default_username
+    if driver_map:
+        transponder = row.get('transponder')
+        username = driver_map.get(str(username), driver_map.get(str(transponder), username))
+
+    raw_ms = _pick(row, LAP_TIME_MS_COLUMNS)
+    if raw_ms is not None:
+        try:
+            lap_time = format_lap_time(lap_time_to_seconds(float(raw_ms) / 1000))
+        except ValueError:
+            raise RowError(f'Unrecognised lap time "{raw_ms}" ms.')
+    else:
+        raw_time = _pick(row, LAP_TIME_COLUMNS)
+        if raw_time is None:
+            raise RowError('Missing lap time.')
+        lap_time = normalize_lap_time(raw_time)
+
+    if not event_id:
+        raise RowError('Missing eventId.')
+    if not username:
+        raise RowError('Missing username.')
+
+    return {
+        'eventId': str(event_id).strip(),
+        'lapTime': lap_time,
+        'username': str(username).strip(),
+        'timestamp': _parse_timestamp(_pick(row, TIMESTAMP_COLUMNS))
+                     or datetime.datetime.now(datetime.timezone.utc)
+    }
+
+
+def iter_csv_rows(text_stream):
+    """Yields (row_number, row_dict) pairs from a CSV text stream."""
+    reader = csv.DictReader(text_stream)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def iter_ndjson_rows(text_stream):
+    """Yields (line_number, row_dict) pairs from an NDJSON text stream."""
+    for line_number, line in enumerate(text_stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, RowError(f'Invalid JSON: {e}')
+            continue
+        if not isinstance(row, dict):
+            yield line_number, RowError('Each line must be a JSON object.')
+            continue
+        yield line_number, row
+
+
+def detect_format(filename=None, content_type=None):
+    """Guesses 'csv' or 'ndjson' from a filename or content type."""
+    hint = f'{filename or ""} {content_type or ""}'.lower()
+    if 'ndjson' in hint or 'jsonl' in hint or 'json' in hint:
+        return 'ndjson'
+    return 'csv'
+
+
+def text_stream(binary_stream):
+    """Wraps a binary stream in a lazily-decoding UTF-8 text stream."""
+    return codecs.getreader('utf-8-sig')(binary_stream)
+
+
+def import_lap_rows(db, rows, default_event_id=None, default_username=None, driver_map=None,
+                    batch_size=BATCH_SIZE, dry_run=False):
+    """
+    Writes lap times from an iterable of (row_number, row) pairs using batched commits.
+    Bad rows are skipped and reported; good rows are committed every batch_size rows.
+    Returns a summary dict with the imported count, the per-row errors and the
+    event IDs that were touched.
+    """
+    imported = 0
+    error_count = 0
+    errors = []
+    touched_events = set()
+    batch = db.batch()
+    pending = 0
+
+    for row_number, row in rows:
+        try:
+            if isinstance(row, Exception):
+                raise row
+            lap = row_to_lap(row, default_event_id, default_username, driver_map)
+        except RowError as e:
+            error_count += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({'row': row_number, 'error': str(e)})
+            continue
+
+        touched_events.add(lap['eventId'])
+        imported += 1
+        if dry_run:
+            continue
+        batch.set(db.collection('lap_times').document(), lap)
+        pending += 1
+        if pending >= batch_size:
+            batch.commit()
+            batch = db.batch()
+            pending = 0
+
+    if pending:
+        batch.commit()
+
+    return {
+        'imported': imported,
+        'error_count': error_count,
+        'errors': errors,
+        'event_ids': sorted(touched_events)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk import lap times from a timing-system export.')
+    parser.add_argument('path', help='CSV or NDJSON file to import.')
+    parser.add_argument('--format', choices=['csv', 'ndjson'], help='Input format (guessed from the file name).')
+    parser.add_argument('--event-id', help='Event ID for rows without an eventId column.')
+    parser.add_argument('--username', help='Username for rows without a driver column.')
+    parser.add_argument('--driver-map', help='JSON file mapping driver names or transponders to usernames.')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--dry-run', action='store_true', help='Validate rows without writing anything.')
+    args = parser.parse_args()
+
+    driver_map = None
+    if args.driver_map:
+        with open(args.driver_map, 'r') as f:
+            driver_map = json.load(f)
+
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+    firebase_admin.initialize_app(credentials.Certificate('serviceAccountKey.json'))
+    db = firestore.client()
+
+    input_format = args.format or detect_format(args.path)
+    with open(args.path, 'r', encoding='utf-8-sig', newline='') as f:
+        rows = iter_ndjson_rows(f) if input_format == 'ndjson' else iter_csv_rows(f)
+        summary = import_lap_rows(db, rows, args.event_id, args.username, driver_map,
+                                  batch_size=min(args.batch_size, 500), dry_run=args.dry_run)
+
+    print(f"✅ Imported {summary['imported']} lap time(s) into {len(summary['event_ids'])} event(s).")
+    if summary['error_count']:
+        print(f"⚠️ Skipped {summary['error_count']} row(s):")
+        for error in summary['errors']:
+            print(f"   row {error['row']}: {error['error']}")
+
+
+if __name__ == '__main__':
+    main()
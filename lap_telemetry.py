@@ -0,0 +1,368 @@
+# lap_telemetry.py
+# Sector splits and data-logger telemetry for lap times, kept out of Firestore.
+# Each event has a folder of raw column files under 'telemetry/<event_id>/':
+#   sectors.f64        one row of sector times per lap (NaN where a lap has fewer sectors)
+#   drivers.i32        the driver code of each lap
+#   offsets.i64        where each lap's samples start in the channel columns
+#   ch_<name>.f32      one column per telemetry channel (speed, rpm, throttle, ...)
+#   index.json         lap ids, driver names, channel names and the row/sample counts
+# Columns are only ever appended to and are read back with np.memmap, so a
+# query maps the files instead of parsing them and every statistic is a NumPy
+# reduction over whole columns. The index is replaced atomically after the
+# columns are written, so a crash mid-write leaves the old index (and the
+# partial tail is cut off on the next write). Firestore keeps only a small
+# 'telemetry' summary on the lap_times document.
+#
+# There is one writer per event folder: run a single server process that ingests telemetry.
+
+import json
+import os
+import re
+import shutil
+import threading
+import warnings
+
+import numpy as np
+
+from lap_import import RowError, lap_time_to_seconds
+
+TELEMETRY_DIR = 'telemetry'
+MAX_SECTORS = 32
+MAX_SAMPLES_PER_LAP = 200000
+CHANNEL_NAME = re.compile(r'^[A-Za-z][A-Za-z0-9_]{0,31}$')
+PERCENTILES = (10, 50, 90)
+
+
+class TelemetryError(ValueError):
+    """Raised for telemetry that cannot be stored or queried."""
+
+
+def _round(values):
+    return [None if np.isnan(v) else round(float(v), 3) for v in np.asarray(values, dtype=np.float64).ravel()]
+
+
+def parse_sectors(values):
+    """Converts a list of sector times (seconds or '0:31.250' strings) into floats."""
+    if not isinstance(values, list) or not values:
+        raise TelemetryError('sectors must be a non-empty list.')
+    if len(values) > MAX_SECTORS:
+        raise TelemetryError(f'A lap can have at most {MAX_SECTORS} sectors.')
+    try:
+        return np.array([lap_time_to_seconds(value) for value in values], dtype=np.float64)
+    except RowError as e:
+        raise TelemetryError(f'Invalid sector time: {e}')
+
+
+def parse_channels(channels):
+    """Converts {'speed': [...], ...} into float32 arrays that all have the same length."""
+    if not isinstance(channels, dict):
+        raise TelemetryError('channels must be an object of equal-length number lists.')
+    parsed, length = {}, None
+    for name, values in channels.items():
+        if not CHANNEL_NAME.match(str(name)):
+            raise TelemetryError(f'Invalid channel name "{name}".')
+        try:
+            array = np.asarray(values, dtype=np.float32)
+        except (TypeError, ValueError):
+            raise TelemetryError(f'Channel "{name}" must be a list of numbers.')
+        if array.ndim != 1:
+            raise TelemetryError(f'Channel "{name}" must be a flat list of numbers.')
+        if length is not None and len(array) != length:
+            raise TelemetryError('Every channel must have the same number of samples.')
+        length = len(array)
+        parsed[name] = array
+    if length and length > MAX_SAMPLES_PER_LAP:
+        raise TelemetryError(f'A lap can have at most {MAX_SAMPLES_PER_LAP} samples.')
+    return parsed
+
+
+class EventTelemetry:
+    """Read-only, memory-mapped view of one event's columns. Only live (not replaced or deleted) laps are used."""
+
+    def __init__(self, folder, index):
+        self.index = index
+        self.lap_ids = index['laps']
+        self.driver_names = index['drivers']
+        self.channel_names = index['channels']
+        self.sector_count = index['sector_count']
+        lap_count, sample_count = index['lap_count'], index['sample_count']
+
+        self.sectors = _map(folder, 'sectors.f64', np.float64, lap_count * self.sector_count).reshape(
+            lap_count, self.sector_count)
+        self.drivers = _map(folder, 'drivers.i32', np.int32, lap_count)
+        self.offsets = np.append(_map(folder, 'offsets.i64', np.int64, lap_count), sample_count)
+        self.channels = {name: _map(folder, f'ch_{name}.f32', np.float32, sample_count)
+                         for name in self.channel_names}
+        self.live = np.ones(lap_count, dtype=bool)
+        if index['removed']:
+            self.live[index['removed']] = False
+
+    def row_of(self, lap_id):
+        rows = [row for row, value in enumerate(self.lap_ids) if value == lap_id and self.live[row]]
+        return rows[-1] if rows else None
+
+
+def _map(folder, filename, dtype, count):
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(os.path.join(folder, filename), dtype=dtype, mode='r', shape=(count,))
+
+
+class TelemetryStore:
+    def __init__(self, root=TELEMETRY_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def _folder(self, event_id):
+        # Event ids are Firestore ids, but never trust a path component.
+        safe = re.sub(r'[^A-Za-z0-9_-]', '_', str(event_id))
+        return os.path.join(self.root, safe)
+
+    def _read_index(self, folder):
+        try:
+            with open(os.path.join(folder, 'index.json'), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'laps': [], 'drivers': [], 'channels': [], 'sector_count': 0, 'lap_count': 0,
+                    'sample_count': 0, 'removed': []}
+
+    def _write_index(self, folder, index):
+        temp_path = os.path.join(folder, 'index.json.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(temp_path, os.path.join(folder, 'index.json'))
+
+    def _append(self, folder, filename, array, expected_items, dtype):
+        path = os.path.join(folder, filename)
+        expected_bytes = expected_items * np.dtype(dtype).itemsize
+        with open(path, 'ab') as f:
+            # Drop anything a crashed write left past the indexed length.
+            if f.tell() != expected_bytes:
+                f.truncate(expected_bytes)
+            f.write(np.ascontiguousarray(array, dtype=dtype).tobytes())
+
+    def add_lap(self, event_id, lap_id, driver, sectors=None, channels=None):
+        """
+        Appends one lap's sectors and/or channels, replacing any earlier telemetry for
+        the lap. Returns the summary stored on the lap_times document.
+        """
+        if sectors is None and not channels:
+            raise TelemetryError('Provide sectors and/or channels.')
+        sector_values = parse_sectors(sectors) if sectors is not None else None
+        channel_values = parse_channels(channels or {})
+        sample_count = len(next(iter(channel_values.values()))) if channel_values else 0
+
+        folder = self._folder(event_id)
+        with self._lock:
+            os.makedirs(folder, exist_ok=True)
+            index = self._read_index(folder)
+            lap_count, total_samples = index['lap_count'], index['sample_count']
+
+            width = index['sector_count']
+            if sector_values is not None:
+                if width == 0:
+                    # First sectors for this event: earlier telemetry-only laps get NaN rows.
+                    width = len(sector_values)
+                    self._append(folder, 'sectors.f64', np.full(lap_count * width, np.nan), 0, np.float64)
+                elif len(sector_values) != width:
+                    raise TelemetryError(f'Laps in this event have {width} sectors, not {len(sector_values)}.')
+            row = np.full(width, np.nan)
+            if sector_values is not None:
+                row[:] = sector_values
+
+            if driver not in index['drivers']:
+                index['drivers'].append(driver)
+            # A channel seen for the first time is NaN for all earlier samples.
+            for name in channel_values:
+                if name not in index['channels']:
+                    self._append(folder, f'ch_{name}.f32', np.full(total_samples, np.nan), 0, np.float32)
+                    index['channels'].append(name)
+
+            self._append(folder, 'sectors.f64', row, lap_count * width, np.float64)
+            self._append(folder, 'drivers.i32', [index['drivers'].index(driver)], lap_count, np.int32)
+            self._append(folder, 'offsets.i64', [total_samples], lap_count, np.int64)
+            for name in index['channels']:
+                values = channel_values.get(name, np.full(sample_count, np.nan, dtype=np.float32))
+                self._append(folder, f'ch_{name}.f32', values, total_samples, np.float32)
+
+            # The new row replaces any earlier telemetry for the same lap.
+            index['removed'].extend(row_number for row_number, value in enumerate(index['laps'])
+                                    if value == lap_id and row_number not in index['removed'])
+            index['laps'].append(lap_id)
+            index['sector_count'] = width
+            index['lap_count'] = lap_count + 1
+            index['sample_count'] = total_samples + sample_count
+            self._write_index(folder, index)
+            self._views.pop(folder, None)
+
+        summary = {'samples': sample_count, 'channels': sorted(channel_values)}
+        if sector_values is not None:
+            summary['sectorCount'] = len(sector_values)
+            summary['sectorTotal'] = round(float(sector_values.sum()), 3)
+        return summary
+
+    def remove_lap(self, event_id, lap_id):
+        folder = self._folder(event_id)
+        with self._lock:
+            index = self._read_index(folder)
+            rows = [row for row, value in enumerate(index['laps']) if value == lap_id and row not in index['removed']]
+            if not rows:
+                return False
+            index['removed'].extend(rows)
+            self._write_index(folder, index)
+            self._views.pop(folder, None)
+            return True
+
+    def clear(self):
+        with self._lock:
+            shutil.rmtree(self.root, ignore_errors=True)
+            self._views.clear()
+
+    def load(self, event_id):
+        """Returns the EventTelemetry view for an event (cached until the next write)."""
+        folder = self._folder(event_id)
+        with self._lock:
+            view = self._views.get(folder)
+            if view is None:
+                view = self._views[folder] = EventTelemetry(folder, self._read_index(folder))
+            return view
+
+
+# --- Queries ---
+def _best_sectors_by_driver(view):
+    """Returns (driver codes, best sector matrix) over live laps, one row per driver with sector times."""
+    sectors, drivers = view.sectors[view.live], view.drivers[view.live]
+    if not len(drivers) or not view.sector_count:
+        return np.zeros(0, dtype=np.int32), np.zeros((0, view.sector_count))
+    order = np.argsort(drivers, kind='stable')
+    sorted_drivers = drivers[order]
+    starts = np.flatnonzero(np.concatenate(([True], sorted_drivers[1:] != sorted_drivers[:-1])))
+    # fmin ignores NaN, so a sector a lap did not record never counts as its best.
+    best = np.fmin.reduceat(np.asarray(sectors)[order], starts, axis=0)
+    # A driver none of whose laps recorded any sector has nothing to compare.
+    timed = ~np.isnan(best).all(axis=1)
+    return sorted_drivers[starts][timed], best[timed]
+
+
+def theoretical_best(view):
+    """
+    The theoretical best lap (sum of best sectors) for the event and for each
+    driver, with each driver's best complete lap and the time left on the table.
+    """
+    codes, best = _best_sectors_by_driver(view)
+    if not len(codes):
+        return {'sector_count': view.sector_count, 'overall': None, 'drivers': []}
+
+    theoretical = best.sum(axis=1)  # NaN if a driver never recorded some sector
+    sectors, drivers = np.asarray(view.sectors[view.live]), view.drivers[view.live]
+    lap_totals = sectors.sum(axis=1)
+    complete = ~np.isnan(lap_totals)
+    best_laps = np.full(len(view.driver_names), np.inf)
+    np.minimum.at(best_laps, drivers[complete], lap_totals[complete])
+    best_laps = np.where(np.isinf(best_laps), np.nan, best_laps)[codes]
+
+    overall_best = np.fmin.reduce(best, axis=0)
+    entries = [{
+        'name': view.driver_names[code],
+        'best_sectors': _round(best[i]),
+        'theoretical_best': _round([theoretical[i]])[0],
+        'best_lap': _round([best_laps[i]])[0],
+        'gain': _round([best_laps[i] - theoretical[i]])[0]
+    } for i, code in enumerate(codes)]
+    entries.sort(key=lambda entry: (entry['theoretical_best'] is None, entry['theoretical_best'] or 0))
+    return {
+        'sector_count': view.sector_count,
+        'overall': {'best_sectors': _round(overall_best), 'theoretical_best': _round([overall_best.sum()])[0]},
+        'drivers': entries
+    }
+
+
+def sector_deltas(view, reference=None):
+    """
+    Each driver's best sectors minus the reference driver's (by default the
+    driver with the fastest theoretical lap), per sector and cumulatively.
+    """
+    codes, best = _best_sectors_by_driver(view)
+    if not len(codes):
+        return {'reference': None, 'drivers': []}
+    names = [view.driver_names[code] for code in codes]
+    if reference is None:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            totals = best.sum(axis=1)
+        ref_row = int(np.nanargmin(totals)) if not np.isnan(totals).all() else 0
+    elif reference in names:
+        ref_row = names.index(reference)
+    else:
+        raise TelemetryError(f'No sector times for driver "{reference}" in this event.')
+
+    deltas = best - best[ref_row]
+    cumulative = np.cumsum(deltas, axis=1)
+    return {
+        'reference': names[ref_row],
+        'drivers': [{'name': name, 'deltas': _round(deltas[i]), 'cumulative': _round(cumulative[i])}
+                    for i, name in enumerate(names)]
+    }
+
+
+def distributions(view, channel=None):
+    """
+    Sector time percentiles across all laps and, for a telemetry channel,
+    each lap's min, mean and max.
+    """
+    result = {'percentiles': list(PERCENTILES), 'sectors': []}
+    sectors = np.asarray(view.sectors[view.live])
+    if len(sectors) and view.sector_count:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            spread = np.nanpercentile(sectors, PERCENTILES, axis=0)
+            totals = sectors.sum(axis=1)
+            totals = totals[~np.isnan(totals)]
+        result['sectors'] = [{'sector': i + 1, 'values': _round(spread[:, i]),
+                              'laps': int(np.count_nonzero(~np.isnan(sectors[:, i])))}
+                             for i in range(view.sector_count)]
+        result['lap_totals'] = _round(np.percentile(totals, PERCENTILES)) if len(totals) else None
+
+    if channel is not None:
+        if channel not in view.channels:
+            raise TelemetryError(f'No "{channel}" telemetry in this event.')
+        # Every lap with samples is one contiguous run, and together the runs tile
+        # the column, so one reduceat per statistic covers all laps at once.
+        has_samples = np.flatnonzero(np.diff(view.offsets) > 0)
+        keep = view.live[has_samples]
+        rows = has_samples[keep]
+        values = view.channels[channel]
+        if len(rows):
+            starts = view.offsets[has_samples]
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)
+                lows = np.fmin.reduceat(values, starts)[keep]
+                highs = np.fmax.reduceat(values, starts)[keep]
+                missing = np.isnan(values)
+                sums = np.add.reduceat(np.where(missing, 0.0, values).astype(np.float64), starts)[keep]
+                counts = np.add.reduceat(~missing, starts, dtype=np.int64)[keep]
+                means = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+        else:
+            lows = highs = means = np.zeros(0)
+        result['channel'] = {
+            'name': channel,
+            'laps': [{'lapId': view.lap_ids[row], 'driver': view.driver_names[view.drivers[row]],
+                      'min': low, 'mean': mean, 'max': high}
+                     for row, low, mean, high in zip(rows, _round(lows), _round(means), _round(highs))]
+        }
+    return result
+
+
+def lap_detail(view, lap_id):
+    """One lap's sectors and full channel arrays, for charting."""
+    row = view.row_of(lap_id)
+    if row is None:
+        return None
+    start, end = view.offsets[row], view.offsets[row + 1]
+    return {
+        'lapId': lap_id,
+        'driver': view.driver_names[view.drivers[row]],
+        'sectors': _round(view.sectors[row]) if view.sector_count else [],
+        'channels': {name: _round(column[start:end]) for name, column in view.channels.items()}
+    }
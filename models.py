@@ -0,0 +1,272 @@
+# models.py
+# Typed models for the documents the app stores. Each model lists its fields once;
+# from that list the class gets __slots__, and the shared from_request, from_data,
+# to_json and to_document methods walk it, so parsing a request body, decoding a
+# Firestore document and building a response all follow the same declaration.
+# A slotted object also carries no per-instance __dict__, which keeps large list
+# responses cheap.
+
+import datetime
+
+MISSING = type('Missing', (), {'__repr__': lambda self: 'MISSING', '__bool__': lambda self: False})()
+
+# How a field's expected type is named in error messages.
+KIND_NAMES = {str: 'text', bool: 'a boolean', int: 'a number', float: 'a number', list: 'a list', dict: 'an object'}
+
+
+class ValidationError(ValueError):
+    """Raised for an invalid request body. Routes already answer ValueError with a 400."""
+
+
+class Field:
+    """
+    One document field. 'key' is the request body key when it differs from the
+    document field name. Fields with writable=False (timestamps, derived values)
+    are decoded from documents and returned in responses but never read from a
+    request. A field without a default is left out of responses when the
+    document does not have it. List fields are sets of IDs that PATCH can
+    add to or remove from, unless ordered=True: an ordered list (which may
+    repeat items) is only ever replaced whole.
+    """
+    __slots__ = ('name', 'key', 'kind', 'default', 'required', 'max_length', 'label', 'writable', 'ordered')
+
+    def __init__(self, name, key=None, kind=None, default=MISSING, required=False, max_length=None, label=None,
+                 writable=True, ordered=False):
+        self.name = name
+        self.key = key or name
+        self.kind = kind
+        self.default = default
+        self.required = required
+        self.max_length = max_length
+        self.label = label or self.key
+        self.writable = writable
+        self.ordered = ordered
+
+    def default_value(self):
+        """The default, copied when it is a list so instances never share one."""
+        return list(self.default) if isinstance(self.default, list) else self.default
+
+    def check(self, value):
+        """Type and length checks for a non-empty value. Raises ValidationError."""
+        if self.kind is not None and not isinstance(value, self.kind):
+            kind_name = KIND_NAMES.get(self.kind, f'a {self.kind.__name__}')
+            raise ValidationError(f'{self.label} must be {kind_name}.')
+        if self.max_length is not None and len(value) > self.max_length:
+            raise ValidationError(f'{self.label} cannot exceed {self.max_length} characters.')
+
+
+class _ModelMeta(type):
+    def __new__(mcs, name, bases, namespace):
+        fields = namespace.get('FIELDS', ())
+        namespace.setdefault('__slots__', tuple(field.name for field in fields))
+        cls = super().__new__(mcs, name, bases, namespace)
+        if fields:
+            cls.FIELDS_BY_NAME = {field.name: field for field in fields}
+            # Request key -> document field for apply_patch, and the keys it must not blank.
+            cls.PATCH_FIELDS = {field.key: field.name for field in fields if field.writable}
+            cls.ARRAY_FIELDS = tuple(field.name for field in fields if field.kind is list and not field.ordered)
+            cls.REQUIRED_KEYS = tuple(field.key for field in fields if field.required)
+        return cls
+
+
+class Model(metaclass=_ModelMeta):
+    """
+    Base class. Subclasses set FIELDS, REQUIRED_MESSAGE (returned when a required
+    field is missing) and optionally CREATED_FIELDS / UPDATED_FIELDS for stamp().
+    """
+    __slots__ = ('id',)
+    FIELDS = ()
+    REQUIRED_MESSAGE = 'Missing required data.'
+    CREATED_FIELDS = ('created_at',)
+    UPDATED_FIELDS = ('updated_at',)
+
+    @classmethod
+    def from_request(cls, data):
+        """Builds a model from a request body and validates it. Raises ValidationError."""
+        self = object.__new__(cls)
+        self.id = None
+        for field in cls.FIELDS:
+            value = MISSING
+            if field.writable:
+                value = data.get(field.key)
+                if value is None:
+                    value = None if field.default is MISSING else field.default_value()
+            setattr(self, field.name, value)
+        self.validate()
+        return self
+
+    @classmethod
+    def from_data(cls, doc_id, data):
+        self = object.__new__(cls)
+        self.id = doc_id
+        for field in cls.FIELDS:
+            setattr(self, field.name, data.get(field.name, field.default_value()))
+        return self
+
+    @classmethod
+    def from_doc(cls, doc):
+        return cls.from_data(doc.id, doc.to_dict())
+
+    def validate(self):
+        """Checks the writable fields. Raises ValidationError."""
+        if not all(getattr(self, field.name) for field in self.FIELDS if field.required):
+            raise ValidationError(self.REQUIRED_MESSAGE)
+        for field in self.FIELDS:
+            value = getattr(self, field.name)
+            if field.writable and value is not None and (value or field.kind is not None):
+                field.check(value)
+
+    def to_document(self):
+        """Document dict: every field that has a value."""
+        out = {}
+        for field in self.FIELDS:
+            value = getattr(self, field.name)
+            if value is not MISSING:
+                out[field.name] = value
+        return out
+
+    def to_json(self, fields=None):
+        """Response dict: the document fields plus 'id', optionally limited to 'fields'."""
+        out = {'id': self.id}
+        names = [field.name for field in self.FIELDS] if fields is None else fields
+        for name in names:
+            value = getattr(self, name)
+            if value is not MISSING:
+                out[name] = value
+        return out
+
+    def stamp(self, created=False):
+        """Sets the update timestamps, and the creation ones too when created is True."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        for name in self.UPDATED_FIELDS + (self.CREATED_FIELDS if created else ()):
+            setattr(self, name, now)
+        return self
+
+    @classmethod
+    def validate_value(cls, name, value):
+        """Checks one value for a document field. Raises ValidationError."""
+        field = cls.FIELDS_BY_NAME[name]
+        if field.required and not value:
+            raise ValidationError(f'{field.label} is required.')
+        if value is not None and (value or field.kind is not None):
+            field.check(value)
+
+    @classmethod
+    def validate_patch(cls, data):
+        """
+        Checks the writable fields present in a partial update and returns them as
+        {document field: value}. Array fields may also be {'add': [...], 'remove': [...]}.
+        """
+        updates = {}
+        for key, name in cls.PATCH_FIELDS.items():
+            if key not in data:
+                continue
+            value = data[key]
+            if not (name in cls.ARRAY_FIELDS and isinstance(value, dict)):
+                cls.validate_value(name, value)
+            updates[name] = value
+        return updates
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.id!r})'
+
+
+class Profile(Model):
+    FIELDS = (
+        Field('username', kind=str, required=True, max_length=12, label='Username'),
+        Field('helmetColor', default='#ffffff'),
+        Field('pin', default=None),
+        Field('pinEnabled', default=False),
+        Field('theme', default='dark'),
+        Field('created_at', writable=False),
+        Field('updated_at', writable=False),
+    )
+    REQUIRED_MESSAGE = 'Username is required.'
+
+
+class Garage(Model):
+    FIELDS = (
+        Field('name', key='garageName', kind=str, required=True, max_length=25, label='Garage name'),
+        Field('shared', default=False, writable=False),
+        Field('garageDoorCode', default='', writable=False),
+        Field('codeVersion', writable=False),
+        Field('created_at', writable=False),
+        Field('updated_at', writable=False),
+    )
+    REQUIRED_MESSAGE = 'Profile ID and garage name are required.'
+
+
+class Vehicle(Model):
+    FIELDS = (
+        Field('year', required=True),
+        Field('make', required=True),
+        Field('model', required=True),
+        Field('garageId'),
+        Field('photo'),  # Base64 string
+        Field('photoURL'),  # URL string
+        Field('order', writable=False),
+        Field('created_at', writable=False),
+        Field('updated_at', writable=False),
+    )
+    REQUIRED_MESSAGE = 'Year, Make, and Model are required.'
+
+
+class Event(Model):
+    FIELDS = (
+        Field('name', required=True),
+        Field('start_time', key='startTime', kind=str, required=True, label='startTime'),
+        Field('start_at', writable=False),
+        Field('end_time', key='endTime', kind=str, label='endTime'),
+        Field('vehicles', kind=list, default=[]),
+        Field('checklists', kind=list, default=[]),
+        Field('trackId'),
+        Field('is_raceday', key='isRaceday', kind=bool, default=False, label='isRaceday'),
+        Field('created_at', writable=False),
+        Field('updated_at', writable=False),
+    )
+    REQUIRED_MESSAGE = 'Event name and start time are required.'
+
+
+class Checklist(Model):
+    FIELDS = (
+        Field('name', required=True, label='Checklist name'),
+        Field('pre_race_tasks', kind=list, default=[], ordered=True),
+        Field('mid_day_tasks', kind=list, default=[], ordered=True),
+        Field('post_race_tasks', kind=list, default=[], ordered=True),
+        Field('created_at', writable=False),
+        Field('updated_at', writable=False),
+    )
+    REQUIRED_MESSAGE = 'Checklist name is required.'
+
+
+class LapTime(Model):
+    FIELDS = (
+        Field('eventId', required=True),
+        Field('lapTime', required=True),
+        Field('username', required=True),
+        Field('timestamp', writable=False),
+        Field('telemetry', writable=False),  # Summary of the sectors/channels kept by lap_telemetry
+    )
+    REQUIRED_MESSAGE = 'Missing data.'
+    CREATED_FIELDS = ('timestamp',)
+    UPDATED_FIELDS = ()
+
+
+class Track(Model):
+    FIELDS = (
+        Field('name', required=True),
+        Field('location', required=True),
+        Field('type', required=True),
+        Field('photo'),
+        Field('photoURL'),
+        Field('layout_photo'),
+        Field('layout_photoURL'),
+        Field('google_url'),
+        Field('profileId', required=True),  # Creator's ID for ownership
+        Field('lat', writable=False),
+        Field('lon', writable=False),
+        Field('geohash', writable=False),
+        Field('created_at', writable=False),
+        Field('updated_at', writable=False),
+    )
+    REQUIRED_MESSAGE = 'Missing required track data.'
@@ -0,0 +1,242 @@
+# snapshot.py
+# Full-dataset snapshot and restore for Firestore.
+#
+# A snapshot is a directory holding a manifest.json plus one folder per
+# collection (subcollections are grouped by their path pattern, e.g.
+# 'driver_profiles.garages'). Each folder holds gzip-compressed NDJSON chunks in
+# which every line is {"path": <full document path>, "data": <encoded fields>},
+# so document IDs are preserved on restore and an archive can be read back
+# without Firestore at all (see iter_archive) for use as a test fixture.
+#
+# Command line usage (uses the same serviceAccountKey.json as app.py):
+#    python snapshot.py create snapshots/before-maintenance
+#    python snapshot.py restore snapshots/before-maintenance
+
+import argparse
+import base64
+import concurrent.futures
+import datetime
+import gzip
+import json
+import os
+import threading
+
+from version import APP_VERSION
+
+ARCHIVE_FORMAT = 1
+CHUNK_SIZE = 50000
+BATCH_SIZE = 400
+MAX_WORKERS = 8
+
+# Subcollections used under driver_profiles. Every name is read with a single
+# collection group query, so documents are found without listing each parent.
+SUBCOLLECTIONS = ['garages', 'vehicles', 'events', 'checklists', 'tracks', 'tombstones', 'garage_names',
+                  'unlocked_garages']
+
+
+def encode_value(value):
+    """Encodes Firestore values that JSON cannot represent directly."""
+    if isinstance(value, datetime.datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, bytes):
+        return {'__bytes__': base64.b64encode(value).decode('ascii')}
+    if hasattr(value, 'latitude') and hasattr(value, 'longitude'):
+        return {'__geopoint__': [value.latitude, value.longitude]}
+    if hasattr(value, 'path') and hasattr(value, 'collection'):
+        return {'__ref__': value.path}
+    if isinstance(value, dict):
+        return {k: encode_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode_value(v) for v in value]
+    return value
+
+
+def decode_value(value, db=None):
+    """
+    Reverses encode_value. Document references become DocumentReferences when a
+    client is given, and plain path strings otherwise.
+    """
+    if isinstance(value, dict):
+        if len(value) == 1:
+            (key, inner), = value.items()
+            if key == '__datetime__':
+                return datetime.datetime.fromisoformat(inner)
+            if key == '__bytes__':
+                return base64.b64decode(inner)
+            if key == '__geopoint__':
+                from google.cloud.firestore import GeoPoint
+                return GeoPoint(*inner)
+            if key == '__ref__':
+                return db.document(inner) if db is not None else inner
+        return {k: decode_value(v, db) for k, v in value.items()}
+    if isinstance(value, list):
+        return [decode_value(v, db) for v in value]
+    return value
+
+
+def collection_pattern(doc_path):
+    """'driver_profiles/abc/garages/xyz' -> 'driver_profiles.garages'"""
+    return '.'.join(doc_path.split('/')[0::2])
+
+
+class _ChunkWriter:
+    """Writes records for one collection pattern into rotating gzip NDJSON chunks."""
+
+    def __init__(self, archive_dir, pattern, chunk_size):
+        self.directory = os.path.join(archive_dir, pattern)
+        self.pattern = pattern
+        self.chunk_size = chunk_size
+        self.files = []
+        self.count = 0
+        self._file = None
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def write(self, path, data):
+        line = json.dumps({'path': path, 'data': encode_value(data)}) + '\n'
+        with self._lock:
+            if self._file is None or self.count % self.chunk_size == 0:
+                self._rotate()
+            self._file.write(line.encode('utf-8'))
+            self.count += 1
+
+    def _rotate(self):
+        if self._file is not None:
+            self._file.close()
+        name = f'part-{len(self.files):05d}.ndjson.gz'
+        self.files.append(f'{self.pattern}/{name}')
+        self._file = gzip.open(os.path.join(self.directory, name), 'wb')
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def create_snapshot(db, archive_dir, subcollections=None, chunk_size=CHUNK_SIZE, max_workers=MAX_WORKERS):
+    """
+    Streams every top-level collection and known subcollection in parallel into a
+    new archive directory and writes its manifest. Returns the manifest.
+    """
+    if os.path.exists(os.path.join(archive_dir, 'manifest.json')):
+        raise FileExistsError(f'A snapshot already exists at {archive_dir}.')
+    os.makedirs(archive_dir, exist_ok=True)
+
+    names = sorted({coll.id for coll in db.collections()} | set(subcollections or SUBCOLLECTIONS))
+    writers = {}
+    writers_lock = threading.Lock()
+
+    def writer_for(pattern):
+        with writers_lock:
+            if pattern not in writers:
+                writers[pattern] = _ChunkWriter(archive_dir, pattern, chunk_size)
+            return writers[pattern]
+
+    def dump(name):
+        count = 0
+        for doc in db.collection_group(name).stream():
+            path = doc.reference.path
+            writer_for(collection_pattern(path)).write(path, doc.to_dict())
+            count += 1
+        return count
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # .result() re-raises any read error so a partial archive is never reported as complete.
+        for future in [executor.submit(dump, name) for name in names]:
+            future.result()
+
+    for writer in writers.values():
+        writer.close()
+
+    manifest = {
+        'format': ARCHIVE_FORMAT,
+        'app_version': APP_VERSION,
+        'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'collections': {
+            pattern: {'count': writer.count, 'files': writer.files}
+            for pattern, writer in sorted(writers.items())
+        }
+    }
+    manifest['document_count'] = sum(c['count'] for c in manifest['collections'].values())
+    with open(os.path.join(archive_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def read_manifest(archive_dir):
+    with open(os.path.join(archive_dir, 'manifest.json'), 'r') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != ARCHIVE_FORMAT:
+        raise ValueError(f"Unsupported snapshot format {manifest.get('format')}.")
+    return manifest
+
+
+def iter_chunk(archive_dir, relative_path, db=None):
+    """Yields (document_path, data) pairs from one chunk, one line at a time."""
+    with gzip.open(os.path.join(archive_dir, relative_path), 'rt', encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            yield record['path'], decode_value(record['data'], db)
+
+
+def iter_archive(archive_dir, db=None):
+    """Yields every (document_path, data) pair in an archive."""
+    manifest = read_manifest(archive_dir)
+    for collection in manifest['collections'].values():
+        for relative_path in collection['files']:
+            yield from iter_chunk(archive_dir, relative_path, db)
+
+
+def restore_snapshot(db, archive_dir, batch_size=BATCH_SIZE, max_workers=MAX_WORKERS):
+    """
+    Restores every document in an archive to its original path with batched
+    writes, one chunk per worker. Memory is bounded by workers x batch_size
+    documents regardless of archive size. Returns the number of documents written.
+    """
+    manifest = read_manifest(archive_dir)
+
+    def restore_chunk(relative_path):
+        written = 0
+        batch = db.batch()
+        pending = 0
+        for path, data in iter_chunk(archive_dir, relative_path, db):
+            batch.set(db.document(path), data)
+            pending += 1
+            if pending >= batch_size:
+                batch.commit()
+                written += pending
+                batch = db.batch()
+                pending = 0
+        if pending:
+            batch.commit()
+            written += pending
+        return written
+
+    chunks = [f for collection in manifest['collections'].values() for f in collection['files']]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return sum(executor.map(restore_chunk, chunks))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Snapshot or restore the Raceday Ready Firestore data.')
+    parser.add_argument('command', choices=['create', 'restore'])
+    parser.add_argument('archive', help='Snapshot directory.')
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS)
+    args = parser.parse_args()
+
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+    firebase_admin.initialize_app(credentials.Certificate('serviceAccountKey.json'))
+    db = firestore.client()
+
+    if args.command == 'create':
+        manifest = create_snapshot(db, args.archive, max_workers=args.workers)
+        print(f"✅ Snapshot of {manifest['document_count']} document(s) written to {args.archive}.")
+    else:
+        written = restore_snapshot(db, args.archive, max_workers=args.workers)
+        print(f"✅ Restored {written} document(s) from {args.archive}.")
+
+
+if __name__ == '__main__':
+    main()
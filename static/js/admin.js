@@ -2,6 +2,10 @@ import * as elements from './elements.js';
 import { showMessage, showConfirmationModal } from './ui.js';
 import { App } from './main.js';
 import { MOCK_USERS, MOCK_TRACKS } from './mock-data.js';
+import { mutate, clearCache } from './utils.js';
+
+// Cached responses that include a limit or deletion setting.
+const SETTINGS_CACHE_KEYS = ['/get-garages/', '/get-vehicles/', '/get-lap-times/'];
 
 const loadAdminSettings = () => {
     console.log("[INFO] Loading admin settings...");
@@ -24,11 +28,11 @@ const loadAdminSettings = () => {
 };
 
 const updateSettings = (url, payload) => {
-    fetch(url, {
+    mutate(url, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify(payload)
-    })
+    }, SETTINGS_CACHE_KEYS)
     .then(res => res.json())
     .then(data => showMessage(data.message, data.success))
     .catch(error => {
@@ -91,7 +95,7 @@ export const initAdmin = () => {
                 .then(data => {
                     showMessage(data.message, data.success);
                     if (data.success) {
-                        window.location.reload();
+                        clearCache().then(() => window.location.reload());
                     }
                 })
                 .catch(error => {
@@ -108,7 +112,7 @@ export const initAdmin = () => {
 
     elements.clearAllDataBtn.addEventListener('click', () => {
         showConfirmationModal(
-            "DANGER: Are you absolutely sure you want to clear all data? This will permanently delete all user-generated content from the database. This action cannot be undone.",
+            "DANGER: Are you absolutely sure you want to clear all data? This will delete all user-generated content from the database. A snapshot is saved to the server's snapshots folder first and can be restored with snapshot.py.",
             () => {
                 elements.clearAllDataBtn.disabled = true;
                 elements.clearAllDataBtn.textContent = 'Clearing...';
@@ -119,7 +123,7 @@ export const initAdmin = () => {
                 .then(data => {
                     showMessage(data.message, data.success);
                     if (data.success) {
-                        window.location.reload();
+                        clearCache().then(() => window.location.reload());
                     }
                 })
                 .catch(error => {
@@ -1,9 +1,18 @@
 import * as elements from './elements.js';
 import { showMessage, showConfirmationModal } from './ui.js';
 import { App } from './main.js';
+import { buildPatch, cachedFetch, mutate } from './utils.js';
 
 let currentChecklists = [];
 let checklistToEdit = null;
+let originalChecklist = null;
+
+// Cached responses that include checklist data (events list their checklists).
+const checklistCacheKeys = () => [
+    `/get-checklists/${App.currentUser.id}`,
+    `/get-events/${App.currentUser.id}`,
+    `/raceday-bundle/${App.currentUser.id}`
+];
 
 const renderChecklists = () => {
     elements.checklistList.innerHTML = '';
@@ -41,17 +50,14 @@ const renderChecklists = () => {
 
 const loadChecklists = () => {
     if (!App.currentUser) return;
-    fetch(`/get-checklists/${App.currentUser.id}`)
-        .then(res => res.json())
-        .then(data => {
-            if (data.success) {
-                currentChecklists = data.checklists;
-                renderChecklists();
-            } else {
-                showMessage('Could not load checklists.', false);
-            }
-        })
-        .catch(error => console.error('[ERROR] Error loading checklists:', error));
+    cachedFetch(`/get-checklists/${App.currentUser.id}`, (data) => {
+        if (data.success) {
+            currentChecklists = data.checklists;
+            renderChecklists();
+        } else {
+            showMessage('Could not load checklists.', false);
+        }
+    }).catch(error => console.error('[ERROR] Error loading checklists:', error));
 };
 
 const renderTaskItems = (container, tasks) => {
@@ -69,6 +75,7 @@ const renderTaskItems = (container, tasks) => {
 
 const showEditChecklistModal = (checklist) => {
     checklistToEdit = checklist;
+    originalChecklist = JSON.parse(JSON.stringify(checklist));
     console.log("[INFO] Showing edit checklist modal for:", checklist.name);
     elements.editChecklistTitle.textContent = `Edit "${checklist.name}"`;
     elements.editChecklistNameInput.value = checklist.name;
@@ -89,11 +96,11 @@ export const initChecklists = () => {
             return;
         }
 
-        fetch(`/add-checklist/${App.currentUser.id}`, {
+        mutate(`/add-checklist/${App.currentUser.id}`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ name }),
-        })
+        }, checklistCacheKeys())
         .then(res => res.json())
         .then(data => {
             showMessage(data.message, data.success);
@@ -117,7 +124,7 @@ export const initChecklists = () => {
 
         if (button.classList.contains('delete-checklist-btn')) {
             showConfirmationModal(`Are you sure you want to delete the checklist "${checklist.name}"?`, () => {
-                fetch(`/delete-checklist/${App.currentUser.id}/${checklistId}`, { method: 'DELETE' })
+                mutate(`/delete-checklist/${App.currentUser.id}/${checklistId}`, { method: 'DELETE' }, checklistCacheKeys())
                     .then(res => res.json())
                     .then(data => {
                         showMessage(data.message, data.success);
@@ -143,11 +150,17 @@ export const initChecklists = () => {
             post_race_tasks: Array.from(elements.editPostRaceTasks.querySelectorAll('span')).map(span => span.textContent),
         };
 
-        fetch(`/update-checklist/${App.currentUser.id}/${checklistToEdit.id}`, {
-            method: 'PUT',
+        const patch = buildPatch(originalChecklist, updatedChecklist, [], ['pre_race_tasks', 'mid_day_tasks', 'post_race_tasks']);
+        if (Object.keys(patch).length === 0) {
+            elements.editChecklistModal.classList.add('hidden');
+            return;
+        }
+
+        mutate(`/update-checklist/${App.currentUser.id}/${checklistToEdit.id}`, {
+            method: 'PATCH',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify(updatedChecklist),
-        })
+            body: JSON.stringify(patch),
+        }, checklistCacheKeys())
         .then(res => res.json())
         .then(data => {
             showMessage(data.message, data.success);
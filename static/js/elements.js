@@ -1,6 +1,6 @@
 // --- Element Selection ---
 // Declare all element variables. They will be assigned in initElements.
-export let readyButton, messageBox, devModeBtn, backToAppBtn, mainView, developerView, featuresView, featuresHelmetDisplay, featuresUsername, profileHeaderBtn, themeSwitcherBtn, garageHeaderBtn, lapTimeHeaderBtn, raceDayPrepView, backToFeaturesBtn, featureCard1, featureCard2, featureCard6, featureCard7, featureCard8, featureCard9, upcomingFeaturesView, backToFeaturesFromUpcomingBtn, featureRequestForm, featureRequestTextarea, submitFeatureRequestBtn, charCounter, featureRequestList, raceScheduleView, raceScheduleCard, addEventForm, eventNameInput, eventStartInput, eventEndInput, eventVehiclesContainer, eventChecklistsSelect, eventTrackSelect, isRacedayCheckbox, addEventBtn, eventList, backToPrepFromScheduleBtn, editEventModal, editEventForm, editEventNameInput, editEventStartInput, editEventEndInput, editEventVehiclesContainer, editEventChecklistsSelect, editEventTrackSelect, editIsRacedayCheckbox, cancelEditEventBtn, saveEventBtn, racedayCountdownContainer, racedayCountdownCircle, racedayCountdownDays, noRacedayIcon, racedayCountdownLabel, addRacedayLink, checklistManagementView, checklistTemplatesCard, addChecklistForm, checklistNameInput, addChecklistBtn, checklistList, backToPrepFromChecklistsBtn, editChecklistModal, editChecklistForm, editChecklistTitle, editChecklistNameInput, editPreRaceTasks, addPreRaceTaskInput, editMidDayTasks, addMidDayTaskInput, editPostRaceTasks, addPostRaceTaskInput, cancelEditChecklistBtn, saveChecklistBtn, garageManagementView, addGarageForm, garageNameInput, addGarageBtn, garageList, sharedGarageList, backToFeaturesFromGarageBtn, vehicleManagementView, addVehicleForm, addVehicleFieldset, noGaragesWarning, goToGarageLink, vehicleYearSearch, vehicleYearSelect, vehicleMakeSearch, vehicleMakeSelect, vehicleModelSearch, vehicleModelSelect, vehicleGarageSelect, vehiclePhotoInput, vehiclePhotoUrlInput, vehiclePhotoPreview, addVehicleBtn, vehicleList, backToFeaturesFromVehicleBtn, vehicleSortBtn, manageGaragesLinkBtn, manualVehicleEntryCheckbox, apiVehicleInputs, manualVehicleInputs, manualVehicleYear, manualVehicleMake, manualVehicleModel, editVehicleModal, editVehicleForm, editVehicleYearSearch, editVehicleYearSelect, editVehicleMakeSearch, editVehicleMakeSelect, editVehicleModelSearch, editVehicleModelSelect, editVehicleGarageSelect, editVehiclePhotoInput, editVehiclePhotoUrlInput, editVehiclePhotoPreview, cancelEditVehicleBtn, saveVehicleBtn, editManualVehicleEntryCheckbox, editApiVehicleInputs, editManualVehicleInputs, editManualVehicleYear, editManualVehicleMake, editManualVehicleModel, profileModal, profileForm, usernameInput, helmetColorInput, themeSelect, enablePinCheckbox, pinInput, saveProfileBtn, cancelCreateBtn, selectProfileModal, profileList, addNewProfileBtn, confirmationModal, confirmationModalTitle, confirmationModalText, confirmationModalCancelBtn, confirmationModalConfirmBtn, pinEntryModal, pinEntryText, pinEntryForm, pinEntryInput, cancelPinEntryBtn, devPinEntryModal, devPinEntryForm, devPinEntryInput, cancelDevPinBtn, pinSettingsModal, pinSettingsHeading, pinSettingsForm, editEnablePinCheckbox, editPinInput, cancelPinSettingsBtn, savePinSettingsBtn, profileLimitInput, updateProfileLimitBtn, garageLimitInput, vehicleLimitInput, updateGarageVehicleLimitsBtn, featureRequestLimitInput, enableDeletionCheckbox, updateFeatureSettingsBtn, manageFeatureRequestsLink, enableLapTimeDeletionCheckbox, updateLapTimeSettingsBtn, goToWinnersCircleLink, maintenanceModeCheckbox, updateAppSettingsBtn, seedDatabaseBtn, clearAllDataBtn, viewUseCasesLink, useCasesContainer, enableGarageDeletionCheckbox, updateGarageSettingsBtn, lapTimeView, lapTimeForm, lapTimeEventSelect, lapTimeInput, submitLapTimeBtn, winnerCircleHeading, lapTimeList, backToFeaturesFromLapsBtn, trackManagementView, addTrackForm, trackNameInput, trackLocationInput, trackTypeSelect, trackGoogleUrlInput, trackPhotoInput, trackPhotoUrlInput, trackPhotoPreview, trackLayoutPhotoInput, trackLayoutPhotoUrlInput, trackLayoutPhotoPreview, addTrackBtn, trackList, backToFeaturesFromTrackBtn, editTrackModal, editTrackForm, editTrackNameInput, editTrackLocationInput, editTrackTypeSelect, editTrackGoogleUrlInput, editTrackPhotoInput, editTrackPhotoUrlInput, editTrackPhotoPreview, editTrackLayoutPhotoInput, editTrackLayoutPhotoUrlInput, editTrackLayoutPhotoPreview, cancelEditTrackBtn, saveTrackBtn, shareGarageModal, shareGarageForm, garageDoorCodeInput, cancelShareGarageBtn, saveShareGarageBtn, unlockGarageModal, unlockGarageForm, unlockGarageCodeInput, cancelUnlockGarageBtn, submitUnlockGarageBtn;
+export let readyButton, messageBox, devModeBtn, backToAppBtn, mainView, developerView, featuresView, featuresHelmetDisplay, featuresUsername, profileHeaderBtn, themeSwitcherBtn, garageHeaderBtn, lapTimeHeaderBtn, raceDayPrepView, racedayBundleContainer, backToFeaturesBtn, featureCard1, featureCard2, featureCard6, featureCard7, featureCard8, featureCard9, upcomingFeaturesView, backToFeaturesFromUpcomingBtn, featureRequestForm, featureRequestTextarea, submitFeatureRequestBtn, charCounter, featureRequestList, raceScheduleView, raceScheduleCard, addEventForm, eventNameInput, eventStartInput, eventEndInput, eventVehiclesContainer, eventChecklistsSelect, eventTrackSelect, isRacedayCheckbox, addEventBtn, eventList, backToPrepFromScheduleBtn, editEventModal, editEventForm, editEventNameInput, editEventStartInput, editEventEndInput, editEventVehiclesContainer, editEventChecklistsSelect, editEventTrackSelect, editIsRacedayCheckbox, cancelEditEventBtn, saveEventBtn, racedayCountdownContainer, racedayCountdownCircle, racedayCountdownDays, noRacedayIcon, racedayCountdownLabel, addRacedayLink, checklistManagementView, checklistTemplatesCard, addChecklistForm, checklistNameInput, addChecklistBtn, checklistList, backToPrepFromChecklistsBtn, editChecklistModal, editChecklistForm, editChecklistTitle, editChecklistNameInput, editPreRaceTasks, addPreRaceTaskInput, editMidDayTasks, addMidDayTaskInput, editPostRaceTasks, addPostRaceTaskInput, cancelEditChecklistBtn, saveChecklistBtn, garageManagementView, addGarageForm, garageNameInput, addGarageBtn, garageList, sharedGarageList, backToFeaturesFromGarageBtn, vehicleManagementView, addVehicleForm, addVehicleFieldset, noGaragesWarning, goToGarageLink, vehicleYearSearch, vehicleYearSelect, vehicleMakeSearch, vehicleMakeSelect, vehicleModelSearch, vehicleModelSelect, vehicleGarageSelect, vehiclePhotoInput, vehiclePhotoUrlInput, vehiclePhotoPreview, addVehicleBtn, vehicleList, backToFeaturesFromVehicleBtn, vehicleSortBtn, manageGaragesLinkBtn, manualVehicleEntryCheckbox, apiVehicleInputs, manualVehicleInputs, manualVehicleYear, manualVehicleMake, manualVehicleModel, editVehicleModal, editVehicleForm, editVehicleYearSearch, editVehicleYearSelect, editVehicleMakeSearch, editVehicleMakeSelect, editVehicleModelSearch, editVehicleModelSelect, editVehicleGarageSelect, editVehiclePhotoInput, editVehiclePhotoUrlInput, editVehiclePhotoPreview, cancelEditVehicleBtn, saveVehicleBtn, editManualVehicleEntryCheckbox, editApiVehicleInputs, editManualVehicleInputs, editManualVehicleYear, editManualVehicleMake, editManualVehicleModel, profileModal, profileForm, usernameInput, helmetColorInput, themeSelect, enablePinCheckbox, pinInput, saveProfileBtn, cancelCreateBtn, selectProfileModal, profileList, addNewProfileBtn, confirmationModal, confirmationModalTitle, confirmationModalText, confirmationModalCancelBtn, confirmationModalConfirmBtn, pinEntryModal, pinEntryText, pinEntryForm, pinEntryInput, cancelPinEntryBtn, devPinEntryModal, devPinEntryForm, devPinEntryInput, cancelDevPinBtn, pinSettingsModal, pinSettingsHeading, pinSettingsForm, editEnablePinCheckbox, editPinInput, cancelPinSettingsBtn, savePinSettingsBtn, profileLimitInput, updateProfileLimitBtn, garageLimitInput, vehicleLimitInput, updateGarageVehicleLimitsBtn, featureRequestLimitInput, enableDeletionCheckbox, updateFeatureSettingsBtn, manageFeatureRequestsLink, enableLapTimeDeletionCheckbox, updateLapTimeSettingsBtn, goToWinnersCircleLink, maintenanceModeCheckbox, updateAppSettingsBtn, seedDatabaseBtn, clearAllDataBtn, viewUseCasesLink, useCasesContainer, enableGarageDeletionCheckbox, updateGarageSettingsBtn, lapTimeView, lapTimeForm, lapTimeEventSelect, lapTimeInput, submitLapTimeBtn, winnerCircleHeading, lapTimeList, backToFeaturesFromLapsBtn, trackManagementView, addTrackForm, trackNameInput, trackLocationInput, trackTypeSelect, trackGoogleUrlInput, trackPhotoInput, trackPhotoUrlInput, trackPhotoPreview, trackLayoutPhotoInput, trackLayoutPhotoUrlInput, trackLayoutPhotoPreview, addTrackBtn, trackSearchInput, trackList, backToFeaturesFromTrackBtn, editTrackModal, editTrackForm, editTrackNameInput, editTrackLocationInput, editTrackTypeSelect, editTrackGoogleUrlInput, editTrackPhotoInput, editTrackPhotoUrlInput, editTrackPhotoPreview, editTrackLayoutPhotoInput, editTrackLayoutPhotoUrlInput, editTrackLayoutPhotoPreview, cancelEditTrackBtn, saveTrackBtn, shareGarageModal, shareGarageForm, garageDoorCodeInput, cancelShareGarageBtn, saveShareGarageBtn, unlockGarageModal, unlockGarageForm, unlockGarageCodeInput, cancelUnlockGarageBtn, submitUnlockGarageBtn;
 
 /**
  * Initializes all element variables after the DOM is fully loaded.
@@ -20,6 +20,7 @@ export const initElements = () => {
     garageHeaderBtn = document.getElementById('garage-header-btn');
     lapTimeHeaderBtn = document.getElementById('lap-time-header-btn');
     raceDayPrepView = document.getElementById('race-day-prep-view');
+    racedayBundleContainer = document.getElementById('raceday-bundle-container');
     backToFeaturesBtn = document.getElementById('back-to-features-btn');
     featureCard1 = document.getElementById('feature-card-1');
     featureCard2 = document.getElementById('feature-card-2');
@@ -210,6 +211,7 @@ export const initElements = () => {
     trackLayoutPhotoUrlInput = document.getElementById('track-layout-photo-url-input');
     trackLayoutPhotoPreview = document.getElementById('track-layout-photo-preview');
     addTrackBtn = document.getElementById('add-track-btn');
+    trackSearchInput = document.getElementById('track-search-input');
     trackList = document.getElementById('track-list');
     backToFeaturesFromTrackBtn = document.getElementById('back-to-features-from-track-btn');
     editTrackModal = document.getElementById('edit-track-modal');
@@ -1,8 +1,11 @@
 import * as elements from './elements.js';
 import { showMessage, showConfirmationModal } from './ui.js';
 import { App } from './main.js';
+import { cachedFetch, mutate } from './utils.js';
 
 let existingRequests = [];
+let nextCursor = null;
+let loadCount = 0; // Lets a late revalidation of the first page see that more pages were loaded since.
 
 const renderFeatureRequests = (requests, deletionEnabled) => {
     elements.featureRequestList.innerHTML = '';
@@ -30,24 +33,41 @@ const renderFeatureRequests = (requests, deletionEnabled) => {
         `;
         elements.featureRequestList.appendChild(requestEl);
     });
+
+    if (nextCursor) {
+        const loadMoreBtn = document.createElement('button');
+        loadMoreBtn.className = 'load-more-requests-btn w-full text-blue-500 hover:underline py-2';
+        loadMoreBtn.textContent = 'Load more requests';
+        elements.featureRequestList.appendChild(loadMoreBtn);
+    }
 };
 
-export const loadFeatureRequests = () => {
+// Loads the first page, or with append = true the page after the ones already shown.
+export const loadFeatureRequests = (append = false) => {
     if (!App.currentUser) return;
 
-    fetch('/get-feature-requests')
-        .then(res => res.json())
-        .then(data => {
-            if (data.success) {
-                existingRequests = data.requests;
-                renderFeatureRequests(data.requests, data.deletion_enabled);
-                elements.submitFeatureRequestBtn.disabled = data.limit_reached;
-                elements.submitFeatureRequestBtn.textContent = data.limit_reached ? 'Request Limit Reached' : 'Submit Request';
-            } else {
-                showMessage('Could not load feature requests.', false);
-            }
-        })
-        .catch(error => console.error('[ERROR] Error loading feature requests:', error));
+    const load = ++loadCount;
+    const showPage = (data) => {
+        if (!append && load !== loadCount) return;
+        if (data.success) {
+            existingRequests = append ? existingRequests.concat(data.requests) : data.requests;
+            nextCursor = data.nextCursor;
+            renderFeatureRequests(existingRequests, data.deletion_enabled);
+            elements.submitFeatureRequestBtn.disabled = data.limit_reached;
+            elements.submitFeatureRequestBtn.textContent = data.limit_reached ? 'Request Limit Reached' : 'Submit Request';
+        } else if (append) {
+            // The page we were reading from changed underneath us; start again.
+            loadFeatureRequests();
+        } else {
+            showMessage('Could not load feature requests.', false);
+        }
+    };
+
+    // Only the first page is cached; later pages depend on the cursor of the page before.
+    const request = append && nextCursor
+        ? fetch(`/get-feature-requests?cursor=${encodeURIComponent(nextCursor)}`).then(res => res.json()).then(showPage)
+        : cachedFetch('/get-feature-requests', showPage);
+    request.catch(error => console.error('[ERROR] Error loading feature requests:', error));
 };
 
 export const initFeatures = () => {
@@ -64,14 +84,14 @@ export const initFeatures = () => {
             return;
         }
 
-        fetch('/submit-feature-request', {
+        mutate('/submit-feature-request', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({
                 username: App.currentUser.username,
                 requestText: requestText,
             }),
-        })
+        }, ['/get-feature-requests'])
         .then(res => res.json())
         .then(data => {
             showMessage(data.message, data.success);
@@ -88,14 +108,18 @@ export const initFeatures = () => {
     });
 
     elements.featureRequestList.addEventListener('click', (e) => {
+        if (e.target.closest('.load-more-requests-btn')) {
+            loadFeatureRequests(true);
+            return;
+        }
         const button = e.target.closest('.delete-request-btn');
         if (button) {
             const requestId = button.dataset.id;
             const request = existingRequests.find(r => r.id === requestId);
             showConfirmationModal(`Are you sure you want to delete the request from ${request.username}?`, () => {
-                fetch(`/delete-feature-request/${requestId}`, {
+                mutate(`/delete-feature-request/${requestId}`, {
                     method: 'DELETE',
-                })
+                }, ['/get-feature-requests'])
                 .then(res => res.json())
                 .then(data => {
                     showMessage(data.message, data.success);
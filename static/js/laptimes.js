@@ -1,6 +1,7 @@
 import * as elements from './elements.js';
 import { showMessage, showConfirmationModal } from './ui.js';
 import { App } from './main.js';
+import { cachedFetch, mutate } from './utils.js';
 
 let allEvents = [];
 let currentLapTimes = [];
@@ -72,39 +73,42 @@ const loadLapTimesForEvent = (eventId) => {
     const selectedEvent = allEvents.find(e => e.id === eventId);
     elements.winnerCircleHeading.textContent = `Winner's Circle: ${selectedEvent.name}`;
 
-    fetch(`/get-lap-times/${eventId}`)
-        .then(res => res.json())
-        .then(data => {
-            if (data.success) {
-                currentLapTimes = data.lap_times;
-                lapTimeDeletionEnabled = data.deletion_enabled;
-                renderLapTimes();
-            } else {
-                showMessage('Could not load lap times.', false);
-            }
-        })
-        .catch(error => console.error('[ERROR] Error loading lap times:', error));
+    cachedFetch(`/get-lap-times/${eventId}`, (data) => {
+        // Ignore a revalidated response for an event that is no longer selected.
+        if (elements.lapTimeEventSelect.value !== eventId) return;
+        if (data.success) {
+            currentLapTimes = data.lap_times;
+            lapTimeDeletionEnabled = data.deletion_enabled;
+            renderLapTimes();
+        } else {
+            showMessage('Could not load lap times.', false);
+        }
+    }).catch(error => console.error('[ERROR] Error loading lap times:', error));
 };
 
-const loadAllEvents = async () => {
+const loadAllEvents = () => {
     if (!App.currentUser) return;
-    try {
-        const response = await fetch('/get-all-events');
-        const data = await response.json();
-        if (data.success) {
-            allEvents = data.events;
-            populateEventDropdown();
-
-            // FIX: Automatically load the first event's data if it exists
-            const racedayEvents = allEvents.filter(event => event.is_raceday);
-            if (racedayEvents.length > 0) {
-                elements.lapTimeEventSelect.value = racedayEvents[0].id;
-                loadLapTimesForEvent(racedayEvents[0].id);
-            }
+    let rendered = false;
+    cachedFetch('/get-all-events', (data) => {
+        if (!data.success) return;
+        const selected = elements.lapTimeEventSelect.value;
+        allEvents = data.events;
+        populateEventDropdown();
+
+        // A re-render after revalidation keeps the event already on screen.
+        if (rendered) {
+            elements.lapTimeEventSelect.value = selected;
+            return;
         }
-    } catch (error) {
-        console.error('[ERROR] Error fetching all events for lap times:', error);
-    }
+        rendered = true;
+
+        // FIX: Automatically load the first event's data if it exists
+        const racedayEvents = allEvents.filter(event => event.is_raceday);
+        if (racedayEvents.length > 0) {
+            elements.lapTimeEventSelect.value = racedayEvents[0].id;
+            loadLapTimesForEvent(racedayEvents[0].id);
+        }
+    }).catch(error => console.error('[ERROR] Error fetching all events for lap times:', error));
 };
 
 export const initLapTimes = () => {
@@ -124,7 +128,7 @@ export const initLapTimes = () => {
             return;
         }
 
-        fetch('/add-lap-time', {
+        mutate('/add-lap-time', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({
@@ -132,7 +136,7 @@ export const initLapTimes = () => {
                 lapTime,
                 username: App.currentUser.username
             }),
-        })
+        }, [`/get-lap-times/${eventId}`])
         .then(res => res.json())
         .then(data => {
             showMessage(data.message, data.success);
@@ -158,7 +162,7 @@ export const initLapTimes = () => {
         if (deleteBtn) {
             const lapId = deleteBtn.dataset.lapId;
             showConfirmationModal('Are you sure you want to delete this lap time?', () => {
-                fetch(`/delete-lap-time/${lapId}`, { method: 'DELETE' })
+                mutate(`/delete-lap-time/${lapId}`, { method: 'DELETE' }, [`/get-lap-times/${elements.lapTimeEventSelect.value}`])
                     .then(res => res.json())
                     .then(data => {
                         showMessage(data.message, data.success);
@@ -191,11 +195,11 @@ export const initLapTimes = () => {
             const timeRegex = /^\d{2}:\d{2}\.\d{3}$/;
 
             if (newLapTime && newLapTime !== lap.lapTime && timeRegex.test(newLapTime)) {
-                fetch(`/update-lap-time/${lapId}`, {
+                mutate(`/update-lap-time/${lapId}`, {
                     method: 'PUT',
                     headers: { 'Content-Type': 'application/json' },
                     body: JSON.stringify({ lapTime: newLapTime, username: App.currentUser.username }),
-                })
+                }, [`/get-lap-times/${elements.lapTimeEventSelect.value}`])
                 .then(res => res.json())
                 .then(data => {
                     showMessage(data.message, data.success);
@@ -11,16 +11,13 @@ import { initSchedule, updateRacedayCountdown } from './schedule.js';
 import { initChecklists } from './checklist.js';
 import { initLapTimes } from './laptimes.js';
 import { initTrack } from './track.js';
+import { initRaceday } from './raceday.js';
 
 // --- Global App Object ---
 export const App = {
     currentUser: null,
     isDevModeEnabled: false,
     dev_mode: false, // Toggle for using mock data
-    cache: {
-        tracks: null,
-        vehicles: null,
-    },
     unlockedGarages: [], // Initialize the array here
     setView: null,
     updateProfile: updateProfile,
@@ -31,6 +28,7 @@ export const App = {
     loadChecklists: null,
     loadLapTimes: null,
     loadTracks: null,
+    loadRacedayBundle: null,
 };
 
 // --- View Toggling Logic ---
@@ -71,6 +69,7 @@ const setView = (viewName) => {
         checkProfileStatus();
     } else if (viewName === 'raceDayPrep') {
         elements.raceDayPrepView.classList.remove('hidden');
+        if (App.loadRacedayBundle) App.loadRacedayBundle();
     } else if (viewName === 'upcomingFeatures') {
         elements.upcomingFeaturesView.classList.remove('hidden');
         loadFeatureRequests();
@@ -211,4 +210,5 @@ document.addEventListener('DOMContentLoaded', () => {
     initChecklists();
     initLapTimes();
     initTrack();
+    initRaceday();
 });
@@ -3,6 +3,7 @@ import { showMessage, createHelmetIcon, showConfirmationModal } from './ui.js';
 import { applyTheme } from './theme.js';
 import { App } from './main.js';
 import { updateRacedayCountdown } from './schedule.js';
+import { mutate, clearCache } from './utils.js';
 
 let currentProfileForPinSettings = null;
 
@@ -13,7 +14,7 @@ let currentProfileForPinSettings = null;
 const logRacedayEvents = async (profile) => {
     console.log(`[DEBUG] Checking for all Raceday events for user: ${profile.username}`);
     try {
-        const response = await fetch(`/get-events/${profile.id}`);
+        const response = await fetch(`/get-events/${profile.id}?summary=true`);
         const data = await response.json();
         if (data.success && data.events) {
             const racedayEvents = data.events.filter(event => event.is_raceday === true);
@@ -89,6 +90,7 @@ const executeDelete = (profileId) => {
     .then(data => {
         showMessage(data.message, data.success);
         if (data.success) {
+            clearCache();
             hidePinEntryModal();
             elements.devPinEntryModal.classList.add('hidden');
             checkProfiles();
@@ -208,11 +210,12 @@ const selectProfile = (profile) => {
 };
 
 export const updateProfile = (profileId, updates, refreshList = true) => {
-    fetch(`/update-profile/${profileId}`, {
+    // Usernames appear in lap time lists and shared garages.
+    mutate(`/update-profile/${profileId}`, {
         method: 'PUT',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify(updates),
-    })
+    }, ['/get-lap-times/', '/get-shared-garages/'])
     .then(response => response.json())
     .then(data => {
         if (refreshList) showMessage(data.message, data.success);
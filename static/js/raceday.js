@@ -0,0 +1,110 @@
+import * as elements from './elements.js';
+import { App } from './main.js';
+import { cachedFetch } from './utils.js';
+
+const PRECACHE_INTERVAL_MS = 10 * 60 * 1000;
+let lastPrecache = { url: null, at: 0 };
+
+const bundleUrl = (eventId) => `/raceday-bundle/${App.currentUser.id}/${eventId}`;
+
+/**
+ * Asks the service worker to keep the bundle for an upcoming race day, its
+ * images and the app shell available offline.
+ * @param {string} eventId - The ID of the next race day event.
+ */
+export const precacheRaceday = (eventId) => {
+    if (!App.currentUser || !('serviceWorker' in navigator)) return;
+    const url = bundleUrl(eventId);
+    // The countdown refreshes on every view change; the bundle only needs an occasional check.
+    if (lastPrecache.url === url && Date.now() - lastPrecache.at < PRECACHE_INTERVAL_MS) return;
+    lastPrecache = { url, at: Date.now() };
+    navigator.serviceWorker.ready.then(registration => {
+        if (registration.active) {
+            registration.active.postMessage({ type: 'precache-raceday', url });
+        }
+    });
+};
+
+const taskList = (title, tasks) => {
+    if (!tasks.length) return '';
+    return `
+        <div class="mt-2">
+            <p class="text-sm font-semibold text-text-secondary">${title}</p>
+            <ul class="list-disc list-inside">${tasks.map(task => `<li>${task}</li>`).join('')}</ul>
+        </div>
+    `;
+};
+
+const renderBundle = (bundle) => {
+    const container = elements.racedayBundleContainer;
+    const { event, track, vehicles, checklists } = bundle;
+    const startTime = new Date(event.start_time).toLocaleString();
+
+    const trackHtml = track ? `
+        <div class="flex items-center mt-4">
+            ${track.image ? `<img src="${track.image}" alt="${track.name}" class="w-16 h-16 object-cover rounded-lg mr-4">` : ''}
+            <div>
+                <p class="font-bold">${track.name}</p>
+                <p class="text-sm text-text-secondary">${track.location} &middot; ${track.type}</p>
+                ${track.google_url ? `<a href="${track.google_url}" target="_blank" class="text-blue-500 hover:underline text-sm">Directions</a>` : ''}
+            </div>
+        </div>
+        ${track.layoutImage ? `<img src="${track.layoutImage}" alt="${track.name} layout" class="mt-4 rounded-lg max-h-48 w-auto">` : ''}
+    ` : '<p class="mt-4 text-text-secondary">No track selected.</p>';
+
+    const vehiclesHtml = vehicles.length ? vehicles.map(vehicle => `
+        <div class="flex items-center mt-2">
+            <img src="${vehicle.image || '/static/images/default-vehicle.svg'}" alt="${vehicle.make} ${vehicle.model}" class="w-12 h-12 object-cover rounded-lg mr-4" onerror="this.onerror=null;this.src='/static/images/default-vehicle.svg';">
+            <span>${vehicle.year} ${vehicle.make} ${vehicle.model}</span>
+        </div>
+    `).join('') : '<p class="text-text-secondary">No vehicles assigned.</p>';
+
+    const checklistsHtml = checklists.length ? checklists.map(checklist => `
+        <div class="bg-card-darker p-4 rounded-lg mt-2">
+            <h4 class="font-bold">${checklist.name}</h4>
+            ${taskList('Pre-Race', checklist.pre_race_tasks)}
+            ${taskList('Mid-Day', checklist.mid_day_tasks)}
+            ${taskList('Post-Race', checklist.post_race_tasks)}
+        </div>
+    `).join('') : '<p class="text-text-secondary">No checklists assigned.</p>';
+
+    container.innerHTML = `
+        <h2 class="text-2xl font-bold">Next Race Day: ${event.name}</h2>
+        <p class="text-text-secondary">${startTime}</p>
+        ${trackHtml}
+        <div class="grid grid-cols-1 md:grid-cols-2 gap-6 mt-6">
+            <div><h3 class="text-xl font-bold mb-2">Vehicles</h3>${vehiclesHtml}</div>
+            <div><h3 class="text-xl font-bold mb-2">Checklists</h3>${checklistsHtml}</div>
+        </div>
+    `;
+    container.classList.remove('hidden');
+};
+
+/**
+ * Shows the next race day's bundle at the top of the race day prep view.
+ * Cached copies render immediately, so this also works offline.
+ */
+const loadRacedayBundle = () => {
+    if (!App.currentUser) return;
+    const container = elements.racedayBundleContainer;
+    cachedFetch(`/get-next-raceday/${App.currentUser.id}`, (data) => {
+        if (!data.success || !data.event) {
+            container.classList.add('hidden');
+            return;
+        }
+        cachedFetch(bundleUrl(data.event.id), (bundleData) => {
+            if (bundleData.success) renderBundle(bundleData.bundle);
+        }).catch(error => console.error('[ERROR] Error loading race day bundle:', error));
+    }).catch(error => {
+        console.error('[ERROR] Error fetching next raceday:', error);
+        container.classList.add('hidden');
+    });
+};
+
+export const initRaceday = () => {
+    if ('serviceWorker' in navigator) {
+        navigator.serviceWorker.register('/sw.js')
+            .catch(error => console.error('[ERROR] Service worker registration failed:', error));
+    }
+    App.loadRacedayBundle = loadRacedayBundle;
+};
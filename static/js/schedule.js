@@ -2,10 +2,20 @@ import * as elements from './elements.js';
 import { showMessage, showConfirmationModal, createVehicleIcon } from './ui.js';
 import { App } from './main.js';
 import { showEditVehicleModal } from './vehicle.js';
+import { buildPatch, cachedFetch, mutate } from './utils.js';
+import { precacheRaceday } from './raceday.js';
 
 let currentEvents = [];
 let eventToEdit = null;
 
+// Cached responses that include event data.
+const eventCacheKeys = () => [
+    `/get-events/${App.currentUser.id}`,
+    `/get-next-raceday/${App.currentUser.id}`,
+    '/get-all-events',
+    `/raceday-bundle/${App.currentUser.id}`
+];
+
 /**
  * Fetches the next race day and updates the countdown display in the header.
  */
@@ -24,39 +34,39 @@ export const updateRacedayCountdown = () => {
         elements.racedayCountdownLabel.classList.remove('hidden'); // Shows the text
     };
 
-    fetch(`/get-next-raceday/${App.currentUser.id}`)
-        .then(res => res.json())
-        .then(data => {
-            if (data.success && data.event) {
-                const now = new Date();
-                const eventDate = new Date(data.event.start_time);
-                const diffTime = eventDate - now;
-
-                if (diffTime > 0) {
-                    const diffDays = Math.ceil(diffTime / (1000 * 60 * 60 * 24));
-                    elements.racedayCountdownDays.textContent = diffDays;
-                    elements.racedayCountdownLabel.textContent = "Days Until Raceday:";
-                    elements.racedayCountdownCircle.classList.remove('hidden');
-                    elements.noRacedayIcon.classList.add('hidden');
-                    elements.racedayCountdownLabel.classList.remove('hidden');
-                } else {
-                    showNoRacedayState();
-                }
+    cachedFetch(`/get-next-raceday/${App.currentUser.id}`, (data) => {
+        if (data.success && data.event) {
+            const now = new Date();
+            const eventDate = new Date(data.event.start_time);
+            const diffTime = eventDate - now;
+
+            if (diffTime > 0) {
+                const diffDays = Math.ceil(diffTime / (1000 * 60 * 60 * 24));
+                elements.racedayCountdownDays.textContent = diffDays;
+                elements.racedayCountdownLabel.textContent = "Days Until Raceday:";
+                elements.racedayCountdownCircle.classList.remove('hidden');
+                elements.noRacedayIcon.classList.add('hidden');
+                elements.racedayCountdownLabel.classList.remove('hidden');
+                precacheRaceday(data.event.id);
             } else {
                 showNoRacedayState();
             }
-        })
-        .catch(error => {
-            console.error('[ERROR] Error fetching next raceday:', error);
+        } else {
             showNoRacedayState();
-        });
+        }
+    }).catch(error => {
+        console.error('[ERROR] Error fetching next raceday:', error);
+        showNoRacedayState();
+    });
 };
 
 
-const populateVehicleSelector = async (container, selectedVehicleIds = []) => {
-    try {
-        const response = await fetch(`/get-vehicles-for-event-form/${App.currentUser.id}`);
-        const data = await response.json();
+const populateVehicleSelector = (container, selectedVehicleIds = []) => {
+    let rendered = false;
+    return cachedFetch(`/get-vehicles-for-event-form/${App.currentUser.id}`, (data) => {
+        // A re-render after revalidation keeps what was picked in the meantime.
+        const picked = rendered ? [...container.querySelectorAll('.selected')].map(el => el.dataset.vehicleId) : selectedVehicleIds;
+        rendered = true;
         container.innerHTML = '';
         if (data.success && data.vehicles.length > 0) {
             data.vehicles.forEach(vehicle => {
@@ -64,7 +74,7 @@ const populateVehicleSelector = async (container, selectedVehicleIds = []) => {
                 vehicleEl.className = 'vehicle-selector-item';
                 vehicleEl.dataset.vehicleId = vehicle.id;
 
-                const isSelected = selectedVehicleIds.includes(vehicle.id);
+                const isSelected = picked.includes(vehicle.id);
                 if (isSelected) {
                     vehicleEl.classList.add('selected');
                 }
@@ -87,22 +97,22 @@ const populateVehicleSelector = async (container, selectedVehicleIds = []) => {
         } else {
             container.innerHTML = '<p class="text-text-secondary text-sm col-span-full">No vehicles available. Please add one in Vehicle Management.</p>';
         }
-    } catch (error) {
-        console.error("[ERROR] Error fetching vehicles for event form:", error);
-    }
+    }).catch(error => console.error("[ERROR] Error fetching vehicles for event form:", error));
 };
 
-const populateChecklistMultiSelect = async (selectElement, selectedChecklistIds = []) => {
-    try {
-        const response = await fetch(`/get-checklists/${App.currentUser.id}`);
-        const data = await response.json();
+const populateChecklistMultiSelect = (selectElement, selectedChecklistIds = []) => {
+    let rendered = false;
+    return cachedFetch(`/get-checklists/${App.currentUser.id}`, (data) => {
+        // A re-render after revalidation keeps what was picked in the meantime.
+        const picked = rendered ? [...selectElement.selectedOptions].map(option => option.value) : selectedChecklistIds;
+        rendered = true;
         selectElement.innerHTML = '';
         if (data.success && data.checklists.length > 0) {
             data.checklists.forEach(checklist => {
                 const option = document.createElement('option');
                 option.value = checklist.id;
                 option.textContent = checklist.name;
-                if (selectedChecklistIds.includes(checklist.id)) {
+                if (picked.includes(checklist.id)) {
                     option.selected = true;
                 }
                 selectElement.appendChild(option);
@@ -110,22 +120,22 @@ const populateChecklistMultiSelect = async (selectElement, selectedChecklistIds
         } else {
             selectElement.innerHTML = '<option disabled>No checklists available</option>';
         }
-    } catch (error) {
-        console.error("[ERROR] Error fetching checklists for event form:", error);
-    }
+    }).catch(error => console.error("[ERROR] Error fetching checklists for event form:", error));
 };
 
-const populateTrackDropdown = async (selectElement, selectedTrackId = null) => {
-    try {
-        const response = await fetch('/get-all-tracks');
-        const data = await response.json();
+const populateTrackDropdown = (selectElement, selectedTrackId = null) => {
+    let rendered = false;
+    return cachedFetch('/get-all-tracks', (data) => {
+        // A re-render after revalidation keeps what was picked in the meantime.
+        const picked = rendered ? selectElement.value : selectedTrackId;
+        rendered = true;
         selectElement.innerHTML = '<option value="">Select a Track</option>';
         if (data.success && data.tracks.length > 0) {
             data.tracks.forEach(track => {
                 const option = document.createElement('option');
                 option.value = track.id;
                 option.textContent = track.name;
-                if (selectedTrackId && track.id === selectedTrackId) {
+                if (picked && track.id === picked) {
                     option.selected = true;
                 }
                 selectElement.appendChild(option);
@@ -133,9 +143,7 @@ const populateTrackDropdown = async (selectElement, selectedTrackId = null) => {
         } else {
             selectElement.innerHTML = '<option disabled>No tracks available</option>';
         }
-    } catch (error) {
-        console.error("[ERROR] Error fetching tracks for event form:", error);
-    }
+    }).catch(error => console.error("[ERROR] Error fetching tracks for event form:", error));
 };
 
 const showEditEventModal = (event) => {
@@ -224,21 +232,29 @@ const renderEvents = () => {
     });
 };
 
+/**
+ * Warns the user when a saved event overlaps another event using the same vehicle or driver.
+ * @param {Array<object>} conflicts - The conflicts returned by the add/update event routes.
+ */
+const warnAboutConflicts = (conflicts) => {
+    if (!conflicts || conflicts.length === 0) return;
+    const names = conflicts.map(conflict => `"${conflict.name}"`).join(', ');
+    console.warn('[WARN] Event overlaps other events:', conflicts);
+    showMessage(`Heads up: this event overlaps ${names}.`, false);
+};
+
 const loadEvents = () => {
     if (!App.currentUser || !App.currentUser.id) return;
     populateVehicleSelector(elements.eventVehiclesContainer);
     populateChecklistMultiSelect(elements.eventChecklistsSelect);
     populateTrackDropdown(elements.eventTrackSelect);
 
-    fetch(`/get-events/${App.currentUser.id}`)
-        .then(res => res.json())
-        .then(data => {
-            if (data.success) {
-                currentEvents = data.events;
-                renderEvents();
-            }
-        })
-        .catch(error => console.error('[ERROR] Error loading events:', error));
+    cachedFetch(`/get-events/${App.currentUser.id}`, (data) => {
+        if (data.success) {
+            currentEvents = data.events;
+            renderEvents();
+        }
+    }).catch(error => console.error('[ERROR] Error loading events:', error));
 };
 
 export const initSchedule = () => {
@@ -270,15 +286,16 @@ export const initSchedule = () => {
             isRaceday: elements.isRacedayCheckbox.checked,
         };
 
-        fetch(`/add-event/${App.currentUser.id}`, {
+        mutate(`/add-event/${App.currentUser.id}`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify(eventData),
-        })
+        }, eventCacheKeys())
         .then(res => res.json())
         .then(data => {
             showMessage(data.message, data.success);
             if (data.success) {
+                warnAboutConflicts(data.conflicts);
                 elements.addEventForm.reset();
                 loadEvents();
                 updateRacedayCountdown();
@@ -318,15 +335,31 @@ export const initSchedule = () => {
             isRaceday: elements.editIsRacedayCheckbox.checked,
         };
 
-        fetch(`/update-event/${App.currentUser.id}/${eventToEdit.id}`, {
-            method: 'PUT',
+        const originalEvent = {
+            name: eventToEdit.name,
+            startTime: eventToEdit.start_time,
+            endTime: eventToEdit.end_time || null,
+            vehicles: (eventToEdit.vehicles || []).map(v => v.id),
+            checklists: eventToEdit.checklists || [],
+            trackId: eventToEdit.trackId,
+            isRaceday: eventToEdit.is_raceday,
+        };
+        const patch = buildPatch(originalEvent, eventData, ['vehicles', 'checklists']);
+        if (Object.keys(patch).length === 0) {
+            elements.editEventModal.classList.add('hidden');
+            return;
+        }
+
+        mutate(`/update-event/${App.currentUser.id}/${eventToEdit.id}`, {
+            method: 'PATCH',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify(eventData),
-        })
+            body: JSON.stringify(patch),
+        }, eventCacheKeys())
         .then(res => res.json())
         .then(data => {
             showMessage(data.message, data.success);
             if (data.success) {
+                warnAboutConflicts(data.conflicts);
                 elements.editEventModal.classList.add('hidden');
                 loadEvents();
                 updateRacedayCountdown();
@@ -348,7 +381,7 @@ export const initSchedule = () => {
 
             if (button.classList.contains('delete-event-btn')) {
                 showConfirmationModal(`Are you sure you want to delete the event "${event.name}"?`, () => {
-                    fetch(`/delete-event/${App.currentUser.id}/${eventId}`, { method: 'DELETE' })
+                    mutate(`/delete-event/${App.currentUser.id}/${eventId}`, { method: 'DELETE' }, eventCacheKeys())
                         .then(res => res.json())
                         .then(data => {
                             showMessage(data.message, data.success);
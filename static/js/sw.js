@@ -0,0 +1,146 @@
+// Service worker, served from /sw.js so it controls the whole app.
+// It keeps the app shell and the next race day's bundle (see /raceday-bundle in
+// app.py) in Cache Storage, so the race day prep view opens without a network.
+
+const SHELL_CACHE = 'pit-crew-shell-v2';
+const BUNDLE_CACHE = 'pit-crew-raceday-v1';
+
+const SHELL_URLS = [
+    '/',
+    '/static/style.css',
+    '/static/images/default-vehicle.svg',
+    '/static/images/waving-flag.gif',
+    '/static/fx/racecar.mp3',
+    '/static/js/main.js',
+    '/static/js/elements.js',
+    '/static/js/ui.js',
+    '/static/js/utils.js',
+    '/static/js/theme.js',
+    '/static/js/profile.js',
+    '/static/js/features.js',
+    '/static/js/admin.js',
+    '/static/js/garage.js',
+    '/static/js/vehicle.js',
+    '/static/js/schedule.js',
+    '/static/js/raceday.js',
+    '/static/js/checklist.js',
+    '/static/js/laptimes.js',
+    '/static/js/track.js',
+    '/static/js/mock-data.js',
+];
+
+// Third-party scripts the page loads from CDNs; stored as opaque responses.
+const CDN_URLS = [
+    'https://cdn.tailwindcss.com',
+    'https://cdn.jsdelivr.net/npm/sortablejs@latest/Sortable.min.js',
+];
+
+// --- Lifecycle ---
+self.addEventListener('install', (event) => {
+    event.waitUntil(
+        caches.open(SHELL_CACHE).then(cache => Promise.all([
+            cache.addAll(SHELL_URLS),
+            ...CDN_URLS.map(url => fetch(url, { mode: 'no-cors' })
+                .then(response => cache.put(url, response))
+                .catch(() => {})),
+        ])).then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', (event) => {
+    const current = [SHELL_CACHE, BUNDLE_CACHE];
+    event.waitUntil(
+        caches.keys()
+            .then(names => Promise.all(names.filter(name => !current.includes(name)).map(name => caches.delete(name))))
+            .then(() => self.clients.claim())
+    );
+});
+
+// --- Race Day Precache ---
+/**
+ * Stores a race day bundle and every image it references, replacing whatever
+ * bundle was cached before. Bundles are versioned, so an unchanged one is skipped.
+ * @param {string} url - The /raceday-bundle/<profile_id>/<event_id> URL.
+ */
+const precacheRaceday = async (url) => {
+    const cache = await caches.open(BUNDLE_CACHE);
+    const response = await fetch(url, { cache: 'no-store' });
+    if (!response.ok) return;
+    const data = await response.clone().json();
+    const bundle = data.bundle;
+
+    const cached = await cache.match(url);
+    if (cached) {
+        const previous = await cached.json().catch(() => null);
+        if (previous && previous.bundle && previous.bundle.version === bundle.version) return;
+    }
+
+    const keep = new Set([new URL(url, self.location).href]);
+    await cache.put(url, response);
+    await Promise.all(bundle.images.map(imageUrl => {
+        const sameOrigin = new URL(imageUrl, self.location).origin === self.location.origin;
+        keep.add(new URL(imageUrl, self.location).href);
+        return fetch(imageUrl, sameOrigin ? {} : { mode: 'no-cors' })
+            .then(imageResponse => cache.put(imageUrl, imageResponse))
+            .catch(error => console.error('[ERROR] Could not precache race day image:', imageUrl, error));
+    }));
+
+    const requests = await cache.keys();
+    await Promise.all(requests.filter(request => !keep.has(request.url)).map(request => cache.delete(request)));
+};
+
+self.addEventListener('message', (event) => {
+    if (event.data && event.data.type === 'precache-raceday') {
+        event.waitUntil(precacheRaceday(event.data.url)
+            .catch(error => console.error('[ERROR] Could not precache race day bundle:', error)));
+    }
+});
+
+// --- Fetch Strategies ---
+const networkFirst = (request, cacheName) => fetch(request)
+    .then(response => {
+        if (response.ok || response.type === 'opaque') {
+            const copy = response.clone();
+            caches.open(cacheName).then(cache => cache.put(request, copy));
+        }
+        return response;
+    })
+    .catch(() => caches.match(request, { ignoreSearch: request.mode === 'navigate' })
+        .then(cached => cached || Response.error()));
+
+const staleWhileRevalidate = (request) => caches.open(SHELL_CACHE).then(cache => cache.match(request).then(cached => {
+    const network = fetch(request).then(response => {
+        if (response.ok || response.type === 'opaque') cache.put(request, response.clone());
+        return response;
+    });
+    if (cached) {
+        network.catch(() => {});
+        return cached;
+    }
+    return network;
+}));
+
+self.addEventListener('fetch', (event) => {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+    const url = new URL(request.url);
+
+    if (url.origin === self.location.origin && url.pathname.startsWith('/raceday-bundle/')) {
+        // Versioned images never change; the bundle itself prefers fresh data.
+        event.respondWith(url.pathname.includes('/images/')
+            ? caches.match(request).then(cached => cached || fetch(request))
+            : networkFirst(request, BUNDLE_CACHE));
+    } else if (request.mode === 'navigate' && url.pathname === '/') {
+        event.respondWith(networkFirst(request, SHELL_CACHE));
+    } else if (CDN_URLS.includes(request.url)
+        || (url.origin === self.location.origin && /^\/static\/.*\.(js|css)$/.test(url.pathname))) {
+        // Code must match the server after a deploy; the cached copy is only for offline use.
+        event.respondWith(networkFirst(request, SHELL_CACHE));
+    } else if (url.origin === self.location.origin && url.pathname.startsWith('/static/')) {
+        event.respondWith(staleWhileRevalidate(request));
+    } else if (request.destination === 'image') {
+        // External vehicle and track photos a race day bundle precached.
+        event.respondWith(caches.match(request).then(cached => cached || fetch(request)));
+    }
+    // Everything else, including the API, goes to the network as usual.
+});
@@ -2,10 +2,14 @@ import * as elements from './elements.js';
 import { showMessage, showConfirmationModal } from './ui.js';
 import { App } from './main.js';
 import { MOCK_TRACKS } from './mock-data.js';
+import { debounce, cachedFetch, mutate } from './utils.js';
 
 let currentTracks = [];
 let trackToEdit = null;
 
+// Cached responses that include track data (events and race day bundles join their track's details).
+const TRACK_CACHE_KEYS = ['/get-all-tracks', '/get-events/', '/raceday-bundle/'];
+
 const renderTracks = () => {
     elements.trackList.innerHTML = '';
     if (currentTracks.length === 0) {
@@ -68,23 +72,36 @@ const loadTracks = () => {
         return;
     }
 
-    if (App.cache.tracks) {
-        console.log("[CACHE] Using cached tracks.");
-        currentTracks = App.cache.tracks;
-        renderTracks();
+    cachedFetch('/get-all-tracks', (data) => {
+        // A revalidated list must not replace search results typed in the meantime.
+        if (data.success && !elements.trackSearchInput.value.trim()) {
+            currentTracks = data.tracks;
+            renderTracks();
+        }
+    }).catch(error => console.error('[ERROR] Error loading tracks:', error));
+};
+
+/**
+ * Searches the track catalog on the server and renders the first page of matches.
+ * An empty query shows the full (cached) list again.
+ * @param {string} query - The text typed into the search box.
+ */
+const searchTracks = (query) => {
+    if (!query.trim() || App.dev_mode) {
+        loadTracks();
         return;
     }
 
-    fetch('/get-all-tracks')
+    fetch(`/search-tracks?q=${encodeURIComponent(query)}&limit=50`)
         .then(res => res.json())
         .then(data => {
-            if (data.success) {
-                App.cache.tracks = data.tracks;
+            // Ignore responses for a query the user has already typed past.
+            if (data.success && elements.trackSearchInput.value === query) {
                 currentTracks = data.tracks;
                 renderTracks();
             }
         })
-        .catch(error => console.error('[ERROR] Error loading tracks:', error));
+        .catch(error => console.error('[ERROR] Error searching tracks:', error));
 };
 
 const handlePhotoInput = (fileInput, urlInput, preview) => {
@@ -135,6 +152,9 @@ export const initTrack = () => {
         elements.trackLayoutPhotoPreview.classList.remove('hidden');
     });
 
+    const debouncedSearch = debounce(() => searchTracks(elements.trackSearchInput.value), 200);
+    elements.trackSearchInput.addEventListener('input', debouncedSearch);
+
     elements.addTrackForm.addEventListener('submit', (e) => {
         e.preventDefault();
         const trackData = {
@@ -149,11 +169,11 @@ export const initTrack = () => {
             profileId: App.currentUser.id,
         };
 
-        fetch('/add-track', {
+        mutate('/add-track', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify(trackData),
-        })
+        }, TRACK_CACHE_KEYS)
         .then(res => res.json())
         .then(data => {
             showMessage(data.message, data.success);
@@ -161,7 +181,6 @@ export const initTrack = () => {
                 elements.addTrackForm.reset();
                 elements.trackPhotoPreview.classList.add('hidden');
                 elements.trackLayoutPhotoPreview.classList.add('hidden');
-                App.cache.tracks = null; // Invalidate cache
                 loadTracks();
             }
         })
@@ -182,17 +201,16 @@ export const initTrack = () => {
             profileId: App.currentUser.id, // For ownership check
         };
 
-        fetch(`/update-track/${trackToEdit.id}`, {
+        mutate(`/update-track/${trackToEdit.id}`, {
             method: 'PUT',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify(trackData),
-        })
+        }, TRACK_CACHE_KEYS)
         .then(res => res.json())
         .then(data => {
             showMessage(data.message, data.success);
             if (data.success) {
                 elements.editTrackModal.classList.add('hidden');
-                App.cache.tracks = null; // Invalidate cache
                 loadTracks();
             }
         })
@@ -216,17 +234,16 @@ export const initTrack = () => {
 
         if (button.classList.contains('delete-track-btn')) {
             showConfirmationModal(`Are you sure you want to delete the track "${track.name}"?`, () => {
-                fetch(`/delete-track/${trackId}`, {
+                mutate(`/delete-track/${trackId}`, {
                     method: 'DELETE',
                     headers: { 'Content-Type': 'application/json' },
                     body: JSON.stringify({ profileId: App.currentUser.id })
-                })
+                }, TRACK_CACHE_KEYS)
                     .then(res => res.json())
                     .then(data => {
                         showMessage(data.message, data.success);
                         if(data.success) {
-                            App.cache.tracks = null; // Invalidate cache
-                            loadTracks();
+                                        loadTracks();
                         }
                     })
                     .catch(error => console.error('[ERROR] Error deleting track:', error));
@@ -110,3 +110,192 @@ export const populateModelDropdown = async (make, selectElement, selectedModel =
         selectElement.innerHTML = '<option value="">Error loading models</option>';
     }
 };
+
+/**
+ * Builds a PATCH body containing only the fields that changed.
+ * Set-like array fields (IDs) are sent as { add, remove } so the server can apply
+ * them atomically; ordered lists are sent whole whenever their contents or order change.
+ * @param {object} original - The values the form was opened with.
+ * @param {object} updated - The values currently in the form.
+ * @param {string[]} arrayKeys - Keys whose values are sets of IDs.
+ * @param {string[]} listKeys - Keys whose values are ordered lists that may repeat items.
+ * @returns {object} The changed fields (empty if nothing changed).
+ */
+export const buildPatch = (original, updated, arrayKeys = [], listKeys = []) => {
+    const normalize = (value) => (value === undefined || value === '' ? null : value);
+    const patch = {};
+    Object.keys(updated).forEach(key => {
+        if (arrayKeys.includes(key)) {
+            const before = original[key] || [];
+            const after = updated[key] || [];
+            const add = after.filter(item => !before.includes(item));
+            const remove = before.filter(item => !after.includes(item));
+            if (add.length > 0 || remove.length > 0) {
+                patch[key] = { add, remove };
+            }
+        } else if (listKeys.includes(key)) {
+            if (JSON.stringify(original[key] || []) !== JSON.stringify(updated[key] || [])) {
+                patch[key] = updated[key] || [];
+            }
+        } else if (normalize(original[key]) !== normalize(updated[key])) {
+            patch[key] = updated[key];
+        }
+    });
+    return patch;
+};
+
+// --- Data Cache ---
+// Stale-while-revalidate cache for GET requests. A cached response is rendered
+// right away, then the request is revalidated in the background with its ETag;
+// the view only re-renders if the server sends something new. Identical
+// requests in flight at the same time share one fetch, and entries are kept in
+// IndexedDB so a reload renders from the last session's data.
+const CACHE_DB_NAME = 'pit-crew-cache';
+const CACHE_STORE = 'responses';
+
+const memoryCache = new Map(); // url -> { etag, data }
+const inFlight = new Map(); // url -> Promise resolving to { data, changed }
+let cacheGeneration = 0; // Bumped by every invalidation so older responses are not stored.
+let cacheDbPromise = null;
+
+const openCacheDb = () => {
+    if (!cacheDbPromise) {
+        cacheDbPromise = new Promise((resolve) => {
+            if (!window.indexedDB) {
+                resolve(null);
+                return;
+            }
+            const request = indexedDB.open(CACHE_DB_NAME, 1);
+            request.onupgradeneeded = () => request.result.createObjectStore(CACHE_STORE);
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => {
+                console.warn("[WARN] IndexedDB unavailable, caching in memory only:", request.error);
+                resolve(null);
+            };
+        });
+    }
+    return cacheDbPromise;
+};
+
+const withCacheStore = (mode, action) => openCacheDb().then(db => {
+    if (!db) return undefined;
+    return new Promise((resolve) => {
+        const transaction = db.transaction(CACHE_STORE, mode);
+        const request = action(transaction.objectStore(CACHE_STORE));
+        transaction.oncomplete = () => resolve(request ? request.result : undefined);
+        transaction.onerror = () => resolve(undefined);
+        transaction.onabort = () => resolve(undefined);
+    });
+});
+
+const readCachedEntry = (url) => {
+    if (memoryCache.has(url)) return Promise.resolve(memoryCache.get(url));
+    return withCacheStore('readonly', store => store.get(url)).then(entry => {
+        if (entry && !memoryCache.has(url)) memoryCache.set(url, entry);
+        return memoryCache.get(url);
+    });
+};
+
+const revalidate = (url) => {
+    if (inFlight.has(url)) return inFlight.get(url);
+    const generation = cacheGeneration;
+    const promise = readCachedEntry(url)
+        .then(entry => {
+            const headers = entry && entry.etag ? { 'If-None-Match': entry.etag } : {};
+            return fetch(url, { headers, cache: 'no-store' }).then(response => {
+                if (response.status === 304 && entry) {
+                    return { data: entry.data, changed: false };
+                }
+                return response.json().then(data => {
+                    const etag = response.headers.get('ETag');
+                    // Only keep successful responses, and nothing fetched before an invalidation.
+                    if (response.ok && data.success !== false && generation === cacheGeneration) {
+                        const fresh = { etag, data };
+                        memoryCache.set(url, fresh);
+                        withCacheStore('readwrite', store => store.put(fresh, url));
+                    }
+                    return { data, changed: !entry || !etag || entry.etag !== etag };
+                });
+            });
+        })
+        .finally(() => inFlight.delete(url));
+    inFlight.set(url, promise);
+    return promise;
+};
+
+/**
+ * Loads JSON from a GET endpoint through the cache.
+ * onData is called with the cached data as soon as it is available, and again
+ * with the fresh data if revalidation finds a change.
+ * @param {string} url - The endpoint to load.
+ * @param {function} onData - Renders the response data; may be called twice.
+ * @returns {Promise<object>} Resolves with the first data rendered. Rejects only if there is
+ * no cached copy and the request fails.
+ */
+export const cachedFetch = (url, onData) => new Promise((resolve, reject) => {
+    let rendered = false;
+    const render = (data) => {
+        rendered = true;
+        onData(data);
+        resolve(data);
+    };
+    readCachedEntry(url).then(entry => {
+        // Skip the cached copy if the network answered first.
+        if (entry && !rendered) render(entry.data);
+    });
+    revalidate(url)
+        .then(({ data, changed }) => {
+            if (!rendered || changed) render(data);
+        })
+        .catch(error => {
+            if (!rendered) {
+                reject(error);
+                return;
+            }
+            console.warn(`[WARN] Could not revalidate ${url}, showing cached data:`, error);
+        });
+});
+
+/**
+ * Drops cached responses whose URL starts with any of the given prefixes.
+ * @param {...string} prefixes - URL prefixes, e.g. `/get-vehicles/${profileId}`.
+ */
+export const invalidateCache = (...prefixes) => {
+    cacheGeneration++;
+    const matches = (url) => prefixes.some(prefix => url.startsWith(prefix));
+    [...memoryCache.keys()].filter(matches).forEach(url => memoryCache.delete(url));
+    [...inFlight.keys()].filter(matches).forEach(url => inFlight.delete(url));
+    withCacheStore('readwrite', store => {
+        const request = store.openCursor();
+        request.onsuccess = () => {
+            const cursor = request.result;
+            if (!cursor) return;
+            if (matches(cursor.key)) cursor.delete();
+            cursor.continue();
+        };
+        return null;
+    });
+};
+
+/**
+ * Drops every cached response, e.g. when a profile is deleted or the data is reset.
+ * @returns {Promise} Resolves once IndexedDB has been cleared, so a reload cannot read old data.
+ */
+export const clearCache = () => {
+    cacheGeneration++;
+    memoryCache.clear();
+    inFlight.clear();
+    return withCacheStore('readwrite', store => store.clear());
+};
+
+/**
+ * Sends a write request and invalidates the cached responses it affects once it completes.
+ * @param {string} url - The endpoint to call.
+ * @param {object} options - fetch() options (method, headers, body).
+ * @param {string[]} invalidates - URL prefixes to drop from the cache.
+ * @returns {Promise<Response>} The fetch() response.
+ */
+export const mutate = (url, options, invalidates = []) => fetch(url, options).then(response => {
+    invalidateCache(...invalidates);
+    return response;
+});
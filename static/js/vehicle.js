@@ -1,7 +1,7 @@
 import * as elements from './elements.js';
 import { showMessage, showConfirmationModal, createVehicleIcon } from './ui.js';
 import { App } from './main.js';
-import { populateYearDropdown, populateMakeDropdown, populateModelDropdown, filterDropdown, debounce } from './utils.js';
+import { populateYearDropdown, populateMakeDropdown, populateModelDropdown, filterDropdown, debounce, buildPatch, cachedFetch, mutate } from './utils.js';
 import { MOCK_VEHICLES } from './mock-data.js';
 
 let currentVehicles = [];
@@ -9,28 +9,34 @@ let vehicleToEdit = null;
 let currentSortOrder = 'desc'; // 'desc' for newest first, 'asc' for oldest first
 let sortable = null;
 
-const populateGarageDropdown = async (selectElement) => {
-    try {
-        const response = await fetch(`/get-garages/${App.currentUser.id}`);
-        const data = await response.json();
-        selectElement.innerHTML = '<option value="">No Garage</option>';
-        if (data.success && data.garages.length > 0) {
-            data.garages.forEach(garage => {
-                const option = document.createElement('option');
-                option.value = garage.id;
-                option.textContent = garage.name;
-                selectElement.appendChild(option);
-            });
-            elements.addVehicleFieldset.disabled = false;
-            elements.noGaragesWarning.classList.add('hidden');
-        } else {
-            elements.addVehicleFieldset.disabled = true;
-            elements.noGaragesWarning.classList.remove('hidden');
-        }
-    } catch (error) {
-        console.error("[ERROR] Error fetching garages:", error);
+// Cached responses that include vehicle data (garages list their parked vehicles, events join vehicle details).
+const vehicleCacheKeys = () => [
+    `/get-vehicles/${App.currentUser.id}`,
+    `/get-garages/${App.currentUser.id}`,
+    `/get-vehicles-for-event-form/${App.currentUser.id}`,
+    `/get-events/${App.currentUser.id}`,
+    '/get-shared-garages/',
+    `/raceday-bundle/${App.currentUser.id}`
+];
+
+const populateGarageDropdown = (selectElement) => cachedFetch(`/get-garages/${App.currentUser.id}`, (data) => {
+    const selected = selectElement.value;
+    selectElement.innerHTML = '<option value="">No Garage</option>';
+    if (data.success && data.garages.length > 0) {
+        data.garages.forEach(garage => {
+            const option = document.createElement('option');
+            option.value = garage.id;
+            option.textContent = garage.name;
+            selectElement.appendChild(option);
+        });
+        selectElement.value = selected;
+        elements.addVehicleFieldset.disabled = false;
+        elements.noGaragesWarning.classList.add('hidden');
+    } else {
+        elements.addVehicleFieldset.disabled = true;
+        elements.noGaragesWarning.classList.remove('hidden');
     }
-};
+}).catch(error => console.error("[ERROR] Error fetching garages:", error));
 
 export const showEditVehicleModal = async (vehicle) => {
     vehicleToEdit = vehicle;
@@ -125,27 +131,16 @@ const loadVehicles = () => {
         return;
     }
 
-    if (App.cache.vehicles) {
-        console.log("[CACHE] Using cached vehicles.");
-        currentVehicles = App.cache.vehicles;
-        renderVehicles();
-        return;
-    }
-
-    fetch(`/get-vehicles/${App.currentUser.id}`)
-        .then(response => response.json())
-        .then(data => {
-            if (data.success) {
-                App.cache.vehicles = data.vehicles;
-                currentVehicles = data.vehicles;
-                renderVehicles();
-                if (data.limit_reached) {
-                    elements.addVehicleFieldset.disabled = true;
-                    elements.addVehicleBtn.textContent = 'Vehicle Limit Reached';
-                }
+    cachedFetch(`/get-vehicles/${App.currentUser.id}`, (data) => {
+        if (data.success) {
+            currentVehicles = data.vehicles;
+            renderVehicles();
+            if (data.limit_reached) {
+                elements.addVehicleFieldset.disabled = true;
+                elements.addVehicleBtn.textContent = 'Vehicle Limit Reached';
             }
-        })
-        .catch(error => console.error('[ERROR] Error loading vehicles:', error));
+        }
+    }).catch(error => console.error('[ERROR] Error loading vehicles:', error));
 };
 
 export const initVehicle = () => {
@@ -200,18 +195,17 @@ export const initVehicle = () => {
             photoURL: elements.vehiclePhotoUrlInput.value || null
         };
 
-        fetch(`/add-vehicle/${App.currentUser.id}`, {
+        mutate(`/add-vehicle/${App.currentUser.id}`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify(vehicleData),
-        })
+        }, vehicleCacheKeys())
         .then(response => response.json())
         .then(data => {
             showMessage(data.message, data.success);
             if (data.success) {
                 elements.addVehicleForm.reset();
                 elements.vehiclePhotoPreview.classList.add('hidden');
-                App.cache.vehicles = null; // Invalidate cache
                 loadVehicles();
             }
         })
@@ -232,17 +226,23 @@ export const initVehicle = () => {
             photoURL: elements.editVehiclePhotoUrlInput.value || null
         };
 
-        fetch(`/update-vehicle/${App.currentUser.id}/${vehicleToEdit.id}`, {
-            method: 'PUT',
+        // Only send the fields that changed, so an unchanged photo is not re-uploaded.
+        const patch = buildPatch(vehicleToEdit, vehicleData);
+        if (Object.keys(patch).length === 0) {
+            elements.editVehicleModal.classList.add('hidden');
+            return;
+        }
+
+        mutate(`/update-vehicle/${App.currentUser.id}/${vehicleToEdit.id}`, {
+            method: 'PATCH',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify(vehicleData),
-        })
+            body: JSON.stringify(patch),
+        }, vehicleCacheKeys())
         .then(response => response.json())
         .then(data => {
             showMessage(data.message, data.success);
             if (data.success) {
                 elements.editVehicleModal.classList.add('hidden');
-                App.cache.vehicles = null; // Invalidate cache
                 loadVehicles();
             }
         })
@@ -283,12 +283,11 @@ export const initVehicle = () => {
 
         if (button.classList.contains('delete-vehicle-btn')) {
             showConfirmationModal('Are you sure you want to delete this vehicle?', () => {
-                fetch(`/delete-vehicle/${App.currentUser.id}/${vehicleId}`, { method: 'DELETE' })
+                mutate(`/delete-vehicle/${App.currentUser.id}/${vehicleId}`, { method: 'DELETE' }, vehicleCacheKeys())
                     .then(res => res.json())
                     .then(data => {
                         showMessage(data.message, data.success);
-                        App.cache.vehicles = null; // Invalidate cache
-                        loadVehicles();
+                                loadVehicles();
                     })
                     .catch(error => {
                         console.error('[ERROR] Error deleting vehicle:', error);
@@ -310,15 +309,26 @@ export const initVehicle = () => {
     sortable = new Sortable(elements.vehicleList, {
         handle: '.drag-handle',
         animation: 150,
-        onEnd: () => {
-            const orderedIds = Array.from(elements.vehicleList.children).map(item => item.dataset.id);
-            fetch(`/update-vehicle-order/${App.currentUser.id}`, {
+        onEnd: (evt) => {
+            if (evt.oldIndex === evt.newIndex) return;
+            // Only the dragged vehicle is re-ranked between its new neighbours.
+            const previous = evt.item.previousElementSibling;
+            const next = evt.item.nextElementSibling;
+            mutate(`/move-vehicle/${App.currentUser.id}`, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ order: orderedIds }),
-            })
+                body: JSON.stringify({
+                    vehicleId: evt.item.dataset.id,
+                    afterId: previous ? previous.dataset.id : null,
+                    beforeId: next ? next.dataset.id : null
+                }),
+            }, vehicleCacheKeys())
             .then(res => res.json())
-            .then(data => showMessage(data.message, data.success))
+            .then(data => {
+                showMessage(data.message, data.success);
+                // A rejected move (e.g. a stale list) leaves the dragged item out of place.
+                if (!data.success) loadVehicles();
+            })
             .catch(error => {
                 console.error('[ERROR] Error updating vehicle order:', error);
                 showMessage('Failed to update vehicle order.', false);
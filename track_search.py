@@ -0,0 +1,96 @@
+# track_search.py
+# In-memory inverted index over track name, location and type for typeahead
+# search. Tokens are kept in a sorted list so every query token is matched as a
+# prefix with a binary search, and the index is updated one track at a time
+# (it subscribes to the tracks replica) instead of being rebuilt.
+
+import bisect
+import re
+import threading
+
+# A match in the name ranks above one in the location, which ranks above the type.
+FIELD_WEIGHTS = {'name': 3, 'location': 2, 'type': 1}
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Splits text into casefolded word tokens."""
+    return TOKEN_PATTERN.findall(str(text or '').casefold())
+
+
+class TrackSearchIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = {}     # token -> {track_id: weight}
+        self._sorted_tokens = []
+        self._track_tokens = {}  # track_id -> set of tokens, for removal
+        self._names = {}         # track_id -> casefolded name, for ordering ties
+
+    def update(self, track_id, data):
+        """Adds, replaces or (data=None) removes one track. Matches the replica subscriber signature."""
+        with self._lock:
+            self._remove(track_id)
+            if data is None:
+                return
+            weights = {}
+            for field, weight in FIELD_WEIGHTS.items():
+                for token in tokenize(data.get(field)):
+                    weights[token] = max(weights.get(token, 0), weight)
+            for token, weight in weights.items():
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = {}
+                    bisect.insort(self._sorted_tokens, token)
+                postings[track_id] = weight
+            self._track_tokens[track_id] = set(weights)
+            self._names[track_id] = str(data.get('name') or '').casefold()
+
+    def _remove(self, track_id):
+        for token in self._track_tokens.pop(track_id, ()):
+            postings = self._postings[token]
+            postings.pop(track_id, None)
+            if not postings:
+                del self._postings[token]
+                del self._sorted_tokens[bisect.bisect_left(self._sorted_tokens, token)]
+        self._names.pop(track_id, None)
+
+    def _prefix_matches(self, prefix):
+        """Returns {track_id: best weight} for every token starting with prefix."""
+        matches = {}
+        start = bisect.bisect_left(self._sorted_tokens, prefix)
+        for token in self._sorted_tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            # An exact token match ranks just above a longer token sharing the prefix.
+            bonus = 0.5 if token == prefix else 0
+            for track_id, weight in self._postings[token].items():
+                matches[track_id] = max(matches.get(track_id, 0), weight + bonus)
+        return matches
+
+    def search(self, query, offset=0, limit=20):
+        """
+        Returns (total, track_ids) for tracks matching every query token as a
+        prefix, best matches first. An empty query lists every track by name.
+        """
+        tokens = tokenize(query)
+        with self._lock:
+            if not tokens:
+                ranked = sorted(self._names, key=lambda track_id: (self._names[track_id], track_id))
+                return len(ranked), ranked[offset:offset + limit]
+
+            scores = None
+            for token in tokens:
+                matches = self._prefix_matches(token)
+                if scores is None:
+                    scores = matches
+                else:
+                    scores = {track_id: score + matches[track_id]
+                              for track_id, score in scores.items() if track_id in matches}
+                if not scores:
+                    return 0, []
+            ranked = sorted(scores, key=lambda track_id: (-scores[track_id], self._names[track_id], track_id))
+            return len(ranked), ranked[offset:offset + limit]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._track_tokens)
@@ -0,0 +1,202 @@
+# tracks_replica.py
+# Process-local replica of the global 'tracks' collection.
+# The catalog is small and read-mostly, so it is held in memory and kept current
+# by a Firestore real-time listener. If the listener cannot start, stops, or sends
+# nothing within READY_TIMEOUT (for example when the client has no network path
+# for streaming), the replica falls back to reloading the collection on a fixed
+# interval and tries the listener again later.
+
+import logging
+import threading
+import time
+
+log = logging.getLogger('app.tracks_replica')
+
+POLL_INTERVAL = 30
+READY_TIMEOUT = 10
+LISTENER_RETRY_INTERVAL = 300  # Seconds of polling before the listener is tried again
+
+
+class TracksReplica:
+    def __init__(self, collection_ref, poll_interval=POLL_INTERVAL):
+        self._collection_ref = collection_ref
+        self._poll_interval = poll_interval
+        self._tracks = {}
+        self._lock = threading.RLock()
+        self._ready = threading.Event()
+        self._started = False
+        self._watch = None
+        self._listener_synced = False
+        self._listener_started = None
+        self._polling_since = None
+        self._subscribers = []
+        self.mode = 'stopped'
+        self.last_sync = None
+        self.snapshot_count = 0
+        self.change_count = 0
+        self.error_count = 0
+
+    # --- Lifecycle ---
+    def start(self):
+        """Starts the listener (or polling fallback) once; later calls are no-ops."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        self._start_listener()
+        threading.Thread(target=self._maintain, name='tracks-replica', daemon=True).start()
+
+    def wait_until_ready(self, timeout=READY_TIMEOUT):
+        """
+        Starts the replica and waits for its first load. A listener that is not
+        ready within timeout is replaced by polling, so only the first caller waits.
+        """
+        self.start()
+        if self._ready.wait(timeout if self.mode == 'listener' else 0):
+            return True
+        if self.mode == 'listener':
+            self._fall_back_to_polling(f'sent no snapshot within {timeout}s')
+        return self._ready.is_set()
+
+    def _start_listener(self):
+        with self._lock:
+            # Set first: the first snapshot can arrive before on_snapshot returns.
+            self.mode = 'listener'
+            self._listener_synced = False
+            self._listener_started = time.monotonic()
+        try:
+            watch = self._collection_ref.on_snapshot(self._on_snapshot)
+        except Exception as e:
+            self._fall_back_to_polling(f'unavailable ({e})')
+            return
+        with self._lock:
+            self._watch = watch
+
+    def _fall_back_to_polling(self, reason):
+        with self._lock:
+            if self.mode == 'polling':
+                return
+            watch, self._watch = self._watch, None
+            self.mode = 'polling'
+            self._polling_since = time.monotonic()
+        log.warning("Tracks listener %s. Falling back to polling every %ss.", reason, self._poll_interval)
+        if watch is not None:
+            try:
+                watch.unsubscribe()
+            except Exception:
+                pass
+        self.reload()
+
+    def _listener_active(self):
+        return self._watch is not None and getattr(self._watch, 'is_active', True)
+
+    def _maintain(self):
+        while True:
+            time.sleep(self._poll_interval)
+            if self.mode == 'listener':
+                if self._watch is not None and not self._listener_active():
+                    self.error_count += 1
+                    self._fall_back_to_polling('stopped')
+                elif not self._listener_synced and time.monotonic() - self._listener_started > READY_TIMEOUT:
+                    self.error_count += 1
+                    self._fall_back_to_polling(f'sent no snapshot within {READY_TIMEOUT}s')
+            elif time.monotonic() - self._polling_since >= LISTENER_RETRY_INTERVAL:
+                log.info("Retrying the tracks listener.")
+                self._start_listener()
+            else:
+                self.reload()
+
+    # --- Updates ---
+    def _on_snapshot(self, docs, changes, read_time):
+        with self._lock:
+            if self.mode != 'listener':
+                return  # A listener we have already given up on
+            if not self._listener_synced:
+                # The first snapshot after a (re)start holds every document, so
+                # anything missing from it was deleted while we were not listening.
+                self._replace({doc.id: doc.to_dict() for doc in docs})
+                self._listener_synced = True
+            else:
+                for change in changes:
+                    doc = change.document
+                    if change.type.name == 'REMOVED':
+                        self._apply(doc.id, None)
+                    else:
+                        self._apply(doc.id, doc.to_dict())
+            self.snapshot_count += 1
+            self.last_sync = time.time()
+        self._ready.set()
+
+    def reload(self):
+        """Replaces the replica with a fresh read of the whole collection."""
+        try:
+            fresh = {doc.id: doc.to_dict() for doc in self._collection_ref.stream()}
+        except Exception as e:
+            self.error_count += 1
+            log.exception("Error reloading tracks replica: %s", e)
+            return
+        with self._lock:
+            self._replace(fresh)
+            self.last_sync = time.time()
+        self._ready.set()
+
+    def _replace(self, fresh):
+        for track_id in set(self._tracks) - set(fresh):
+            self._apply(track_id, None)
+        for track_id, data in fresh.items():
+            if self._tracks.get(track_id) != data:
+                self._apply(track_id, data)
+
+    def apply_local(self, track_id, data):
+        """
+        Applies a write made by this process right away, so it is visible before
+        the listener (or next poll) delivers it. data=None removes the track.
+        """
+        with self._lock:
+            self._apply(track_id, data)
+
+    def _apply(self, track_id, data):
+        if data is None:
+            if self._tracks.pop(track_id, None) is None:
+                return
+        else:
+            self._tracks[track_id] = data
+        self.change_count += 1
+        for callback in self._subscribers:
+            callback(track_id, data)
+
+    def subscribe(self, callback):
+        """Registers callback(track_id, data_or_None) for every change, replaying current contents."""
+        with self._lock:
+            self._subscribers.append(callback)
+            for track_id, data in self._tracks.items():
+                callback(track_id, data)
+
+    # --- Reads ---
+    def get(self, track_id):
+        with self._lock:
+            data = self._tracks.get(track_id)
+            return dict(data) if data is not None else None
+
+    def as_dict(self):
+        with self._lock:
+            return {track_id: dict(data) for track_id, data in self._tracks.items()}
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'mode': self.mode,
+                'ready': self._ready.is_set(),
+                'size': len(self._tracks),
+                'listener_active': bool(self._listener_active()),
+                'stale_seconds': self._stale_seconds(),
+                'snapshots': self.snapshot_count,
+                'changes': self.change_count,
+                'errors': self.error_count
+            }
+
+    def _stale_seconds(self):
+        """How far behind Firestore the replica may be: 0 while a synced listener is running."""
+        if self.mode == 'listener' and self._listener_synced and self._listener_active():
+            return 0
+        return round(time.time() - self.last_sync, 3) if self.last_sync else None